@@ -1,16 +1,59 @@
 # core/actions.py
+import glob
 from pathlib import Path
+from typing import List, Tuple, Union
+
+from core.artifact_store import ARTIFACTS_DIR, get_artifact_store
+from core.file_index import get_file_index
+from core.records import StepSpec
+from core.tracing import span
+from core.worker_pool import (
+    CPU_BOUND_ACTIONS, WorkerCrashedError, WorkerTimeoutError, get_worker_pool, parallel_map,
+)
+
+# Actions handled by _run_action; anything else is logged and skipped.
+BUILTIN_ACTIONS = frozenset({"noop", "validate", "transform", "apply_patch", "create_endpoint"})
 
-ARTIFACTS_DIR = Path("orchestrator_artifacts")
 ARTIFACTS_DIR.mkdir(exist_ok=True)
 
 def _write_log(step_id: str, message: str) -> Path:
     p = ARTIFACTS_DIR / f"{step_id}.log"
+    store = get_artifact_store()
+    if store is not None:
+        # Identical messages ("noop: nothing to do") are stored once
+        store.put(step_id, "action", message, p)
+        return p
     p.write_text(message, encoding="utf-8")
     return p
 
-def run_action(step: dict, safe_mode: bool = True) -> tuple[bool, Path]:
+def run_action(step: Union[dict, StepSpec], safe_mode: bool = True) -> tuple[bool, Path]:
     action = step.get("action", "noop")
+    with span(action, kind="action", step_id=step.get("id", action), safe_mode=safe_mode):
+        pool = get_worker_pool() if action in CPU_BOUND_ACTIONS else None
+        if pool is None:
+            return _run_action(step, action, safe_mode)
+        try:
+            return pool.run_action(step, action, safe_mode)
+        except (WorkerTimeoutError, WorkerCrashedError) as e:
+            return False, _write_log(step.get("id", action), f"{action}: worker failed: {e}")
+
+def _expand_source(src: str) -> List[str]:
+    """Files named by a transform source: a glob, a directory, or a single file."""
+    index = get_file_index()
+    if glob.has_magic(src):
+        return index.glob(src)
+    path = Path(src)
+    if path.is_dir():
+        # Everything under the directory, hidden files included (as rglob did)
+        return index.glob(str(path / "**"), include_hidden=True)
+    return [src] if path.is_file() else []
+
+def _scan_file(path: str) -> Tuple[int, int]:
+    """(bytes, lines) of one file; runs in a pool worker for large globs."""
+    index = get_file_index()
+    return len(index.read_bytes(path)), index.count_lines(path)
+
+def _run_action(step: Union[dict, StepSpec], action: str, safe_mode: bool) -> tuple[bool, Path]:
     step_id = step.get("id", f"{action}")
     params = step.get("params", {})
 
@@ -27,7 +70,14 @@ def run_action(step: dict, safe_mode: bool = True) -> tuple[bool, Path]:
         src = params.get("source") or params.get("target") or params.get("glob") or "docs/"
         msg = f"transform: planned transform over {src}"
         if safe_mode:
+            # A dry run only reports the plan; it never touches the files
             msg += " (dry-run)"
+        else:
+            files = _expand_source(src)
+            if files:
+                # Fans out per file across the worker pool (all cores) when enabled.
+                stats = parallel_map(_scan_file, files)
+                msg += f" ({len(files)} files, {sum(n for _, n in stats)} lines)"
         log = _write_log(step_id, msg)
         return True, log
 
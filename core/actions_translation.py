@@ -4,9 +4,19 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Entry/exit events are high-volume; core.logging_config keeps a sample of them
+_SAMPLED = {"sampled": True}
+
+
+def _snapshot(value):
+    """Formatting happens later on the log thread; pass a copy the action can't mutate."""
+    return dict(value) if isinstance(value, dict) else value
+
+
 @register_action("translation_init")
 def translation_init(params=None, context=None):
-    logger.info("[translation_init] Entry | params=%s context=%s", params, context)
+    logger.info("[translation_init] Entry | params=%s context=%s", _snapshot(params), _snapshot(context),
+                extra=_SAMPLED)
     result = {
         "status": "ok",
         "data": {
@@ -16,21 +26,23 @@ def translation_init(params=None, context=None):
             "confidence_threshold": 0.8,
         },
     }
-    logger.info("[translation_init] Exit | result=%s", result)
+    logger.info("[translation_init] Exit | result=%s", _snapshot(result), extra=_SAMPLED)
     return result
 
 
 @register_action("translation_process")
 def translation_process(params=None, context=None):
-    logger.info("[translation_process] Entry | params=%s context=%s", params, context)
+    logger.info("[translation_process] Entry | params=%s context=%s", _snapshot(params), _snapshot(context),
+                extra=_SAMPLED)
     result = {"status": "ok", "details": "Translation process placeholder."}
-    logger.info("[translation_process] Exit | result=%s", result)
+    logger.info("[translation_process] Exit | result=%s", _snapshot(result), extra=_SAMPLED)
     return result
 
 
 @register_action("translation_finalize")
 def translation_finalize(params=None, context=None):
-    logger.info("[translation_finalize] Entry | params=%s context=%s", params, context)
+    logger.info("[translation_finalize] Entry | params=%s context=%s", _snapshot(params), _snapshot(context),
+                extra=_SAMPLED)
     result = {"status": "ok", "details": "Translation finalize placeholder."}
-    logger.info("[translation_finalize] Exit | result=%s", result)
+    logger.info("[translation_finalize] Exit | result=%s", _snapshot(result), extra=_SAMPLED)
     return result
\ No newline at end of file
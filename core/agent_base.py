@@ -1,10 +1,16 @@
 # core/agent_base.py
+from .prompt_builder import AssembledPrompt, get_prompt_assembler
+
+
 class BaseAgent:
     """
     Base class for agents in the automation/delegation framework.
     Provides a common interface for initialization, task execution, and teardown.
     """
 
+    # System preamble shared by every prompt this agent builds
+    PREAMBLE = ""
+
     def __init__(self, name: str = "BaseAgent", **kwargs):
         self.name = name
         self.config = kwargs
@@ -16,6 +22,14 @@ class BaseAgent:
         """
         self.context.update(context or {})
 
+    def build_prompt(self, step_text: str, context: dict | None = None) -> AssembledPrompt:
+        """
+        Assemble a step prompt from the shared preamble and context fragments
+        plus the step-specific text; shared fragments are stored only once.
+        """
+        merged = {**self.context, **(context or {})}
+        return get_prompt_assembler().assemble(step_text, preamble=self.PREAMBLE, context=merged)
+
     def run(self, *args, **kwargs):
         """
         Main execution entrypoint. Must be overridden by subclasses.
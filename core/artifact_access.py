@@ -0,0 +1,201 @@
+# core/artifact_access.py
+"""
+Read-side helpers for serving step logs and artifacts over HTTP.
+
+Everything here is framework-free; ``src/api/artifacts.py`` wires it into
+FastAPI.  Paths are always resolved inside ``orchestrator_artifacts/`` (no
+``..`` or symlink escapes).  Whole files are handed to the server as a file
+response (``sendfile`` where the server supports it); byte ranges are cut
+from an mmap, so a range request touches only the pages it returns, and
+``tail`` finds the last lines by scanning backwards from the end of the
+mapping.  Logs that live only in the artifact store are served from memory,
+as are stored logs that shadow a stale plaintext file while the store is on.
+
+Only log and report artifacts are served (``SERVED_SUFFIXES``); databases and
+other internal files under the directory are not reachable.
+
+Files get a weak ETag built from (inode, size, mtime), so a growing log
+gets a new one on each write; stored logs get their content hash.
+"""
+import asyncio
+import hashlib
+import mmap
+import os
+import re
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from core.artifact_store import ARTIFACTS_DIR, get_reader_store, store_enabled
+
+CHUNK_SIZE = 256 * 1024
+SERVED_SUFFIXES = {".log", ".txt", ".md", ".json", ".diff", ".patch", ".folded"}
+_RANGE = re.compile(r"bytes=(\d*)-(\d*)$")
+
+
+class ArtifactNotFound(Exception):
+    """The path is outside the artifacts directory or does not exist."""
+    pass
+
+
+class RangeNotSatisfiable(Exception):
+    """The Range header cannot be served for this artifact size."""
+    pass
+
+
+class Artifact(NamedTuple):
+    name: str                   # path relative to the artifacts directory
+    size: int
+    etag: str
+    mtime: float
+    path: Optional[Path] = None  # on disk, or None when served from the store
+    data: Optional[bytes] = None
+
+
+def resolve_artifact(name: str, root: Path = ARTIFACTS_DIR) -> Artifact:
+    """Look up ``name`` (relative to ``root``) without leaving ``root``."""
+    base = root.resolve()
+    candidate = (base / name).resolve()
+    if candidate != base and base not in candidate.parents:
+        raise ArtifactNotFound(name)
+    rel = candidate.relative_to(base).as_posix()
+    if candidate.suffix not in SERVED_SUFFIXES:
+        raise ArtifactNotFound(name)
+    store = get_reader_store() if root == ARTIFACTS_DIR else None
+    # While the store is enabled its copy is newer than any plaintext leftover
+    if store is not None and store_enabled():
+        stored = _stored_artifact(store, rel)
+        if stored is not None:
+            return stored
+    if candidate.is_file():
+        st = candidate.stat()
+        etag = f'W/"{st.st_ino:x}-{st.st_size:x}-{st.st_mtime_ns:x}"'
+        return Artifact(rel, st.st_size, etag, st.st_mtime, path=candidate)
+    stored = _stored_artifact(store, rel) if store is not None else None
+    if stored is None:
+        raise ArtifactNotFound(name)
+    return stored
+
+
+def _stored_artifact(store, rel: str) -> Optional[Artifact]:
+    text = store.get_path(ARTIFACTS_DIR / rel)
+    if text is None:
+        return None
+    data = text.encode("utf-8")
+    return Artifact(rel, len(data), f'"{hashlib.sha256(data).hexdigest()[:32]}"', 0.0, data=data)
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """(start, end) inclusive for a single ``bytes=`` range; None for the whole file."""
+    if not header:
+        return None
+    match = _RANGE.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None  # multi-range or malformed: RFC 9110 allows ignoring it
+    first, last = match.groups()
+    if first == "":
+        start, end = max(0, size - int(last)), size - 1  # suffix: last N bytes
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise RangeNotSatisfiable(f"bytes */{size}")
+    return start, end
+
+
+def iter_bytes(artifact: Artifact, start: int = 0, end: Optional[int] = None,
+               chunk_size: int = CHUNK_SIZE) -> Iterator[Union[bytes, memoryview]]:
+    """Yield bytes start..end (inclusive) without reading the rest of the file."""
+    end = artifact.size - 1 if end is None else end
+    if artifact.data is not None:
+        yield memoryview(artifact.data)[start:end + 1]
+        return
+    if end < start:
+        return
+    with open(artifact.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        view = memoryview(mm)
+        try:
+            for offset in range(start, end + 1, chunk_size):
+                # Copy out so the mapping can close even if the consumer keeps chunks
+                yield bytes(view[offset:min(offset + chunk_size, end + 1)])
+        finally:
+            view.release()
+
+
+def tail_etag(artifact: Artifact, lines: int) -> str:
+    """A validator for the last ``lines`` lines, distinct from the full file's."""
+    return f'{artifact.etag[:-1]}-tail{lines}"'
+
+
+def tail(artifact: Artifact, lines: int) -> bytes:
+    """The last ``lines`` lines, found by scanning back from the end."""
+    if artifact.data is not None:
+        return _tail(artifact.data, lines)
+    if artifact.size == 0:
+        return b""
+    with open(artifact.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return _tail(mm, lines)
+
+
+def _tail(buf, lines: int) -> bytes:
+    end = len(buf)
+    pos = end - 1 if end and buf[end - 1:end] == b"\n" else end
+    for _ in range(lines):
+        pos = buf.rfind(b"\n", 0, pos)
+        if pos < 0:
+            return bytes(buf[:end])
+    return bytes(buf[pos + 1:end])
+
+
+async def follow(artifact: Artifact, offset: int = 0, poll_interval: float = 0.5,
+                 idle_timeout: float = 30.0) -> AsyncIterator[bytes]:
+    """
+    Yield data appended to a log from ``offset`` on, until it has not grown
+    for ``idle_timeout`` seconds (the step is done). Stored logs are complete.
+    """
+    if artifact.path is None:
+        if offset < artifact.size:
+            yield bytes(artifact.data[offset:])
+        return
+    idle = 0.0
+    with open(artifact.path, "rb") as f:
+        f.seek(offset)
+        while idle < idle_timeout:
+            data = f.read(CHUNK_SIZE)
+            if data:
+                idle = 0.0
+                yield data
+                continue
+            await asyncio.sleep(poll_interval)
+            idle += poll_interval
+
+
+def list_runs(root: Path = ARTIFACTS_DIR, limit: int = 50) -> List[Dict[str, Any]]:
+    """Runs with step logs on disk or in the store, newest first."""
+    runs: Dict[str, Dict[str, Any]] = {}
+
+    def add(task_id: str, step: str, name: str, size: Optional[int], mtime: float) -> None:
+        run = runs.setdefault(task_id, {"task_id": task_id, "updated_at": 0.0, "steps": []})
+        run["steps"].append({"step": step, "log_file": name, "size": size})
+        run["updated_at"] = max(run["updated_at"], mtime)
+
+    if root.is_dir():
+        with os.scandir(root) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".log") or not entry.is_file():
+                    continue
+                stem = entry.name[:-4]
+                task_id, sep, step = stem.rpartition("_step")
+                st = entry.stat()
+                add(task_id if sep else stem, step if sep else "action", entry.name, st.st_size, st.st_mtime)
+    store = get_reader_store() if root == ARTIFACTS_DIR else None
+    if store is not None:
+        rows = store.entries()
+        seen = {(r["task_id"], s["log_file"]) for r in runs.values() for s in r["steps"]}
+        for task_id, step, path, size, created in rows:
+            name = Path(path).name
+            if (task_id, name) not in seen:
+                add(task_id, step, name, size, created)
+    ordered = sorted(runs.values(), key=lambda r: r["updated_at"], reverse=True)[:limit]
+    for run in ordered:
+        run["steps"].sort(key=lambda s: (len(s["step"]), s["step"]))
+    return ordered
@@ -0,0 +1,288 @@
+# core/artifact_store.py
+"""
+Compressed, content-addressed storage for step logs.
+
+Instead of one plaintext file per step, log bodies are stored once per
+distinct content (keyed by SHA-256) as zlib level-1 blobs inside a single
+SQLite file, so identical logs (``noop: nothing to do``, repeated dry-run
+messages) cost one row and no inodes.  A small index maps ``(task_id, step)``
+and the legacy log path to a blob; per-run metadata such as the timestamp
+header lives in the index so it does not defeat de-duplication.
+
+``log_file`` values keep their old ``orchestrator_artifacts/...`` form and
+``read_log(path)`` resolves them through the index (or from disk for logs
+written before the store was enabled); while the store is enabled the index
+takes precedence over a stale plaintext file at the same path.
+
+Retention drops index entries older than ``ADF_ARTIFACT_MAX_AGE_DAYS`` and,
+oldest first, beyond ``ADF_ARTIFACT_MAX_MB`` of stored blobs; compaction
+then deletes unreferenced blobs and returns the space to the filesystem.
+
+Configuration (environment):
+    ADF_ARTIFACT_STORE        set to "1" to store logs here instead of as files
+    ADF_ARTIFACT_STORE_DB     database path (default orchestrator_artifacts/artifacts.sqlite3)
+
+CLI:
+    python -m core.artifact_store cat orchestrator_artifacts/<task>_step1.log
+    python -m core.artifact_store import        # move existing *.log files in
+    python -m core.artifact_store gc            # retention + compaction
+    python -m core.artifact_store stats
+"""
+import argparse
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+ARTIFACTS_DIR = Path("orchestrator_artifacts")
+STORE_PATH = Path(os.getenv("ADF_ARTIFACT_STORE_DB", str(ARTIFACTS_DIR / "artifacts.sqlite3")))
+MAX_AGE_DAYS = float(os.getenv("ADF_ARTIFACT_MAX_AGE_DAYS", "30"))
+MAX_BYTES = int(float(os.getenv("ADF_ARTIFACT_MAX_MB", "512")) * 1024 * 1024)
+COMPRESSION_LEVEL = 1
+GC_EVERY_PUTS = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    sha        TEXT PRIMARY KEY,
+    size       INTEGER,
+    stored     INTEGER,
+    data       BLOB
+);
+CREATE TABLE IF NOT EXISTS artifacts (
+    task_id    TEXT,
+    step       TEXT,
+    path       TEXT UNIQUE,
+    sha        TEXT,
+    header     TEXT,
+    footer     TEXT,
+    created_at REAL,
+    PRIMARY KEY (task_id, step)
+);
+CREATE INDEX IF NOT EXISTS idx_artifacts_sha ON artifacts (sha);
+CREATE INDEX IF NOT EXISTS idx_artifacts_time ON artifacts (created_at);
+"""
+
+_store: Optional["ArtifactStore"] = None
+_store_lock = threading.Lock()
+
+
+class ArtifactStore:
+    def __init__(self, path: Optional[Path] = None, max_age_days: float = MAX_AGE_DAYS,
+                 max_bytes: int = MAX_BYTES):
+        self.path = Path(path or STORE_PATH)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_age_days = max_age_days
+        self.max_bytes = max_bytes
+        self._puts = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # --- writes -----------------------------------------------------------
+
+    def put(self, task_id: str, step: Union[int, str], body: str, path: Union[str, Path],
+            header: str = "", footer: str = "") -> str:
+        """Store a log; returns its path (the key ``read_log`` resolves)."""
+        data = body.encode("utf-8")
+        sha = hashlib.sha256(data).hexdigest()
+        path = Path(path).as_posix()
+        with self._lock, self._conn:
+            exists = self._conn.execute("SELECT 1 FROM blobs WHERE sha = ?", (sha,)).fetchone()
+            if not exists:
+                packed = zlib.compress(data, COMPRESSION_LEVEL)
+                self._conn.execute("INSERT INTO blobs VALUES (?, ?, ?, ?)",
+                                   (sha, len(data), len(packed), packed))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO artifacts VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (task_id, str(step), path, sha, header, footer, time.time()),
+            )
+            self._puts += 1
+            due = self._puts % GC_EVERY_PUTS == 0
+        if due:
+            self.gc()
+        return path
+
+    # --- reads ------------------------------------------------------------
+
+    def _row(self, where: str, args: tuple) -> Optional[tuple]:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT a.header, b.data, a.footer FROM artifacts a JOIN blobs b ON a.sha = b.sha "
+                f"WHERE {where}", args,
+            ).fetchone()
+
+    @staticmethod
+    def _render(row: tuple) -> str:
+        header, data, footer = row
+        return (header or "") + zlib.decompress(data).decode("utf-8") + (footer or "")
+
+    def get(self, task_id: str, step: Union[int, str]) -> Optional[str]:
+        row = self._row("a.task_id = ? AND a.step = ?", (task_id, str(step)))
+        return self._render(row) if row else None
+
+    def get_path(self, path: Union[str, Path]) -> Optional[str]:
+        row = self._row("a.path = ?", (Path(path).as_posix(),))
+        return self._render(row) if row else None
+
+    def entries(self) -> List[Tuple[str, str, str, int, float]]:
+        """(task_id, step, path, rendered size, created_at) for every stored log."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT a.task_id, a.step, a.path, "
+                "LENGTH(COALESCE(a.header, '')) + b.size + LENGTH(COALESCE(a.footer, '')), a.created_at "
+                "FROM artifacts a JOIN blobs b ON a.sha = b.sha"
+            ).fetchall()
+
+    # --- retention --------------------------------------------------------
+
+    def gc(self, now: Optional[float] = None) -> Dict[str, int]:
+        """Apply age/size retention, then drop unreferenced blobs and reclaim space."""
+        now = time.time() if now is None else now
+        with self._lock, self._conn:
+            expired = self._conn.execute(
+                "DELETE FROM artifacts WHERE created_at < ?", (now - self.max_age_days * 86400,)
+            ).rowcount
+            # Oldest first until the referenced blobs fit the size budget
+            total = self._conn.execute(
+                "SELECT COALESCE(SUM(stored), 0) FROM blobs WHERE sha IN (SELECT sha FROM artifacts)"
+            ).fetchone()[0]
+            trimmed = 0
+            if total > self.max_bytes:
+                rows = self._conn.execute(
+                    "SELECT a.rowid, a.sha, b.stored FROM artifacts a JOIN blobs b ON a.sha = b.sha "
+                    "ORDER BY a.created_at"
+                ).fetchall()
+                refs: Dict[str, int] = {}
+                for _, sha, _ in rows:
+                    refs[sha] = refs.get(sha, 0) + 1
+                doomed = []
+                for rowid, sha, stored in rows:
+                    if total <= self.max_bytes:
+                        break
+                    doomed.append((rowid,))
+                    refs[sha] -= 1
+                    if refs[sha] == 0:
+                        total -= stored
+                self._conn.executemany("DELETE FROM artifacts WHERE rowid = ?", doomed)
+                trimmed = len(doomed)
+            orphans = self._conn.execute(
+                "DELETE FROM blobs WHERE sha NOT IN (SELECT sha FROM artifacts)"
+            ).rowcount
+        with self._lock:
+            self._conn.execute("PRAGMA incremental_vacuum")
+        return {"expired": expired, "trimmed": trimmed, "orphan_blobs": orphans}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            artifacts = self._conn.execute("SELECT COUNT(*) FROM artifacts").fetchone()[0]
+            blobs, raw, stored = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(stored), 0) FROM blobs"
+            ).fetchone()
+        return {"artifacts": artifacts, "blobs": blobs, "raw_bytes": raw, "stored_bytes": stored,
+                "file_bytes": self.path.stat().st_size}
+
+    def import_dir(self, directory: Path = ARTIFACTS_DIR, remove: bool = True) -> int:
+        """Move existing plaintext ``*.log`` files into the store."""
+        count = 0
+        for log in sorted(Path(directory).glob("*.log")):
+            stem = log.stem
+            task_id, _, step = stem.rpartition("_step") if "_step" in stem else (stem, "", "action")
+            self.put(task_id, step, log.read_text(encoding="utf-8", errors="replace"), log)
+            if remove:
+                log.unlink()
+            count += 1
+        return count
+
+
+def store_enabled() -> bool:
+    return os.getenv("ADF_ARTIFACT_STORE", "0").lower() in ("1", "true", "yes", "on")
+
+
+def get_artifact_store() -> Optional[ArtifactStore]:
+    """Return the process-wide store, or None unless ADF_ARTIFACT_STORE is on."""
+    global _store
+    if not store_enabled():
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ArtifactStore()
+    return _store
+
+
+def get_reader_store() -> Optional[ArtifactStore]:
+    """
+    The store to read logs from: the process-wide instance, opened on first
+    use if a database exists even when writing to it is off. None otherwise.
+    """
+    global _store
+    if _store is None:
+        if not STORE_PATH.exists():
+            return None
+        with _store_lock:
+            if _store is None:
+                _store = ArtifactStore()
+    return _store
+
+
+def read_log(path: Union[str, Path]) -> Optional[str]:
+    """
+    Contents of a step log, from disk or through the artifact index. While
+    the store is enabled the index wins: a plaintext file at the same path
+    is a leftover from before the store was turned on.
+    """
+    p = Path(path)
+    store = get_reader_store()
+    if store is not None and store_enabled():
+        text = store.get_path(p)
+        if text is not None:
+            return text
+    if p.exists():
+        return p.read_text(encoding="utf-8")
+    return store.get_path(p) if store is not None else None
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m core.artifact_store")
+    sub = parser.add_subparsers(dest="command", required=True)
+    cat = sub.add_parser("cat", help="print a stored log by its log_file path")
+    cat.add_argument("path")
+    imp = sub.add_parser("import", help="move plaintext *.log files into the store")
+    imp.add_argument("--dir", default=str(ARTIFACTS_DIR))
+    imp.add_argument("--keep", action="store_true", help="keep the original files")
+    sub.add_parser("gc", help="apply retention and compact")
+    sub.add_parser("stats")
+    args = parser.parse_args(argv)
+
+    if args.command == "cat":
+        text = read_log(args.path)
+        if text is None:
+            print(f"No log found for {args.path}", file=sys.stderr)
+            return 1
+        sys.stdout.write(text)
+        return 0
+
+    store = ArtifactStore()
+    if args.command == "import":
+        print(f"Imported {store.import_dir(Path(args.dir), remove=not args.keep)} logs")
+    elif args.command == "gc":
+        print(store.gc())
+    else:
+        print(store.stats())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -29,7 +29,7 @@ class CapabilityService:
                     model_name="gemini-pro",
                     is_active=os.getenv("MODEL_TYPE", "gemini").lower() == "gemini",
                     max_tokens=8192,
-                    supports_streaming=False,
+                    supports_streaming=True,
                     response_time_avg_ms=2000,
                 ),
                 ModelCapability(
@@ -66,6 +66,28 @@ class CapabilityService:
                         "response": "Hello! I'm doing well, thank you for asking.",
                     },
                 ),
+                APICapability(
+                    endpoint="/v1/delegate-task/stream",
+                    method="POST",
+                    description="Delegate task to AI model, streaming tokens as server-sent events",
+                    input_schema={"prompt": {"type": "string", "required": True}},
+                    output_schema={
+                        "content_type": "text/event-stream",
+                        "events": {
+                            "message": {"token": {"type": "string"}},
+                            "done": {"status": {"type": "string"}},
+                            "error": {"detail": {"type": "string"}},
+                        },
+                    },
+                    example_request={"prompt": "Hello, how are you?"},
+                    example_response={
+                        "stream": [
+                            'data: {"token": "Hello!"}',
+                            'data: {"token": " I\'m doing well."}',
+                            'event: done\ndata: {"status": "success"}',
+                        ]
+                    },
+                ),
                 APICapability(
                     endpoint="/v1/capabilities",
                     method="GET",
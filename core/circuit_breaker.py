@@ -0,0 +1,181 @@
+# core/circuit_breaker.py
+"""
+Per-provider circuit breakers with rolling error and latency windows.
+
+A breaker trips OPEN when, over the last ``window_size`` calls (and at least
+``min_calls``), the failure rate or the slow-call rate crosses its threshold.
+While OPEN, calls are rejected immediately with CircuitOpenError.  After
+``open_seconds`` a single HALF_OPEN probe is let through: success closes the
+breaker, failure re-opens it.
+
+State is exported to Prometheus by ``core.metrics``.
+"""
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the provider's breaker is open."""
+    pass
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, window_size: int = 20, min_calls: int = 5,
+                 failure_rate: float = 0.5, slow_call_sec: float = 10.0,
+                 slow_call_rate: float = 0.8, open_seconds: float = 30.0):
+        self.name = name
+        self.window_size = window_size
+        self.min_calls = min_calls
+        self.failure_rate_threshold = failure_rate
+        self.slow_call_sec = slow_call_sec
+        self.slow_call_rate_threshold = slow_call_rate
+        self.open_seconds = open_seconds
+
+        self.state = CLOSED
+        self.opened_at: Optional[float] = None
+        self.rejected = 0
+        self.trips = 0
+        self._window: deque = deque(maxlen=window_size)  # (ok, slow) per call
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    # --- state machine ----------------------------------------------------
+
+    def allow(self) -> bool:
+        """Return True if a call may go through right now."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.open_seconds:
+                self.state = HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self, latency: float = 0.0) -> None:
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._close()
+                return
+            self._window.append((True, latency >= self.slow_call_sec))
+            self._evaluate()
+
+    def record_failure(self, latency: float = 0.0) -> None:
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._open()
+                return
+            self._window.append((False, latency >= self.slow_call_sec))
+            self._evaluate()
+
+    def release(self) -> None:
+        """Give back a HALF_OPEN probe whose call was abandoned (cancelled) without an outcome."""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probe_in_flight = False
+
+    def _evaluate(self) -> None:
+        calls = len(self._window)
+        if self.state != CLOSED or calls < self.min_calls:
+            return
+        failures = sum(1 for ok, _ in self._window if not ok)
+        slow = sum(1 for _, is_slow in self._window if is_slow)
+        if (failures / calls >= self.failure_rate_threshold
+                or slow / calls >= self.slow_call_rate_threshold):
+            self._open()
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self._probe_in_flight = False
+        self.trips += 1
+
+    def _close(self) -> None:
+        self.state = CLOSED
+        self.opened_at = None
+        self._probe_in_flight = False
+        self._window.clear()
+
+    # --- call helpers -----------------------------------------------------
+
+    def call(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run ``fn`` through the breaker; exceptions count as failures."""
+        if not self.allow():
+            raise CircuitOpenError(f"Circuit for '{self.name}' is open")
+        start = time.monotonic()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            self.record_failure(time.monotonic() - start)
+            raise
+        except BaseException:  # cancelled: no outcome, but free the probe slot
+            self.release()
+            raise
+        self.record_success(time.monotonic() - start)
+        return result
+
+    async def acall(self, fn: Callable, *args, **kwargs) -> Any:
+        """Async variant of call() for coroutine functions."""
+        if not self.allow():
+            raise CircuitOpenError(f"Circuit for '{self.name}' is open")
+        start = time.monotonic()
+        try:
+            result = await fn(*args, **kwargs)
+        except Exception:
+            self.record_failure(time.monotonic() - start)
+            raise
+        except BaseException:  # cancelled: no outcome, but free the probe slot
+            self.release()
+            raise
+        self.record_success(time.monotonic() - start)
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            calls = len(self._window)
+            failures = sum(1 for ok, _ in self._window if not ok)
+            slow = sum(1 for _, is_slow in self._window if is_slow)
+            return {
+                "name": self.name,
+                "state": self.state,
+                "calls": calls,
+                "failure_rate": failures / calls if calls else 0.0,
+                "slow_call_rate": slow / calls if calls else 0.0,
+                "rejected": self.rejected,
+                "trips": self.trips,
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_registry_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Return the process-wide breaker for a provider, creating it on first use."""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _registry_lock:
+            breaker = _breakers.get(name)
+            if breaker is None:
+                breaker = CircuitBreaker(
+                    name,
+                    failure_rate=float(os.getenv("ADF_CB_FAILURE_RATE", "0.5")),
+                    slow_call_sec=float(os.getenv("ADF_CB_SLOW_CALL_SEC", "10")),
+                    open_seconds=float(os.getenv("ADF_CB_OPEN_SECONDS", "30")),
+                )
+                _breakers[name] = breaker
+    return breaker
+
+
+def all_breakers() -> Dict[str, CircuitBreaker]:
+    return dict(_breakers)
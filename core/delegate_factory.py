@@ -0,0 +1,42 @@
+# core/delegate_factory.py
+import os
+from functools import lru_cache
+from typing import List
+
+from .llm_interface import LLMInterface
+
+
+def provider_chain() -> List[str]:
+    """
+    Providers to try in order. ADF_PROVIDER_CHAIN (e.g. "gemini,local")
+    enables failover; otherwise the single MODEL_TYPE provider is used.
+    """
+    chain = os.getenv("ADF_PROVIDER_CHAIN")
+    if chain:
+        return [name.strip().lower() for name in chain.split(",") if name.strip()]
+    return [os.getenv("MODEL_TYPE", "gemini").lower()]
+
+
+@lru_cache(maxsize=None)
+def get_delegate(model_type: str = None) -> LLMInterface:
+    """
+    Return the delegate selected by MODEL_TYPE ("gemini" or "local"),
+    matching the active model advertised by CapabilityService. With a
+    multi-provider ADF_PROVIDER_CHAIN a circuit-breaking FailoverDelegate
+    is returned instead.
+    """
+    if model_type is None:
+        chain = provider_chain()
+        if len(chain) > 1:
+            from .failover_delegate import FailoverDelegate
+            return FailoverDelegate(chain, get_delegate)
+        model_type = chain[0]
+
+    model_type = model_type.lower()
+    if model_type == "local":
+        from .local_llama_delegate import LocalLlamaDelegate
+        return LocalLlamaDelegate(model_name=os.getenv("LOCAL_MODEL_NAME", "llama3"))
+    if model_type == "gemini":
+        from .gemini_delegate import GeminiProDelegate
+        return GeminiProDelegate()
+    raise ValueError(f"Unknown MODEL_TYPE '{model_type}'")
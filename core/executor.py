@@ -4,10 +4,15 @@ import os
 import shutil
 import uuid
 import time
-from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Union
+
+from core.artifact_store import ARTIFACTS_DIR, get_artifact_store
+from core.profiling import StepProfiler, profile_mode
+from core.records import StepResult, StepSpec
+from core.run_history import get_history
+from core.sandbox_scheduler import OversizedJobError, get_scheduler
+from core.tracing import span
 
-ARTIFACTS_DIR = Path("orchestrator_artifacts")
 ARTIFACTS_DIR.mkdir(exist_ok=True)
 
 def save_step_log(task_id: str, step_idx: int, content: str) -> str:
@@ -17,13 +22,18 @@ def save_step_log(task_id: str, step_idx: int, content: str) -> str:
     
     # Add timestamp and metadata to the log content
     timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
-    enhanced_content = f"[{timestamp}] Task ID: {task_id}, Step: {step_idx}\n"
-    enhanced_content += "=" * 50 + "\n"
-    enhanced_content += content
-    enhanced_content += "\n" + "=" * 50 + "\n"
-    
+    header = f"[{timestamp}] Task ID: {task_id}, Step: {step_idx}\n"
+    header += "=" * 50 + "\n"
+    footer = "\n" + "=" * 50 + "\n"
+
+    # With ADF_ARTIFACT_STORE the body is de-duplicated and compressed;
+    # the header is kept as index metadata so it does not defeat that.
+    store = get_artifact_store()
+    if store is not None:
+        return store.put(task_id, step_idx, content, path, header=header, footer=footer)
+
     with open(path, "w", encoding="utf-8") as f:
-        f.write(enhanced_content)
+        f.write(header + content + footer)
     return str(path)
 
 def apply_patch(patch):
@@ -55,58 +65,64 @@ def run_instruction(instruction_path: str):
     if action == "apply_patch":
         apply_patch(instruction.get("patch", {}))
 
-def run_agent_task(task: Dict[str, Any]) -> Dict[str, Any]:
+def run_agent_task(task: Union[Dict[str, Any], StepSpec]) -> StepResult:
     """Enhanced task execution with improved logging and error handling"""
     start = time.time()
+    spec = StepSpec.from_dict(task)
+    if spec.id is None:
+        spec.id = uuid.uuid4().hex
     
     # Initialize result structure
-    result = {
-        "status": "started",
-        "task_id": task.get("id", uuid.uuid4().hex),
-        "step_index": task.get("_step_index", 1),
-        "start_time": start
-    }
+    result = StepResult(spec, spec.id, spec.step_index or 1, start_time=start)
     
-    try:
-        # Execute the task
-        execution_result = _dispatch_somehow(task)
-        result.update(execution_result)
-        result["status"] = "completed"
-        
-    except Exception as e:
-        result["status"] = "failed"
-        result["error"] = str(e)
-        result["output"] = f"Task execution failed: {e}"
+    # Opt-in profiling (ADF_PROFILE or the instruction's "profile" flag)
+    profiler = StepProfiler(result.task_id, result.step_index, profile_mode(spec), ARTIFACTS_DIR)
+
+    with span("step", kind="step", task_id=result.task_id, step_index=result.step_index) as step_span:
+        try:
+            # Execute the task
+            with profiler, span(spec.action or "unknown", kind="action"):
+                execution_result = _dispatch_somehow(spec)
+            result.output = execution_result.get("output", "")
+            for key, value in execution_result.items():
+                # Handlers may return extra keys; they stay reachable as result[key]
+                result[key] = value
+            result.status = "completed"
+
+        except Exception as e:
+            result.status = "failed"
+            result.error = str(e)
+            result.output = f"Task execution failed: {e}"
+        step_span.set_attribute("status", result.status)
     
     # Calculate duration
     end = time.time()
-    result["duration_sec"] = round(end - start, 2)
-    result["end_time"] = end
-    
-    # Get full output for logging
-    full_output = result.get("output", "")
-    if result.get("error"):
-        full_output += f"\nERROR: {result['error']}"
-    
-    result["full_output"] = full_output
+    result.duration_sec = round(end - start, 2)
+    result.end_time = end
     
-    # Enhanced logging with the improved save_step_log function
-    task_id = result["task_id"]
-    step_idx = result["step_index"]
-    
-    # Create detailed log content
+    # Create detailed log content (full_output is derived from output + error)
     log_content = f"Task Execution Report\n"
-    log_content += f"Status: {result['status']}\n"
-    log_content += f"Duration: {result['duration_sec']} seconds\n"
-    log_content += f"Task Details: {json.dumps(task, indent=2)}\n\n"
+    log_content += f"Status: {result.status}\n"
+    log_content += f"Duration: {result.duration_sec} seconds\n"
+    log_content += f"Task Details: {spec.to_json()}\n\n"
     log_content += "Output:\n"
-    log_content += full_output
+    log_content += result.full_output
     
-    result["log_file"] = save_step_log(task_id, step_idx, log_content)
+    result.log_file = save_step_log(result.task_id, result.step_index, log_content)
+    if profiler.files:
+        result.profile_files = profiler.files
+
+    # Append to the queryable run history (python -m core.run_history)
+    history = get_history()
+    if history is not None:
+        try:
+            history.record_step(result)
+        except Exception as e:
+            print(f"Warning: could not record run history: {e}")
     
     return result
 
-def _dispatch_somehow(task: Dict[str, Any]) -> Dict[str, Any]:
+def _dispatch_somehow(task: StepSpec) -> Dict[str, Any]:
     """Enhanced stub function for task execution with more detailed simulation"""
     action = task.get("action", "unknown")
     
@@ -153,24 +169,35 @@ def main():
                 print(f"Memory: {sandbox['memory']}")
             if 'network' in sandbox:
                 print(f"Network: {sandbox['network']}")
+            try:
+                result = get_scheduler().submit(instruction).result()
+            except OversizedJobError as e:
+                result = {"status": "rejected", "output": str(e)}
+            print(result.get("output", ""))
+            print(f"Sandbox run finished with status: {result['status']}")
+            sys.exit(0 if result["status"] == "sandboxed" else 1)
 
         action = instruction.get("action")
         print(f"Sandboxed execution: {action}")
 
         # Enhanced execution using the improved run_agent_task
-        task_data = {
-            "id": instruction.get("id", uuid.uuid4().hex),
-            "action": action,
-            "patch": instruction.get("patch"),
-            "command": instruction.get("command"),
-            "_step_index": 1
-        }
+        task_data = StepSpec(
+            id=instruction.get("id", uuid.uuid4().hex),
+            action=action,
+            patch=instruction.get("patch"),
+            command=instruction.get("command"),
+            step_index=1,
+            profile=instruction.get("profile"),
+        )
         
-        result = run_agent_task(task_data)
+        with span(instruction.get("id", "plan"), kind="plan", action=action):
+            result = run_agent_task(task_data)
         
-        print(f"Task completed with status: {result['status']}")
-        print(f"Duration: {result['duration_sec']} seconds")
-        print(f"Log saved to: {result['log_file']}")
+        print(f"Task completed with status: {result.status}")
+        print(f"Duration: {result.duration_sec} seconds")
+        print(f"Log saved to: {result.log_file}")
+        for kind, path in (result.profile_files or {}).items():
+            print(f"Profile ({kind}) saved to: {path}")
         
         if action == "apply_patch":
             apply_patch(instruction.get("patch", {}))
@@ -0,0 +1,105 @@
+# core/failover_delegate.py
+import time
+from typing import Callable, List
+
+from .circuit_breaker import get_breaker
+from .llm_interface import LLMInterface
+
+
+class DelegateError(Exception):
+    """A delegate returned its "Error: ..." sentinel instead of a response."""
+    pass
+
+
+def check_response(response: str) -> str:
+    """Raise DelegateError for a delegate's swallowed "Error: ..." response."""
+    if isinstance(response, str) and response.startswith("Error:"):
+        raise DelegateError(response)
+    return response
+
+
+class FailoverDelegate(LLMInterface):
+    """
+    Tries each provider in a configured chain (e.g. gemini -> local llama),
+    skipping any whose circuit breaker is open so failover is immediate.
+    """
+
+    def __init__(self, chain: List[str], factory: Callable[[str], LLMInterface]):
+        self.chain = chain
+        self.factory = factory
+        print(f"Initialized Failover Delegate with chain: {' -> '.join(chain)}")
+
+    def _delegate(self, name: str) -> LLMInterface:
+        return self.factory(name)
+
+    def generate_response(self, prompt: str) -> str:
+        for name in self.chain:
+            breaker = get_breaker(name)
+            if not breaker.allow():
+                continue
+            start = time.monotonic()
+            try:
+                response = check_response(self._delegate(name).generate_response(prompt))
+            except Exception as e:
+                breaker.record_failure(time.monotonic() - start)
+                print(f"Provider '{name}' failed, failing over: {e}")
+                continue
+            except BaseException:  # cancelled: no outcome, but free the probe slot
+                breaker.release()
+                raise
+            breaker.record_success(time.monotonic() - start)
+            return response
+        return "Error: All AI model providers are unavailable."
+
+    async def agenerate_response(self, prompt: str) -> str:
+        for name in self.chain:
+            breaker = get_breaker(name)
+            if not breaker.allow():
+                continue
+            start = time.monotonic()
+            try:
+                response = check_response(await self._delegate(name).agenerate_response(prompt))
+            except Exception as e:
+                breaker.record_failure(time.monotonic() - start)
+                print(f"Provider '{name}' failed, failing over: {e}")
+                continue
+            except BaseException:  # cancelled: no outcome, but free the probe slot
+                breaker.release()
+                raise
+            breaker.record_success(time.monotonic() - start)
+            return response
+        return "Error: All AI model providers are unavailable."
+
+    async def astream_response(self, prompt: str):
+        """Fails over only until the first token; after that the stream is committed."""
+        for name in self.chain:
+            breaker = get_breaker(name)
+            if not breaker.allow():
+                continue
+            start = time.monotonic()
+            try:
+                stream = self._delegate(name).astream_response(prompt)
+            except Exception as e:
+                breaker.record_failure(time.monotonic() - start)
+                print(f"Provider '{name}' failed, failing over: {e}")
+                continue
+            try:
+                first = check_response(await stream.__anext__())
+            except StopAsyncIteration:
+                breaker.record_success(time.monotonic() - start)
+                return
+            except Exception as e:
+                breaker.record_failure(time.monotonic() - start)
+                await stream.aclose()
+                print(f"Provider '{name}' failed, failing over: {e}")
+                continue
+            except BaseException:  # CancelledError / GeneratorExit before the first token
+                breaker.release()
+                await stream.aclose()
+                raise
+            breaker.record_success(time.monotonic() - start)
+            yield first
+            async for token in stream:
+                yield token
+            return
+        yield "Error: All AI model providers are unavailable."
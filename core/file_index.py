@@ -0,0 +1,230 @@
+# core/file_index.py
+"""
+Workspace file index shared by every step of a run.
+
+Plans often contain several ``transform`` steps over overlapping globs
+(``docs/**/*.md``, ``docs/api/*.md`` ...).  The index caches directory
+listings and file contents so each directory is scanned and each file read
+once per run, not once per step:
+
+* listings are keyed by the directory's ``st_mtime_ns``, which changes
+  whenever an entry is added, removed or renamed;
+* contents are keyed by ``(st_ino, st_mtime_ns, st_size)``; files over
+  ``MMAP_THRESHOLD_BYTES`` are memory-mapped instead of copied.  In-memory
+  copies are LRU-bounded by ``ADF_INDEX_CACHE_MB`` and mappings by
+  ``ADF_INDEX_MAX_MMAPS``.  Evicting a mapping only drops the index's
+  reference; it is unmapped when the last caller holding it lets go.
+
+Every lookup revalidates with one ``stat`` call, so edits between steps are
+picked up without a watcher.  Glob expansion lists the directories of each
+tree level concurrently (``os.scandir`` releases the GIL).
+"""
+import mmap
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union
+
+MMAP_THRESHOLD_BYTES = int(os.getenv("ADF_INDEX_MMAP_BYTES", str(1024 * 1024)))
+CACHE_BYTES = int(os.getenv("ADF_INDEX_CACHE_MB", "64")) * 1024 * 1024
+MAX_MMAPS = int(os.getenv("ADF_INDEX_MAX_MMAPS", "64"))
+SCAN_THREADS = 8
+
+_MAGIC = re.compile(r"[*?\[]")
+
+
+def _segment_regex(segment: str) -> str:
+    """Translate one glob path segment; wildcards never cross ``/``."""
+    out, i = [], 0
+    while i < len(segment):
+        c = segment[i]
+        if c == "*":
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            end = segment.find("]", i + 2)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                body = segment[i + 1:end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = end
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+def compile_glob(pattern: str) -> Tuple[str, "re.Pattern", Optional[int]]:
+    """
+    Split ``pattern`` into (base directory, regex over paths relative to it,
+    max depth). Depth is None when the pattern contains ``**``.
+    """
+    parts = pattern.replace(os.sep, "/").split("/")
+    base = []
+    while len(parts) > 1 and not _MAGIC.search(parts[0]):
+        base.append(parts.pop(0))
+    regex = ""
+    for i, part in enumerate(parts):
+        last = i == len(parts) - 1
+        if part == "**":
+            regex += ".*" if last else "(?:[^/]+/)*"
+        else:
+            regex += _segment_regex(part) + ("" if last else "/")
+    depth = None if "**" in parts else len(parts)
+    return "/".join(base) or ".", re.compile(regex + r"\Z"), depth
+
+
+class FileIndex:
+    def __init__(self, cache_bytes: int = CACHE_BYTES, mmap_threshold: int = MMAP_THRESHOLD_BYTES,
+                 max_mmaps: int = MAX_MMAPS):
+        self.cache_bytes = cache_bytes
+        self.mmap_threshold = mmap_threshold
+        self.max_mmaps = max_mmaps
+        self.hits = 0
+        self.misses = 0
+        self._dirs: Dict[str, Tuple[int, List[Tuple[str, bool]]]] = {}
+        self._contents: "OrderedDict[str, Tuple[tuple, Union[bytes, mmap.mmap]]]" = OrderedDict()
+        self._cached_bytes = 0
+        self._mmaps = 0
+        self._lock = threading.Lock()
+
+    # --- listings -----------------------------------------------------------
+
+    def listdir(self, path: str) -> List[Tuple[str, bool]]:
+        """[(name, is_dir)] for a directory, rescanned only if it changed."""
+        mtime = os.stat(path).st_mtime_ns
+        cached = self._dirs.get(path)
+        if cached is not None and cached[0] == mtime:
+            self.hits += 1
+            return cached[1]
+        self.misses += 1
+        with os.scandir(path) as it:
+            entries = [(e.name, e.is_dir()) for e in it]
+        self._dirs[path] = (mtime, entries)
+        return entries
+
+    def _safe_listdir(self, path: str) -> List[Tuple[str, bool]]:
+        try:
+            return self.listdir(path)
+        except OSError:
+            return []
+
+    def glob(self, pattern: str, include_hidden: bool = False) -> List[str]:
+        """
+        Sorted files matching ``pattern`` (``**`` spans directories). Like
+        ``glob.glob(..., recursive=True)``, hidden entries are skipped unless
+        ``include_hidden`` is set.
+        """
+        base, regex, max_depth = compile_glob(pattern)
+        if not os.path.isdir(base):
+            return []
+        prefix = "" if base == "." else base + "/"
+        matches = []
+        level, depth = [""], 0
+        with ThreadPoolExecutor(max_workers=SCAN_THREADS) as pool:
+            while level and (max_depth is None or depth < max_depth):
+                depth += 1
+                listings = pool.map(self._safe_listdir, [prefix + d if d else base for d in level])
+                next_level = []
+                for rel_dir, entries in zip(level, listings):
+                    for name, is_dir in entries:
+                        if name.startswith(".") and not include_hidden:
+                            continue
+                        rel = f"{rel_dir}/{name}" if rel_dir else name
+                        if is_dir:
+                            next_level.append(rel)
+                        elif regex.match(rel):
+                            matches.append(prefix + rel)
+                level = next_level
+        return sorted(matches)
+
+    # --- contents -----------------------------------------------------------
+
+    def read_bytes(self, path: str) -> Union[bytes, mmap.mmap]:
+        """File contents, from cache when its (inode, mtime, size) is unchanged."""
+        st = os.stat(path)
+        key = (st.st_ino, st.st_mtime_ns, st.st_size)
+        with self._lock:
+            cached = self._contents.get(path)
+            if cached is not None and cached[0] == key:
+                self._contents.move_to_end(path)
+                self.hits += 1
+                return cached[1]
+        self.misses += 1
+        with open(path, "rb") as f:
+            if st.st_size >= self.mmap_threshold:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                data = f.read()
+        with self._lock:
+            self._evict(path)
+            self._contents[path] = (key, data)
+            if isinstance(data, bytes):
+                self._cached_bytes += len(data)
+            else:
+                self._mmaps += 1
+            # Copies are bounded by size, mappings by count; oldest go first.
+            for oldest, (_, cached) in list(self._contents.items()):
+                if oldest == path:
+                    break
+                if isinstance(cached, bytes) and self._cached_bytes > self.cache_bytes:
+                    self._evict(oldest)
+                elif not isinstance(cached, bytes) and self._mmaps > self.max_mmaps:
+                    self._evict(oldest)
+        return data
+
+    def count_lines(self, path: str) -> int:
+        data = self.read_bytes(path)
+        if isinstance(data, bytes):
+            return data.count(b"\n")
+        # mmap has no count(); scan it in 1 MiB windows without copying the file.
+        view, window = memoryview(data), 1 << 20
+        try:
+            return sum(bytes(view[i:i + window]).count(b"\n") for i in range(0, len(view), window))
+        finally:
+            view.release()
+
+    def read_text(self, path: str, encoding: str = "utf-8") -> str:
+        return bytes(self.read_bytes(path)).decode(encoding)
+
+    def _evict(self, path: str) -> None:
+        entry = self._contents.pop(path, None)
+        if entry is None:
+            return
+        data = entry[1]
+        if isinstance(data, bytes):
+            self._cached_bytes -= len(data)
+        else:
+            # Not closed here: callers may still hold it; it unmaps when unreferenced
+            self._mmaps -= 1
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        """Drop one path (or everything) from the cache."""
+        with self._lock:
+            if path is None:
+                for cached in list(self._contents):
+                    self._evict(cached)
+                self._dirs.clear()
+            else:
+                self._evict(path)
+                self._dirs.pop(path, None)
+
+
+_index: Optional[FileIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_file_index() -> FileIndex:
+    """Return the process-wide index shared by all steps."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = FileIndex()
+    return _index
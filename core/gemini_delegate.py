@@ -1,24 +1,187 @@
 import os
+import threading
+import time
+import datetime
+from collections import OrderedDict
 import google.generativeai as genai
 from .llm_interface import LLMInterface
+from .provider_registry import gemini_model_key, get_gemini_model, get_registry
+from .tracing import span
+
+try:  # context caching ships in newer google-generativeai releases
+    from google.generativeai import caching
+except ImportError:
+    caching = None
+
+# Gemini only accepts cached contents above this size
+CONTEXT_CACHE_MIN_TOKENS = 32768
+CONTEXT_CACHE_TTL_SEC = int(os.getenv("GEMINI_CONTEXT_CACHE_TTL", "3600"))
+CONTEXT_CACHE_MAX_ENTRIES = int(os.getenv("GEMINI_CONTEXT_CACHE_MAX_ENTRIES", "16"))
+
+
+class GeminiContextCache:
+    """
+    Uploads a prompt's shared prefix (preamble + context) once as Gemini
+    cached content for the delegate's model and reuses it for every step
+    with the same prefix.  At most ``max_entries`` prefixes are kept; evicted
+    and expired entries are deleted server-side too.
+    """
+
+    def __init__(self, model_name: str, ttl_sec: int = CONTEXT_CACHE_TTL_SEC,
+                 max_entries: int = CONTEXT_CACHE_MAX_ENTRIES):
+        self.model_name = model_name
+        self.ttl_sec = ttl_sec
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # prefix digest -> (cached content, expires at)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _delete(cached) -> None:
+        try:
+            cached.delete()
+        except Exception as e:
+            print(f"Warning: could not delete Gemini cached content: {e}")
+
+    def model_for(self, prompt):
+        """Return a model bound to the cached prefix, or None if not cacheable."""
+        if caching is None or sum(f.tokens for f in prompt.prefix) < CONTEXT_CACHE_MIN_TOKENS:
+            return None
+        key = prompt.prefix_digest
+        stale = []
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= time.time():
+                stale.append(self._entries.pop(key)[0])
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is None:
+            # Upload outside the lock so a slow create does not hold up other prefixes
+            entry = self._create(key, prompt, stale)
+        for cached in stale:
+            self._delete(cached)
+        if entry is None:
+            return None
+        return genai.GenerativeModel.from_cached_content(cached_content=entry[0])
+
+    def _create(self, key: str, prompt, stale: list):
+        """Upload the prefix and publish it; returns the entry now cached for ``key``."""
+        try:
+            cached = caching.CachedContent.create(
+                model=self.model_name,
+                contents=[f.text for f in prompt.prefix],
+                ttl=datetime.timedelta(seconds=self.ttl_sec),
+            )
+        except Exception as e:
+            print(f"Gemini context caching unavailable, sending full prompt: {e}")
+            return None
+        with self._lock:
+            current = self._entries.get(key)
+            if current is not None and current[1] > time.time():
+                # Another thread published this prefix while we uploaded; keep theirs
+                stale.append(cached)
+                self._entries.move_to_end(key)
+                return current
+            if current is not None:
+                stale.append(current[0])
+            # Refresh a little before the server-side TTL runs out
+            entry = (cached, time.time() + self.ttl_sec * 0.9)
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                stale.append(self._entries.popitem(last=False)[1][0])
+            return entry
+
+    def close(self) -> None:
+        """Delete every cached content this process created."""
+        with self._lock:
+            entries, self._entries = list(self._entries.values()), OrderedDict()
+        for cached, _ in entries:
+            self._delete(cached)
+
+
+_context_caches = {}
+_context_caches_lock = threading.Lock()
+
+
+def get_context_cache(model_name: str) -> GeminiContextCache:
+    """The process-wide cache for ``model_name``; its cleanup is registered once."""
+    cache = _context_caches.get(model_name)
+    if cache is None:
+        with _context_caches_lock:
+            cache = _context_caches.get(model_name)
+            if cache is None:
+                cache = GeminiContextCache(model_name)
+                _context_caches[model_name] = cache
+                get_registry().on_shutdown(cache.close)
+    return cache
+
 
 class GeminiProDelegate(LLMInterface):
     """Delegate for interacting with the Google Gemini Pro model."""
 
+    MODEL_NAME = "gemini-pro"
+
     def __init__(self):
         """Initializes the Gemini Pro delegate."""
         api_key = os.getenv('GEMINI_API_KEY')
         if not api_key:
             raise ValueError("GEMINI_API_KEY environment variable not set.")
         
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-pro')
+        self.api_key = api_key
+        self._model_key = gemini_model_key(self.MODEL_NAME, api_key)
+        get_gemini_model(self.MODEL_NAME, api_key)
+        self.context_cache = get_context_cache(self.MODEL_NAME)
+
+    @property
+    def model(self):
+        """The shared GenerativeModel, rebuilt by the registry if it turned unhealthy."""
+        return get_gemini_model(self.MODEL_NAME, self.api_key)
 
     def generate_response(self, prompt: str) -> str:
         """Generates a response using the Gemini Pro model."""
         try:
-            response = self.model.generate_content(prompt)
+            with span("gemini.generate_content", kind="provider", model="gemini-pro"), \
+                    get_registry().track(self._model_key):
+                response = self.model.generate_content(prompt)
+            return response.text
+        except Exception as e:
+            print(f"Error generating response from Gemini: {e}")
+            return "Error: Could not get a response from the AI model."
+
+    def generate_prompt(self, prompt) -> str:
+        """Generates a response for an AssembledPrompt, reusing cached context."""
+        model = self.context_cache.model_for(prompt)
+        if model is None:
+            return self.generate_response(prompt.render())
+        try:
+            with span("gemini.generate_content", kind="provider", model=self.context_cache.model_name,
+                      cached_prefix=prompt.prefix_digest), get_registry().track(self._model_key):
+                response = model.generate_content(prompt.fragments[-1].text)
+            return response.text
+        except Exception as e:
+            print(f"Error generating response from Gemini: {e}")
+            return "Error: Could not get a response from the AI model."
+
+    async def agenerate_response(self, prompt: str) -> str:
+        """Generates a response using Gemini's native async client."""
+        try:
+            with span("gemini.generate_content_async", kind="provider", model="gemini-pro"), \
+                    get_registry().track(self._model_key):
+                response = await self.model.generate_content_async(prompt)
             return response.text
         except Exception as e:
             print(f"Error generating response from Gemini: {e}")
-            return "Error: Could not get a response from the AI model."
\ No newline at end of file
+            return "Error: Could not get a response from the AI model."
+
+    def stream_response(self, prompt: str):
+        """Streams response chunks from Gemini (generate_content(stream=True))."""
+        for chunk in self.model.generate_content(prompt, stream=True):
+            if chunk.text:
+                yield chunk.text
+
+    async def astream_response(self, prompt: str):
+        """Async variant of stream_response."""
+        response = await self.model.generate_content_async(prompt, stream=True)
+        async for chunk in response:
+            if chunk.text:
+                yield chunk.text
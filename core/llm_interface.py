@@ -1,4 +1,18 @@
+import asyncio
 from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Awaitable, Iterator, List, Optional
+
+
+def translation_prompt(text: str, target_lang: str, context: Optional[str] = None) -> str:
+    """
+    Prompt shared by every delegate's translate()/atranslate(). ``context`` is
+    the text preceding a chunk of a longer document, given for continuity only.
+    """
+    if context:
+        return (f"Preceding text, for context only (do not translate it):\n{context}\n\n"
+                f"Translate to {target_lang}: {text}")
+    return f"Translate to {target_lang}: {text}"
+
 
 class LLMInterface(ABC):
     """
@@ -11,4 +25,60 @@ class LLMInterface(ABC):
         """
         [cite_start]Generates a response from the LLM based on the given prompt. [cite: 78]
         """
-        pass
\ No newline at end of file
+        pass
+
+    async def agenerate_response(self, prompt: str) -> str:
+        """
+        Async variant of generate_response. Delegates without a native async
+        client are offloaded to a worker thread so the event loop never blocks.
+        """
+        return await asyncio.to_thread(self.generate_response, prompt)
+
+    def generate_prompt(self, prompt) -> str:
+        """
+        Generates a response for an AssembledPrompt (see core.prompt_builder).
+        Delegates with provider-side context caching override this to upload
+        the shared prefix only once.
+        """
+        return self.generate_response(prompt.render())
+
+    def stream_response(self, prompt: str) -> Iterator[str]:
+        """
+        Yields the response in chunks as the model produces them.
+        Delegates without streaming support yield the full response once.
+        """
+        yield self.generate_response(prompt)
+
+    async def astream_response(self, prompt: str) -> AsyncIterator[str]:
+        """Async variant of stream_response."""
+        yield await self.agenerate_response(prompt)
+
+    def translate(self, text: str, target_lang: str, context: Optional[str] = None) -> str:
+        """Translates text using the delegate's model."""
+        return self.generate_response(translation_prompt(text, target_lang, context))
+
+    async def atranslate(self, text: str, target_lang: str, context: Optional[str] = None) -> str:
+        """Async variant of translate."""
+        return await self.agenerate_response(translation_prompt(text, target_lang, context))
+
+
+async def agather(*aws: Awaitable[Any], limit: Optional[int] = None,
+                  return_exceptions: bool = True) -> List[Any]:
+    """
+    Run several delegate calls concurrently and return results in order.
+
+    Fan one prompt out to several models or languages, e.g.
+    ``await agather(gemini.agenerate_response(p), llama.agenerate_response(p))``.
+    ``limit`` bounds how many calls are in flight; with ``return_exceptions``
+    one failing call does not cancel the others.
+    """
+    if limit is None:
+        return await asyncio.gather(*aws, return_exceptions=return_exceptions)
+
+    semaphore = asyncio.Semaphore(limit)
+
+    async def _bounded(aw):
+        async with semaphore:
+            return await aw
+
+    return await asyncio.gather(*(_bounded(aw) for aw in aws), return_exceptions=return_exceptions)
@@ -1,11 +1,21 @@
+import json
+import os
+import httpx
 import requests
 from .llm_interface import LLMInterface
+from .provider_registry import get_http_session
+from .tracing import span
 
 class LocalLlamaDelegate(LLMInterface):
     """Delegate for interacting with a local LLM via an API endpoint (e.g., Ollama)."""
-    def __init__(self, api_url: str = "http://localhost:11434/api/generate", model_name: str = "llama3"):
+    def __init__(self, api_url: str = "http://localhost:11434/api/generate", model_name: str = "llama3",
+                 timeout: float = None):
         self.api_url = api_url
         self.model_name = model_name
+        # Bound each call so a hung local server fails fast enough to fail over
+        if timeout is None and os.getenv("LOCAL_LLM_TIMEOUT"):
+            timeout = float(os.getenv("LOCAL_LLM_TIMEOUT"))
+        self.timeout = timeout
         print(f"Initialized Local Llama Delegate with model: {self.model_name}")
 
     def generate_response(self, prompt: str) -> str:
@@ -18,7 +28,8 @@ class LocalLlamaDelegate(LLMInterface):
                 "prompt": prompt,
                 "stream": False 
             }
-            response = requests.post(self.api_url, json=payload)
+            with span("ollama.generate", kind="provider", model=self.model_name):
+                response = get_http_session(self.api_url).post(self.api_url, json=payload, timeout=self.timeout)
             response.raise_for_status()
             
             return response.json().get("response", "Error: No response field in local model reply.")
@@ -28,4 +39,55 @@ class LocalLlamaDelegate(LLMInterface):
             return "Error: Could not get a response from the local AI model."
         except Exception as e:
             print(f"An unexpected error occurred: {e}")
-            return "Error: An unexpected error occurred with the local model."
\ No newline at end of file
+            return "Error: An unexpected error occurred with the local model."
+
+    async def agenerate_response(self, prompt: str) -> str:
+        """Generates a response from the local LLM without blocking the event loop."""
+        try:
+            payload = {
+                "model": self.model_name,
+                "prompt": prompt,
+                "stream": False
+            }
+            with span("ollama.generate_async", kind="provider", model=self.model_name):
+                async with httpx.AsyncClient(timeout=self.timeout) as client:
+                    response = await client.post(self.api_url, json=payload)
+            response.raise_for_status()
+
+            return response.json().get("response", "Error: No response field in local model reply.")
+
+        except httpx.HTTPError as e:
+            print(f"Error calling local model: {e}")
+            return "Error: Could not get a response from the local AI model."
+        except Exception as e:
+            print(f"An unexpected error occurred: {e}")
+            return "Error: An unexpected error occurred with the local model."
+
+    def stream_response(self, prompt: str):
+        """Streams tokens from Ollama's NDJSON streaming API."""
+        payload = {"model": self.model_name, "prompt": prompt, "stream": True}
+        with get_http_session(self.api_url).post(self.api_url, json=payload, stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                data = json.loads(line)
+                if data.get("response"):
+                    yield data["response"]
+                if data.get("done"):
+                    break
+
+    async def astream_response(self, prompt: str):
+        """Async variant of stream_response; closing the generator drops the connection."""
+        payload = {"model": self.model_name, "prompt": prompt, "stream": True}
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            async with client.stream("POST", self.api_url, json=payload) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    data = json.loads(line)
+                    if data.get("response"):
+                        yield data["response"]
+                    if data.get("done"):
+                        break
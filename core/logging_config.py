@@ -1,22 +1,201 @@
-import structlog
+"""
+Structured logging that stays off the hot path.
+
+Callers only build a ``LogRecord`` and put it on an in-process queue; a
+single ``QueueListener`` thread renders the JSON and writes stdout, so a
+slow stdout never stalls a worker.  When the queue is full the record is
+dropped and counted instead of blocking.
+
+Before a record is queued it passes two cheap filters:
+    * a per-logger token bucket (``ADF_LOG_RATE_LIMIT`` records/sec, burst of
+      the same size; 0 disables it), and
+    * sampling of high-volume events: records logged with
+      ``extra={"sampled": True}`` are kept with probability
+      ``ADF_LOG_SAMPLE_RATE``.  Warnings and above are never sampled.
+Message interpolation, structlog processing and JSON encoding all run in
+the listener thread, so a suppressed event costs a filter call.  Because
+rendering is deferred, pass values that are not mutated after logging.
+
+JSON is encoded with ``orjson`` when it is installed.  Without ``structlog``
+stdlib records are rendered by ``JsonFormatter`` directly.
+
+Configuration (environment):
+    LOG_LEVEL             minimum level (default INFO)
+    ADF_LOG_RATE_LIMIT    records/sec per logger (default 1000)
+    ADF_LOG_SAMPLE_RATE   fraction of sampled events kept (default 0.1)
+    ADF_LOG_QUEUE_SIZE    records buffered before dropping (default 10000)
+"""
+import atexit
+import json
 import logging
-import sys
+import logging.handlers
 import os
+import queue
+import random
+import sys
+import threading
+import time
+from typing import Dict, Optional
+
+try:
+    import structlog
+except ImportError:  # structlog is optional; stdlib records still log as JSON
+    structlog = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(obj, **_) -> str:
+    """Fast JSON encoding; non-serialisable values fall back to str()."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str).decode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), default=str, ensure_ascii=False)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Token bucket per logger name; excess records are dropped and counted.
+    Warnings and errors are never dropped.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst or rate
+        self._buckets: Dict[str, list] = {}  # name -> [tokens, last refill]
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate <= 0 or record.levelno >= logging.WARNING:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(record.name)
+            if bucket is None:
+                bucket = self._buckets[record.name] = [self.burst, now]
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return True
+            self.dropped += 1
+            return False
+
+
+class SamplingFilter(logging.Filter):
+    """Keep ``rate`` of the records marked ``extra={"sampled": True}``."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, "sampled", False) or record.levelno >= logging.WARNING:
+            return True
+        return self.rate >= 1 or random.random() < self.rate
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueue records without formatting them (QueueHandler.prepare would
+    render the message in the caller's thread) and never block on a full queue.
+    """
+
+    def __init__(self, q: queue.Queue):
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, for stdlib loggers when structlog is absent."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        event = {
+            "event": record.getMessage(),
+            "logger": record.name,
+            "level": record.levelname.lower(),
+            "timestamp": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+        }
+        if record.exc_info:
+            event["exception"] = self.formatException(record.exc_info)
+        return dumps(event)
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[LazyQueueHandler] = None
+
+
+def _stop_listener() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()  # drains what is still queued
+        _listener = None
+
+
+def _formatter() -> logging.Formatter:
+    if structlog is None:
+        return JsonFormatter()
+    pre_chain = [
+        structlog.stdlib.add_logger_name,
+        structlog.stdlib.add_log_level,
+        structlog.stdlib.ExtraAdder(),
+        structlog.processors.TimeStamper(fmt="ISO"),
+    ]
+    return structlog.stdlib.ProcessorFormatter(
+        foreign_pre_chain=pre_chain,
+        processors=[
+            structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+            structlog.stdlib.PositionalArgumentsFormatter(),
+            structlog.processors.StackInfoRenderer(),
+            structlog.processors.format_exc_info,
+            structlog.processors.UnicodeDecoder(),
+            structlog.processors.JSONRenderer(serializer=dumps),
+        ],
+    )
+
 
 def setup_logging():
     """Configure structured logging for production"""
-    
+    global _listener, _queue_handler
+    level = getattr(logging, os.getenv("LOG_LEVEL", "INFO"))
+
+    if _listener is None:
+        stream = logging.StreamHandler(sys.stdout)
+        stream.setFormatter(_formatter())
+        _queue_handler = LazyQueueHandler(queue.Queue(int(os.getenv("ADF_LOG_QUEUE_SIZE", "10000"))))
+        _queue_handler.addFilter(SamplingFilter(float(os.getenv("ADF_LOG_SAMPLE_RATE", "0.1"))))
+        _queue_handler.addFilter(RateLimitFilter(float(os.getenv("ADF_LOG_RATE_LIMIT", "1000"))))
+        _listener = logging.handlers.QueueListener(_queue_handler.queue, stream, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_stop_listener)
+
+        logging.getLogger().addHandler(_queue_handler)
+    logging.getLogger().setLevel(level)
+
+    if structlog is None:
+        return logging.getLogger("adf")
+
     structlog.configure(
         processors=[
             structlog.stdlib.filter_by_level,
             structlog.stdlib.add_logger_name,
             structlog.stdlib.add_log_level,
-            structlog.stdlib.PositionalArgumentsFormatter(),
             structlog.processors.TimeStamper(fmt="ISO"),
-            structlog.processors.StackInfoRenderer(),
-            structlog.processors.format_exc_info,
-            structlog.processors.UnicodeDecoder(),
-            structlog.processors.JSONRenderer()
+            # %-interpolation and rendering happen in the listener thread via ProcessorFormatter
+            structlog.stdlib.ProcessorFormatter.wrap_for_formatter,
         ],
         context_class=dict,
         logger_factory=structlog.stdlib.LoggerFactory(),
@@ -24,12 +203,15 @@ def setup_logging():
         cache_logger_on_first_use=True,
     )
 
-    logging.basicConfig(
-        format="%(message)s",
-        stream=sys.stdout,
-        level=getattr(logging, os.getenv("LOG_LEVEL", "INFO"))
-    )
-
     return structlog.get_logger()
 
-logger = setup_logging()
\ No newline at end of file
+
+def dropped_records() -> int:
+    """Records lost to rate limiting or a full queue since startup."""
+    if _queue_handler is None:
+        return 0
+    limited = sum(f.dropped for f in _queue_handler.filters if isinstance(f, RateLimitFilter))
+    return limited + _queue_handler.dropped
+
+
+logger = setup_logging()
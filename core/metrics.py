@@ -1,7 +1,52 @@
-﻿from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
+﻿"""
+Prometheus metrics for the API.
+
+Multiprocess mode: under gunicorn or ``uvicorn --workers N`` every worker
+has its own copy of the module-level metrics, so a scrape would only see
+whichever worker answered it.  Set ``PROMETHEUS_MULTIPROC_DIR`` to an empty,
+writable directory in the environment of the server (before this module is
+imported) and each worker writes its values to memory-mapped files there
+(``<type>_<pid>.db``); ``get_metrics`` aggregates all of them.
+
+Aggregation reads every worker's files, so its result is cached for
+``ADF_METRICS_CACHE_SEC`` seconds (default 1) between scrapes.  Workers
+that have exited are reaped at scrape time: their live gauges are dropped
+and their counter/histogram files are folded into ``<type>_archive.db`` and
+deleted, so totals are kept without the directory growing with every
+restarted worker.  Reaping and scraping hold a lock file in the directory,
+so a dead worker is never counted twice.  Under gunicorn also wire the
+hooks in ``gunicorn.conf.py``::
+
+    from core.metrics import child_exit, reset_multiprocess_dir
+    def on_starting(server): reset_multiprocess_dir()
+
+Circuit-breaker and sandbox-scheduler state is per process and is reported
+by the worker that serves the scrape.
+"""
+import os
+import threading
+from contextlib import contextmanager
+
+try:  # POSIX only; without it concurrent scrapes may fold the same worker twice
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# The value files must have a home before prometheus_client creates any metric
+if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+    os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST, REGISTRY
+from prometheus_client import CollectorRegistry, multiprocess
+from prometheus_client.mmap_dict import MmapedDict
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
 from fastapi import Response
+import re
 import time
 
+from core.circuit_breaker import CLOSED, HALF_OPEN, OPEN, all_breakers
+from core.sandbox_scheduler import current_scheduler
+
 # Metrics
 REQUEST_COUNT = Counter(
     "adf_requests_total", "Total requests", ["method", "endpoint", "status"]
@@ -13,6 +58,66 @@ SECURITY_EVENTS = Counter(
 )
 
 
+class CircuitBreakerCollector:
+    """Exports per-provider circuit breaker state at scrape time"""
+
+    STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def collect(self):
+        state = GaugeMetricFamily(
+            "adf_circuit_state", "Circuit state (0=closed, 1=half-open, 2=open)", labels=["provider"]
+        )
+        failure_rate = GaugeMetricFamily(
+            "adf_circuit_failure_rate", "Failure rate over the rolling window", labels=["provider"]
+        )
+        slow_rate = GaugeMetricFamily(
+            "adf_circuit_slow_call_rate", "Slow-call rate over the rolling window", labels=["provider"]
+        )
+        rejected = CounterMetricFamily(
+            "adf_circuit_rejected", "Calls rejected by an open circuit", labels=["provider"]
+        )
+        trips = CounterMetricFamily(
+            "adf_circuit_trips", "Times the circuit has opened", labels=["provider"]
+        )
+        for name, breaker in all_breakers().items():
+            snap = breaker.snapshot()
+            state.add_metric([name], self.STATE_VALUES[snap["state"]])
+            failure_rate.add_metric([name], snap["failure_rate"])
+            slow_rate.add_metric([name], snap["slow_call_rate"])
+            rejected.add_metric([name], snap["rejected"])
+            trips.add_metric([name], snap["trips"])
+        yield from (state, failure_rate, slow_rate, rejected, trips)
+
+
+REGISTRY.register(CircuitBreakerCollector())
+
+
+class SandboxSchedulerCollector:
+    """Exports sandbox scheduler utilisation at scrape time"""
+
+    def collect(self):
+        scheduler = current_scheduler()
+        if scheduler is None:
+            return
+        snap = scheduler.snapshot()
+        gauges = {
+            "adf_sandbox_cpu_capacity": ("Schedulable sandbox cores", snap["cpu_capacity"]),
+            "adf_sandbox_cpu_reserved": ("Cores reserved by running sandboxes", snap["cpu_reserved"]),
+            "adf_sandbox_memory_capacity_bytes": ("Schedulable sandbox memory", snap["memory_capacity"]),
+            "adf_sandbox_memory_reserved_bytes": ("Memory reserved by running sandboxes", snap["memory_reserved"]),
+            "adf_sandbox_running": ("Sandboxes running", snap["running"]),
+            "adf_sandbox_queued": ("Sandboxes waiting for resources", snap["queued"]),
+        }
+        for name, (doc, value) in gauges.items():
+            yield GaugeMetricFamily(name, doc, value=value)
+        yield CounterMetricFamily("adf_sandbox_started", "Sandboxes started", value=snap["started"])
+        yield CounterMetricFamily("adf_sandbox_wait_seconds", "Time sandboxes spent queued",
+                                  value=snap["wait_seconds"])
+
+
+REGISTRY.register(SandboxSchedulerCollector())
+
+
 class MetricsMiddleware:
     """Middleware to collect metrics"""
 
@@ -46,6 +151,129 @@ class MetricsMiddleware:
         await self.app(scope, receive, send_wrapper)
 
 
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+SCRAPE_CACHE_SEC = float(os.getenv("ADF_METRICS_CACHE_SEC", "1"))
+# Files a worker owns until it is reaped; archives and other gauge modes don't match
+_WORKER_FILE = re.compile(r"^(?:counter|histogram|summary|gauge_live\w*)_(\d+)\.db$")
+_ARCHIVED_TYPES = ("counter", "histogram", "summary")
+
+_scrape_registry = None
+_scrape_cache = (0.0, b"")
+_scrape_lock = threading.Lock()
+
+
+def multiprocess_enabled() -> bool:
+    return bool(MULTIPROC_DIR)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+@contextmanager
+def _dir_lock():
+    """Serialise reaping and reading across every process sharing MULTIPROC_DIR."""
+    if fcntl is None:
+        yield
+        return
+    with open(os.path.join(MULTIPROC_DIR, ".lock"), "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _archive_worker(pid: int) -> None:
+    """Drop a dead worker's live gauges and fold its other values into the archives."""
+    multiprocess.mark_process_dead(pid, MULTIPROC_DIR)
+    for typ in _ARCHIVED_TYPES:
+        path = os.path.join(MULTIPROC_DIR, f"{typ}_{pid}.db")
+        if not os.path.exists(path):
+            continue
+        archive = MmapedDict(os.path.join(MULTIPROC_DIR, f"{typ}_archive.db"))
+        try:
+            for key, value, timestamp, _ in MmapedDict.read_all_values_from_file(path):
+                total, _ = archive.read_value(key)
+                archive.write_value(key, total + value, timestamp)
+        finally:
+            archive.close()
+        os.remove(path)
+
+
+def reap_dead_workers() -> int:
+    """
+    Archive the value files of exited workers; returns how many were found.
+    Callers hold ``_dir_lock``.  Once reaped a worker has no files left, so a
+    later process that reuses its PID is tracked afresh.
+    """
+    if not multiprocess_enabled():
+        return 0
+    pids = set()
+    for name in os.listdir(MULTIPROC_DIR):
+        match = _WORKER_FILE.match(name)
+        if match:
+            pids.add(int(match.group(1)))
+    reaped = 0
+    for pid in pids:
+        if pid == os.getpid() or _pid_alive(pid):
+            continue
+        _archive_worker(pid)
+        reaped += 1
+    return reaped
+
+
+def child_exit(server, worker):
+    """gunicorn hook: archive the values of a worker that exited."""
+    if multiprocess_enabled():
+        with _dir_lock():
+            _archive_worker(worker.pid)
+
+
+def reset_multiprocess_dir() -> None:
+    """Remove value files left by a previous server run (call before forking workers)."""
+    if not multiprocess_enabled():
+        return
+    for name in os.listdir(MULTIPROC_DIR):
+        if name.endswith(".db"):
+            os.remove(os.path.join(MULTIPROC_DIR, name))
+
+
+def _registry():
+    global _scrape_registry
+    if not multiprocess_enabled():
+        return REGISTRY
+    if _scrape_registry is None:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry, path=MULTIPROC_DIR)
+        registry.register(CircuitBreakerCollector())
+        registry.register(SandboxSchedulerCollector())
+        _scrape_registry = registry
+    return _scrape_registry
+
+
+def render_metrics() -> bytes:
+    """The exposition text, aggregated across workers in multiprocess mode."""
+    global _scrape_cache
+    if not multiprocess_enabled():
+        return generate_latest(REGISTRY)
+    with _scrape_lock:
+        rendered_at, body = _scrape_cache
+        if time.monotonic() - rendered_at < SCRAPE_CACHE_SEC:
+            return body
+        with _dir_lock():
+            reap_dead_workers()
+            body = generate_latest(_registry())
+        _scrape_cache = (time.monotonic(), body)
+        return body
+
+
 def get_metrics():
     """Return Prometheus metrics"""
-    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+    return Response(render_metrics(), media_type=CONTENT_TYPE_LATEST)
@@ -1,6 +1,8 @@
 # core/orchestrator.py
 from typing import Any, Dict
 
+from core.tracing import span
+
 # Ensure actions registry exists
 _actions: dict[str, callable] = {}
 
@@ -15,7 +17,8 @@ def call_action(name: str, *args, **kwargs) -> Any:
     """Look up and execute a registered action by name."""
     if name not in _actions:
         raise ValueError(f"Action '{name}' not registered.")
-    return _actions[name](*args, **kwargs)
+    with span(name, kind="action"):
+        return _actions[name](*args, **kwargs)
 
 def create_context(**kwargs) -> Dict[str, Any]:
     """Factory for an execution context passed into actions."""
@@ -0,0 +1,191 @@
+# core/plan_compiler.py
+"""
+Pre-flight compiler for instruction sets.
+
+``compile_plan(path)`` loads an instruction file (a single instruction, a
+``{"steps": [...]}`` document or a bare list), then:
+
+1. validates every step against ``instructions/schema.json`` in one pass and
+   reports all errors together;
+2. resolves each step's agent (``select_agent_for_step``) and its handler
+   (built-in action or registered orchestrator action), and flags steps the
+   worker pool will run;
+3. collapses runs of ``noop`` steps with the same agent, priority and
+   capabilities into one.  ``apply_patch`` steps are never merged: each
+   patch's hunks refer to the file as the previous patch left it.
+
+The result is a compact JSON plan cached under
+``orchestrator_artifacts/plans/<sha>.json``, keyed by the file's contents
+and by everything compilation depends on (schema, built-in and registered
+actions, the agent map), so recompiling an unchanged file is a single read.  ``run_plan`` executes it
+without repeating any per-step resolution.
+
+    python -m core.plan_compiler instructions/big-trial.json [--run]
+"""
+import argparse
+import hashlib
+import json
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import jsonschema
+
+from core.actions import BUILTIN_ACTIONS, run_action
+from core.agent_registry import AGENT_CAPABILITY_MAP, select_agent_for_step
+from core.records import StepSpec
+from core.validator import SCHEMA, ValidationError
+from core.worker_pool import CPU_BOUND_ACTIONS
+
+PLANS_DIR = Path("orchestrator_artifacts") / "plans"
+PLAN_VERSION = 2
+
+def load_steps(doc: Union[dict, list]) -> List[dict]:
+    if isinstance(doc, list):
+        return doc
+    if "steps" in doc:
+        return doc["steps"] or []
+    return [doc]
+
+
+def validate_steps(steps: List[dict], source: str = "<plan>") -> None:
+    """Validate all steps at once; raises ValidationError listing every problem."""
+    validator = jsonschema.Draft7Validator(SCHEMA)
+    problems = []
+    for i, step in enumerate(steps, start=1):
+        for error in validator.iter_errors(step):
+            where = "/".join(str(p) for p in error.path) or "step"
+            problems.append(f"step {i} ({step.get('id', '?')}): {where}: {error.message}")
+    if problems:
+        raise ValidationError(f"{source} is invalid:\n  " + "\n  ".join(problems))
+
+
+@lru_cache(maxsize=256)
+def _agent_for(capabilities: Tuple[str, ...]) -> str:
+    return select_agent_for_step(list(capabilities))
+
+
+def resolve_handler(action: str) -> str:
+    """'builtin', 'registered' (orchestrator.register_action) or 'unknown'."""
+    if action in BUILTIN_ACTIONS:
+        return "builtin"
+    from core.orchestrator import _actions
+    return "registered" if action in _actions else "unknown"
+
+
+# Keys that differ between otherwise identical steps
+_IDENTITY_KEYS = ("id", "step_index", "merged_ids")
+
+
+def _mergeable(prev: dict, step: dict) -> bool:
+    # Only noops collapse, and only when every other field (agent, priority,
+    # risk, capabilities, params, extras) matches, so reports stay accurate
+    if not prev["action"] == step["action"] == "noop":
+        return False
+    keys = (prev.keys() | step.keys()).difference(_IDENTITY_KEYS)
+    return all(prev.get(k) == step.get(k) for k in keys)
+
+
+def _merge(prev: dict, step: dict) -> None:
+    prev.setdefault("merged_ids", [prev["id"]]).append(step["id"])
+
+
+def _environment_digest() -> str:
+    """Hash of everything besides the file that compile_steps depends on."""
+    from core.orchestrator import _actions
+    env = {
+        "schema": SCHEMA,
+        "builtin": sorted(BUILTIN_ACTIONS),
+        "registered": sorted(_actions),
+        "agents": {agent: sorted(caps) for agent, caps in AGENT_CAPABILITY_MAP.items()},
+        "cpu_bound": sorted(CPU_BOUND_ACTIONS),
+    }
+    return hashlib.sha256(json.dumps(env, sort_keys=True).encode()).hexdigest()
+
+
+def compile_steps(steps: List[dict]) -> List[dict]:
+    """Resolve agents/handlers and merge adjacent compatible steps."""
+    compiled: List[dict] = []
+    for step in steps:
+        spec = StepSpec.from_dict(step)
+        spec.params = spec.params or {}
+        if spec.agent is None:
+            spec.agent = _agent_for(tuple(spec.capabilities or ()))
+        out = spec.to_dict()
+        out["handler"] = resolve_handler(spec.action)
+        if spec.action in CPU_BOUND_ACTIONS:
+            out["cpu_bound"] = True
+        if compiled and _mergeable(compiled[-1], out):
+            _merge(compiled[-1], out)
+            continue
+        compiled.append(out)
+    for i, step in enumerate(compiled, start=1):
+        step["step_index"] = i
+    return compiled
+
+
+def compile_plan(path: Union[str, Path], use_cache: bool = True) -> Dict[str, Any]:
+    """Compile an instruction file, reusing the cached plan if the file is unchanged."""
+    raw = Path(path).read_bytes()
+    digest = hashlib.sha256(raw + f"|v{PLAN_VERSION}|{_environment_digest()}".encode()).hexdigest()[:32]
+    cache_path = PLANS_DIR / f"{digest}.json"
+    if use_cache and cache_path.exists():
+        return json.loads(cache_path.read_text(encoding="utf-8"))
+
+    doc = json.loads(raw)
+    steps = load_steps(doc)
+    validate_steps(steps, str(path))
+    plan = {
+        "version": PLAN_VERSION,
+        "id": doc.get("id") if isinstance(doc, dict) else None,
+        "source": str(path),
+        "sha": digest,
+        "input_steps": len(steps),
+        "steps": compile_steps(steps),
+    }
+    if use_cache:
+        PLANS_DIR.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text(json.dumps(plan, separators=(",", ":")), encoding="utf-8")
+    return plan
+
+
+def run_plan(plan: Dict[str, Any], safe_mode: bool = True) -> List[Tuple[str, bool, Any]]:
+    """Execute a compiled plan; returns (step id, ok, log path or result) per step."""
+    results = []
+    for step in plan["steps"]:
+        # The action span is opened by whichever dispatcher runs the step
+        if step["handler"] == "registered":
+            from core.orchestrator import call_action, create_context
+            result = call_action(step["action"], params=step.get("params"), context=create_context())
+            results.append((step["id"], True, result))
+        else:
+            ok, log = run_action(step, safe_mode=safe_mode)
+            results.append((step["id"], ok, log))
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m core.plan_compiler")
+    parser.add_argument("path")
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--run", action="store_true", help="execute the plan (dry-run actions)")
+    args = parser.parse_args(argv)
+
+    try:
+        plan = compile_plan(args.path, use_cache=not args.no_cache)
+    except ValidationError as e:
+        print(f"[ERROR] {e}", file=sys.stderr)
+        return 1
+    print(f"Plan {plan['sha']}: {plan['input_steps']} steps -> {len(plan['steps'])}")
+    for step in plan["steps"]:
+        merged = f" (merged {', '.join(step['merged_ids'])})" if "merged_ids" in step else ""
+        print(f"  {step['step_index']}. {step['id']} {step['action']} [{step['handler']}] -> {step['agent']}{merged}")
+    if args.run:
+        for step_id, ok, log in run_plan(plan):
+            print(f"  {'✅' if ok else '❌'} {step_id}: {log}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+# core/profiling.py
+"""
+Opt-in per-step sampling profiler.
+
+Enabled with ``ADF_PROFILE`` (``1``/``all``, ``wall`` or ``alloc``) or with an
+instruction-level ``"profile"`` flag, which wins when set (``false`` turns
+profiling off for that step even if ``ADF_PROFILE`` is set).  Each profiled
+step writes collapsed-stack files next to its step log, in the directory
+the executor passes in (``core.artifact_store.ARTIFACTS_DIR`` by default):
+
+    <task_id>_step<N>.wall.folded    wall-clock samples of the step's thread
+    <task_id>_step<N>.alloc.folded   bytes allocated during the step (tracemalloc)
+
+The ``wall`` sampler records where the thread is, whether it is running or
+waiting on I/O, so it is not a CPU-time profile; ``cpu`` is accepted as an
+older name for it.
+
+Both files load directly into speedscope or flamegraph.pl.
+"""
+import os
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from core.artifact_store import ARTIFACTS_DIR
+
+SAMPLE_INTERVAL_SEC = float(os.getenv("ADF_PROFILE_INTERVAL_MS", "5")) / 1000
+TRACEMALLOC_DEPTH = 25
+
+_MODES = {"wall": {"wall"}, "cpu": {"wall"}, "alloc": {"alloc"}, "all": {"wall", "alloc"}}
+
+
+def profile_mode(task: Dict[str, Any]) -> set:
+    """Resolve which profiles to capture for a task ("wall", "alloc" or both)."""
+    flag = task.get("_profile")
+    if flag is None:
+        flag = os.getenv("ADF_PROFILE", "")
+    flag = str(flag).strip().lower()
+    if flag in ("1", "true", "yes", "on"):
+        flag = "all"
+    return _MODES.get(flag, set())
+
+
+def _frame_stack(frame) -> str:
+    parts = []
+    while frame is not None:
+        code = frame.f_code
+        parts.append(f"{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join(reversed(parts))
+
+
+class _WallClockSampler(threading.Thread):
+    """Samples the target thread's Python stack at a fixed wall-clock interval."""
+
+    def __init__(self, target_thread_id: int, interval: float):
+        super().__init__(name="adf-profiler", daemon=True)
+        self.target = target_thread_id
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.target)
+            if frame is not None:
+                self.samples[_frame_stack(frame)] += 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+class StepProfiler:
+    """Context manager that profiles one step and records the artifact paths."""
+
+    def __init__(self, task_id: str, step_idx: int, modes: set, directory: Path = ARTIFACTS_DIR):
+        self.task_id = task_id
+        self.step_idx = step_idx
+        self.modes = modes
+        self.directory = Path(directory)
+        self.files: Dict[str, str] = {}
+        self._sampler: Optional[_WallClockSampler] = None
+        self._snapshot = None
+        self._started_tracemalloc = False
+
+    def __enter__(self) -> "StepProfiler":
+        # Start the sampler first so its own allocations stay out of the diff.
+        if "wall" in self.modes:
+            self._sampler = _WallClockSampler(threading.get_ident(), SAMPLE_INTERVAL_SEC)
+            self._sampler.start()
+        if "alloc" in self.modes:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(TRACEMALLOC_DEPTH)
+                self._started_tracemalloc = True
+            self._snapshot = tracemalloc.take_snapshot()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        after = None
+        if self._snapshot is not None:
+            after = tracemalloc.take_snapshot()
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+        if self._sampler is not None:
+            self._sampler.stop()
+            self.files["wall"] = self._write("wall", self._sampler.samples)
+        if after is not None:
+            self.files["alloc"] = self._write("alloc", self._alloc_stacks(after))
+
+    def _alloc_stacks(self, after) -> Counter:
+        stacks: Counter = Counter()
+        ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        before = self._snapshot.filter_traces(ignore)
+        for stat in after.filter_traces(ignore).compare_to(before, "traceback"):
+            if stat.size_diff <= 0:
+                continue
+            stack = ";".join(
+                f"{Path(fr.filename).name}:{fr.lineno}" for fr in stat.traceback
+            )
+            stacks[stack] += stat.size_diff
+        return stacks
+
+    def _write(self, kind: str, stacks: Counter) -> str:
+        self.directory.mkdir(exist_ok=True)
+        path = self.directory / f"{self.task_id}_step{self.step_idx}.{kind}.folded"
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, weight in stacks.most_common():
+                f.write(f"{stack} {weight}\n")
+        return str(path)
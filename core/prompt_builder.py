@@ -0,0 +1,125 @@
+# core/prompt_builder.py
+"""
+Prompt assembly from reusable, content-addressed fragments.
+
+Agents build each step's prompt as ``preamble + shared context + step text``.
+The preamble and context are stored once as fragments keyed by their SHA-256
+digest, so a multi-step plan holds a single copy of its context and never
+re-counts its tokens.  Providers that support context caching (Gemini) can
+upload the shared prefix once and reference it on every step.
+"""
+import json
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+MAX_FRAGMENTS = 1024
+
+_CJK = re.compile(r"[぀-ヿ㐀-䶿一-鿿가-힯]")
+_WORDS = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Fast local token estimate (no model call). Roughly one token per short
+    word or punctuation mark, ~4 characters per token for long words, and
+    one token per CJK character.
+    """
+    if not text:
+        return 0
+    cjk = len(_CJK.findall(text))
+    if cjk:
+        text = _CJK.sub(" ", text)
+    return cjk + sum(max(1, (len(word) + 3) // 4) for word in _WORDS.findall(text))
+
+
+def fragment_digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+class PromptFragment:
+    __slots__ = ("digest", "kind", "text", "tokens")
+
+    def __init__(self, text: str, kind: str):
+        self.digest = fragment_digest(text)
+        self.kind = kind
+        self.text = text
+        self.tokens = estimate_tokens(text)
+
+
+class AssembledPrompt:
+    """An ordered list of fragments; the last one is the step-specific text."""
+
+    __slots__ = ("fragments",)
+
+    def __init__(self, fragments: List[PromptFragment]):
+        self.fragments = fragments
+
+    @property
+    def prefix(self) -> List[PromptFragment]:
+        """The shared fragments (everything before the step text)."""
+        return self.fragments[:-1]
+
+    @property
+    def prefix_digest(self) -> str:
+        return fragment_digest("|".join(f.digest for f in self.prefix))
+
+    @property
+    def token_count(self) -> int:
+        return sum(f.tokens for f in self.fragments)
+
+    def render(self) -> str:
+        return "\n\n".join(f.text for f in self.fragments if f.text)
+
+    def __str__(self):
+        return self.render()
+
+
+class PromptAssembler:
+    """Process-wide fragment store with LRU eviction."""
+
+    def __init__(self, max_fragments: int = MAX_FRAGMENTS):
+        self.max_fragments = max_fragments
+        self._fragments: "OrderedDict[str, PromptFragment]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def fragment(self, text: str, kind: str = "context") -> PromptFragment:
+        """Return the stored fragment for ``text``, adding it if new."""
+        digest = fragment_digest(text)
+        with self._lock:
+            frag = self._fragments.get(digest)
+            if frag is not None:
+                self._fragments.move_to_end(digest)
+                return frag
+            frag = PromptFragment(text, kind)
+            self._fragments[digest] = frag
+            if len(self._fragments) > self.max_fragments:
+                self._fragments.popitem(last=False)
+            return frag
+
+    def context_fragment(self, context: Optional[Dict[str, Any]]) -> Optional[PromptFragment]:
+        if not context:
+            return None
+        text = "Context:\n" + json.dumps(context, sort_keys=True, default=str)
+        return self.fragment(text, kind="context")
+
+    def assemble(self, step_text: str, preamble: str = "",
+                 context: Optional[Dict[str, Any]] = None) -> AssembledPrompt:
+        parts = []
+        if preamble:
+            parts.append(self.fragment(preamble, kind="preamble"))
+        ctx = self.context_fragment(context)
+        if ctx is not None:
+            parts.append(ctx)
+        # Step text is unique per step, so it is not kept in the store.
+        parts.append(PromptFragment(step_text, kind="step"))
+        return AssembledPrompt(parts)
+
+
+_assembler = PromptAssembler()
+
+
+def get_prompt_assembler() -> PromptAssembler:
+    return _assembler
@@ -0,0 +1,175 @@
+# core/provider_registry.py
+"""
+Process-wide registry of SDK clients.
+
+Provider and delegate instances used to call ``genai.configure`` and build a
+new ``GenerativeModel`` (or HTTP session) each time they were created.  The
+registry builds each client once per (kind, model, credentials) key, lazily
+and under a per-key lock, and hands the same instance to every caller.
+
+Callers report call outcomes with ``report_failure`` / ``report_success``;
+after ``ADF_REGISTRY_MAX_FAILURES`` consecutive failures the client is
+dropped (and closed) so the next ``get`` rebuilds it.  Every client with a
+``close()`` method is closed by ``shutdown()``, which runs at exit.
+
+Gemini: ``google.generativeai`` keeps its API key and transport client in
+SDK-global state set by ``genai.configure``; a ``GenerativeModel`` has no
+key of its own.  So only one Gemini API key per process is supported
+(configuring a second one switches every model already handed out), and
+rebuilding an unhealthy ``GenerativeModel`` does not reset the SDK's
+underlying client or its connections.
+"""
+import atexit
+import hashlib
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+Key = Tuple[Hashable, ...]
+
+
+def credential_fingerprint(secret: Optional[str]) -> str:
+    """Stable, non-reversible id for a credential, for use in registry keys."""
+    return hashlib.sha256((secret or "").encode("utf-8")).hexdigest()[:16]
+
+
+class _Entry:
+    __slots__ = ("value", "failures")
+
+    def __init__(self, value: Any):
+        self.value = value
+        self.failures = 0
+
+
+class ProviderRegistry:
+    def __init__(self, max_failures: int = 3):
+        self.max_failures = max_failures
+        self._entries: Dict[Key, _Entry] = {}
+        self._key_locks: Dict[Key, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._shutdown_hooks: List[Callable[[], None]] = []
+
+    def get(self, key: Key, factory: Callable[[], Any]) -> Any:
+        """Return the client for ``key``, building it with ``factory`` on first use."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            return entry.value
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        # Build outside the registry lock so a slow factory only blocks its own key.
+        with key_lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = _Entry(factory())
+                self._entries[key] = entry
+            return entry.value
+
+    def report_success(self, key: Key) -> None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry.failures = 0
+
+    def report_failure(self, key: Key) -> None:
+        """Count a failed call; drop the client once it looks unhealthy."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        entry.failures += 1
+        if entry.failures >= self.max_failures:
+            self.invalidate(key)
+
+    @contextmanager
+    def track(self, key: Key):
+        """Report the outcome of the wrapped call for ``key``."""
+        try:
+            yield
+        except Exception:
+            self.report_failure(key)
+            raise
+        self.report_success(key)
+
+    def invalidate(self, key: Key) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            _close(entry.value)
+
+    def on_shutdown(self, hook: Callable[[], None]) -> None:
+        self._shutdown_hooks.append(hook)
+
+    def shutdown(self) -> None:
+        """Run shutdown hooks and close every client that has close()."""
+        for hook in reversed(self._shutdown_hooks):
+            try:
+                hook()
+            except Exception as e:
+                print(f"Warning: provider shutdown hook failed: {e}")
+        self._shutdown_hooks.clear()
+        for key in list(self._entries):
+            self.invalidate(key)
+
+    def keys(self) -> List[Key]:
+        return list(self._entries)
+
+
+def _close(value: Any) -> None:
+    close = getattr(value, "close", None)
+    if callable(close):
+        try:
+            close()
+        except Exception as e:
+            print(f"Warning: could not close {type(value).__name__}: {e}")
+
+
+_registry = ProviderRegistry(max_failures=int(os.getenv("ADF_REGISTRY_MAX_FAILURES", "3")))
+atexit.register(_registry.shutdown)
+
+_configured_key: Optional[str] = None
+_configure_lock = threading.Lock()
+
+
+def get_registry() -> ProviderRegistry:
+    return _registry
+
+
+def configure_genai(api_key: str) -> None:
+    """
+    Call genai.configure once per API key.  It sets SDK-global state, so a
+    different key replaces the first for every model in the process.
+    """
+    global _configured_key
+    fingerprint = credential_fingerprint(api_key)
+    if _configured_key == fingerprint:
+        return
+    with _configure_lock:
+        if _configured_key != fingerprint:
+            import google.generativeai as genai
+            if _configured_key is not None:
+                print("Warning: switching the process-wide Gemini API key; "
+                      "only one key per process is supported")
+            genai.configure(api_key=api_key)
+            _configured_key = fingerprint
+
+
+def gemini_model_key(model_name: str, api_key: str) -> Key:
+    return ("gemini", model_name, credential_fingerprint(api_key))
+
+
+def get_gemini_model(model_name: str, api_key: str):
+    """
+    The shared GenerativeModel for (model, api key).  A rebuild after
+    failures makes a new model object only; the SDK client is process-wide.
+    """
+    def build():
+        from google.generativeai import GenerativeModel
+        configure_genai(api_key)
+        return GenerativeModel(model_name)
+    return _registry.get(gemini_model_key(model_name, api_key), build)
+
+
+def get_http_session(base_url: str):
+    """A shared requests.Session (connection pool) per upstream base URL."""
+    def build():
+        import requests
+        return requests.Session()
+    return _registry.get(("http", base_url), build)
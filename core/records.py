@@ -0,0 +1,164 @@
+# core/records.py
+"""
+Compact ``__slots__`` records for step specs and step results.
+
+Both records keep the dict-style ``get`` / ``[]`` / ``in`` access used by
+``core.actions`` and ``core.reporting``, so they can be passed wherever a step
+dict used to go.  A ``StepResult`` keeps a reference to its ``StepSpec``
+instead of copying the task, and derives ``full_output`` on demand.  Keys
+outside the fixed slots (custom instruction fields, extra executor output)
+land in an ``extra`` dict and read back through the same dict-style access.
+"""
+import json
+from typing import Any, Dict, Optional
+
+_MISSING = object()
+
+
+class _SlotRecord:
+    """Dict-compatible access over a fixed set of slots."""
+
+    __slots__ = ()
+    _fields: tuple = ()
+    _aliases: Dict[str, str] = {}
+
+    def _lookup(self, key: str):
+        attr = self._aliases.get(key, key)
+        if attr in self._fields:
+            value = getattr(self, attr)
+            if value is not None:
+                return value
+        extra = getattr(self, "extra", None)
+        if extra and key in extra:
+            return extra[key]
+        return _MISSING
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self._lookup(key)
+        return default if value is _MISSING else value
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._lookup(key)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        attr = self._aliases.get(key, key)
+        if attr in self.__slots__:
+            setattr(self, attr, value)
+        elif "extra" in self.__slots__:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key: str) -> bool:
+        return self._lookup(key) is not _MISSING
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the non-empty fields as a plain dict."""
+        out = {}
+        for name in self._fields:
+            value = getattr(self, name)
+            if value is not None:
+                out[name] = value.to_dict() if isinstance(value, _SlotRecord) else value
+        for key, value in (getattr(self, "extra", None) or {}).items():
+            out.setdefault(key, value)
+        return out
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), separators=(",", ":"), default=str)
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} {self.to_dict()}>"
+
+
+class StepSpec(_SlotRecord):
+    """One step of an instruction set, as handed to an executor."""
+
+    __slots__ = (
+        "id", "action", "params", "priority", "risk", "capabilities",
+        "agent", "step_index", "patch", "command", "profile", "extra",
+    )
+    _fields = __slots__[:-1]
+    _aliases = {
+        "_capabilities": "capabilities",
+        "_agent": "agent",
+        "_step_index": "step_index",
+        "_profile": "profile",
+    }
+
+    def __init__(self, id: Optional[str] = None, action: str = "noop",
+                 params: Optional[Dict[str, Any]] = None, priority: Optional[str] = None,
+                 risk: Optional[str] = None, capabilities: Optional[list] = None,
+                 agent: Optional[str] = None, step_index: Optional[int] = None,
+                 patch: Optional[Dict[str, Any]] = None, command: Optional[str] = None,
+                 profile: Any = None, extra: Optional[Dict[str, Any]] = None):
+        self.id = id
+        self.action = action
+        self.params = params
+        self.priority = priority
+        self.risk = risk
+        self.capabilities = capabilities
+        self.agent = agent
+        self.step_index = step_index
+        self.patch = patch
+        self.command = command
+        self.profile = profile
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "StepSpec":
+        if isinstance(data, cls):
+            return data
+        spec = cls()
+        for key, value in data.items():
+            spec[key] = value
+        return spec
+
+
+class StepResult(_SlotRecord):
+    """Outcome of executing a ``StepSpec``."""
+
+    __slots__ = (
+        "spec", "task_id", "step_index", "status", "start_time", "end_time",
+        "duration_sec", "output", "error", "log_file", "profile_files", "extra",
+    )
+    _fields = __slots__[1:-1] + ("full_output",)
+
+    def __init__(self, spec: StepSpec, task_id: str, step_index: int = 1,
+                 status: str = "started", start_time: Optional[float] = None):
+        self.spec = spec
+        self.task_id = task_id
+        self.step_index = step_index
+        self.status = status
+        self.start_time = start_time
+        self.end_time = None
+        self.duration_sec = None
+        self.output = None
+        self.error = None
+        self.log_file = None
+        self.profile_files = None
+        self.extra = None
+
+    @property
+    def full_output(self) -> str:
+        out = self.output or ""
+        if self.error:
+            out += f"\nERROR: {self.error}"
+        return out
+
+    def _lookup(self, key: str):
+        value = super()._lookup(key)
+        if value is _MISSING:
+            # Fall back to the spec for id/action/priority/etc. used in reports
+            value = self.spec._lookup(key)
+        return value
+
+    def to_dict(self) -> Dict[str, Any]:
+        out = super().to_dict()
+        out["id"] = self.spec.id
+        out["action"] = self.spec.action
+        return out
@@ -1,10 +1,24 @@
 """
 Reporting functions for step summaries and badges.
 """
-from typing import Dict, Any
+import json
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, TextIO, Union
 
+from core.artifact_store import read_log
+from core.records import StepResult
 
-def render_step_summary(step: Dict[str, Any]) -> str:
+# Step dicts and StepResult records are rendered interchangeably
+StepLike = Union[Dict[str, Any], StepResult]
+
+# Steps beyond this many are rendered as collapsed one-line rows
+INLINE_STEP_LIMIT = 50
+# Collapsed rows per <details> page
+PAGE_SIZE = 500
+
+
+def render_step_summary(step: StepLike) -> str:
     """Render a step summary with metadata and logs."""
     lines = []
     lines.append(f"### 🧩 Step {step['id']} — {step['action']}")
@@ -31,9 +45,21 @@ def render_step_summary(step: Dict[str, Any]) -> str:
     if step.get("log_file"):
         lines.append(f"[📄 Full Log]({step['log_file']})")
 
+    # Per-step profiles captured in profiling mode
+    profile_files = step.get("profile_files") or {}
+    if profile_files:
+        links = " | ".join(f"[{kind}]({path})" for kind, path in profile_files.items())
+        lines.append(f"🔥 Profiles: {links}")
+
     return "\n".join(lines)
 
 
+def read_step_log(step: StepLike) -> str:
+    """Full text of a step's log, whether on disk or in the artifact store."""
+    log_file = step.get("log_file")
+    return (read_log(log_file) or "") if log_file else ""
+
+
 def render_step_badges(instruction: dict) -> str:
     badges = []
     if "priority" in instruction:
@@ -49,7 +75,82 @@ def render_step_badges(instruction: dict) -> str:
 
 def render_multiple_steps(steps: list) -> str:
     """Render summaries for multiple steps."""
-    summaries = []
-    for step in steps:
-        summaries.append(render_step_summary(step))
-    return "\n\n".join(summaries)"
\ No newline at end of file
+    return "\n\n".join(render_step_summary(step) for step in steps)
+
+
+def render_step_row(step: StepLike) -> str:
+    """Render a step as a single compact Markdown table row."""
+    status = step.get("status", "")
+    duration = f"{step['duration_sec']}s" if "duration_sec" in step else ""
+    log = f"[log]({step['log_file']})" if step.get("log_file") else ""
+    return f"| {step['id']} | {step['action']} | {status} | {duration} | {log} |"
+
+
+class StepReportWriter:
+    """
+    Streams step summaries to a file-like sink as steps complete.
+
+    The first ``inline_limit`` steps are written as full summaries; later steps
+    become one-line rows grouped into collapsed ``<details>`` pages of
+    ``page_size`` rows, so memory stays bounded and huge runs stay readable.
+    """
+
+    def __init__(self, sink: TextIO, inline_limit: int = INLINE_STEP_LIMIT,
+                 page_size: int = PAGE_SIZE, start_index: int = 0):
+        self.sink = sink
+        self.inline_limit = inline_limit
+        self.page_size = page_size
+        self.count = start_index
+        self._page: List[str] = []
+        self._page_start = start_index
+
+    def write_step(self, step: StepLike) -> None:
+        if self.count < self.inline_limit:
+            if self.count:
+                self.sink.write("\n\n")
+            self.sink.write(render_step_summary(step))
+        else:
+            if not self._page:
+                self._page_start = self.count
+            self._page.append(render_step_row(step))
+            if len(self._page) >= self.page_size:
+                self.flush()
+        self.count += 1
+
+    def write_steps(self, steps: Iterable[StepLike]) -> None:
+        for step in steps:
+            self.write_step(step)
+
+    def flush(self) -> None:
+        """Close the current collapsed page, if any, and flush the sink."""
+        if self._page:
+            first, last = self._page_start + 1, self._page_start + len(self._page)
+            self.sink.write(f"\n\n<details><summary>Steps {first}–{last}</summary>\n\n")
+            self.sink.write("| Step | Action | Status | Duration | Log |\n")
+            self.sink.write("| --- | --- | --- | --- | --- |\n")
+            self.sink.write("\n".join(self._page))
+            self.sink.write("\n\n</details>")
+            self._page = []
+        self.sink.flush()
+
+
+def append_to_preview(preview_path: str, steps: Iterable[StepLike], **writer_kwargs) -> int:
+    """
+    Incrementally update a PR-preview Markdown file.
+
+    The number of steps already rendered is kept in ``<preview>.state.json``;
+    only steps past that point are appended. Returns the new step count.
+    """
+    path = Path(preview_path)
+    state_path = path.with_name(path.name + ".state.json")
+    rendered = 0
+    if path.exists() and state_path.exists():
+        rendered = json.loads(state_path.read_text(encoding="utf-8")).get("steps", 0)
+
+    with open(path, "a" if rendered else "w", encoding="utf-8") as f:
+        writer = StepReportWriter(f, start_index=rendered, **writer_kwargs)
+        writer.write_steps(islice(steps, rendered, None))
+        writer.flush()
+
+    state_path.write_text(json.dumps({"steps": writer.count}), encoding="utf-8")
+    return writer.count
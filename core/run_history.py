@@ -0,0 +1,280 @@
+# core/run_history.py
+"""
+SQLite-backed history of step runs and translation metrics.
+
+When enabled, every ``run_agent_task`` result and every translation metrics
+record is appended here, indexed by task, action, status and time, so postmortem
+questions don't require grepping ``orchestrator_artifacts/*.log``.
+
+Configuration (environment):
+    ADF_RUN_HISTORY      set to "1" to enable recording (off by default)
+    ADF_RUN_HISTORY_DB   database path (default orchestrator_artifacts/run_history.sqlite3)
+
+CLI examples:
+    python -m core.run_history percentile --action apply_patch --pct 95 --since 7d
+    python -m core.run_history steps --status failed --since 24h
+    python -m core.run_history translations --pct 99 --target-lang fr
+    python -m core.run_history import-metrics orchestrator_artifacts/translation_metrics.log
+"""
+import argparse
+import ast
+import json
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+HISTORY_PATH = Path(os.getenv("ADF_RUN_HISTORY_DB", "orchestrator_artifacts/run_history.sqlite3"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS step_runs (
+    task_id      TEXT,
+    step_index   INTEGER,
+    action       TEXT,
+    status       TEXT,
+    start_time   REAL,
+    duration_sec REAL,
+    log_file     TEXT,
+    error        TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_step_runs_task ON step_runs (task_id, step_index);
+CREATE INDEX IF NOT EXISTS idx_step_runs_action ON step_runs (action, start_time);
+CREATE INDEX IF NOT EXISTS idx_step_runs_status ON step_runs (status, start_time);
+CREATE INDEX IF NOT EXISTS idx_step_runs_time ON step_runs (start_time);
+
+CREATE TABLE IF NOT EXISTS translation_metrics (
+    ts          REAL,
+    provider    TEXT,
+    target_lang TEXT,
+    success     INTEGER,
+    latency_sec REAL,
+    tokens_used INTEGER,
+    error       TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_translation_provider ON translation_metrics (provider, ts);
+CREATE INDEX IF NOT EXISTS idx_translation_lang ON translation_metrics (target_lang, ts);
+"""
+
+_history: Optional["RunHistory"] = None
+_history_lock = threading.Lock()
+
+
+def parse_time(value: Optional[str]) -> Optional[float]:
+    """Parse "7d" / "24h" / "30m" (relative to now), an epoch or an ISO date."""
+    if value is None:
+        return None
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+    if value[-1:] in units and value[:-1].replace(".", "", 1).isdigit():
+        return time.time() - float(value[:-1]) * units[value[-1]]
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def _where(filters: Dict[str, Any], time_column: str, since, until):
+    clauses, args = [], []
+    for column, value in filters.items():
+        if value is not None:
+            clauses.append(f"{column} = ?")
+            args.append(value)
+    if since is not None:
+        clauses.append(f"{time_column} >= ?")
+        args.append(since)
+    if until is not None:
+        clauses.append(f"{time_column} < ?")
+        args.append(until)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", args
+
+
+class RunHistory:
+    """Append-only store of step and translation records with a small query API."""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path or HISTORY_PATH)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # --- writes -----------------------------------------------------------
+
+    def record_step(self, result) -> None:
+        """Append a ``run_agent_task`` result (StepResult or dict)."""
+        row = (
+            result.get("task_id"), result.get("step_index"), result.get("action"),
+            result.get("status"), result.get("start_time"), result.get("duration_sec"),
+            result.get("log_file"), result.get("error"),
+        )
+        with self._lock, self._conn:
+            self._conn.execute("INSERT INTO step_runs VALUES (?, ?, ?, ?, ?, ?, ?, ?)", row)
+
+    def record_translations(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Append translation metrics records; returns the number written."""
+        rows = [
+            (
+                r.get("ts", time.time()), r.get("provider"), r.get("target_lang"),
+                int(bool(r.get("success"))), r.get("latency_sec"), r.get("tokens_used"),
+                r.get("error"),
+            )
+            for r in records
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO translation_metrics VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+        return len(rows)
+
+    def import_translation_log(self, path: str) -> int:
+        """Backfill from a legacy translation_metrics.log (dict reprs or JSON lines)."""
+        records = []
+        mtime = os.path.getmtime(path)
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    try:
+                        record = ast.literal_eval(line)
+                    except (ValueError, SyntaxError):
+                        continue
+                if isinstance(record, dict):
+                    record.setdefault("ts", mtime)
+                    records.append(record)
+        return self.record_translations(records)
+
+    # --- queries ----------------------------------------------------------
+
+    def query_steps(self, task_id: Optional[str] = None, action: Optional[str] = None,
+                    status: Optional[str] = None, since: Optional[float] = None,
+                    until: Optional[float] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        where, args = _where(
+            {"task_id": task_id, "action": action, "status": status}, "start_time", since, until
+        )
+        sql = f"SELECT * FROM step_runs{where} ORDER BY start_time DESC LIMIT ?"
+        with self._lock:
+            return [dict(r) for r in self._conn.execute(sql, args + [limit])]
+
+    def _percentile(self, table: str, column: str, pct: float, filters: Dict[str, Any],
+                    time_column: str, since, until) -> Optional[float]:
+        where, args = _where(filters, time_column, since, until)
+        not_null = f"{column} IS NOT NULL"
+        where = f"{where} AND {not_null}" if where else f" WHERE {not_null}"
+        with self._lock:
+            (count,) = self._conn.execute(f"SELECT COUNT(*) FROM {table}{where}", args).fetchone()
+            if not count:
+                return None
+            # Nearest-rank percentile, resolved with a single ordered seek
+            offset = max(math.ceil(pct / 100 * count) - 1, 0)
+            row = self._conn.execute(
+                f"SELECT {column} FROM {table}{where} ORDER BY {column} LIMIT 1 OFFSET ?",
+                args + [offset],
+            ).fetchone()
+        return row[0]
+
+    def duration_percentile(self, pct: float, action: Optional[str] = None,
+                            status: Optional[str] = None, since: Optional[float] = None,
+                            until: Optional[float] = None) -> Optional[float]:
+        """e.g. ``duration_percentile(95, action="apply_patch", since=parse_time("7d"))``"""
+        return self._percentile(
+            "step_runs", "duration_sec", pct,
+            {"action": action, "status": status}, "start_time", since, until,
+        )
+
+    def translation_latency_percentile(self, pct: float, provider: Optional[str] = None,
+                                       target_lang: Optional[str] = None,
+                                       since: Optional[float] = None,
+                                       until: Optional[float] = None) -> Optional[float]:
+        return self._percentile(
+            "translation_metrics", "latency_sec", pct,
+            {"provider": provider, "target_lang": target_lang}, "ts", since, until,
+        )
+
+
+def get_history() -> Optional[RunHistory]:
+    """Return the process-wide history store, or None when disabled."""
+    global _history
+    if os.getenv("ADF_RUN_HISTORY", "0").lower() not in ("1", "true", "yes", "on"):
+        return None
+    if _history is None:
+        with _history_lock:
+            if _history is None:
+                _history = RunHistory()
+    return _history
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Query the ADF run history")
+    parser.add_argument("--db", default=None, help="history database path")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    steps = sub.add_parser("steps", help="list step runs")
+    steps.add_argument("--task")
+    steps.add_argument("--limit", type=int, default=50)
+
+    pct = sub.add_parser("percentile", help="step duration percentile")
+
+    trans = sub.add_parser("translations", help="translation latency percentile")
+    trans.add_argument("--provider")
+    trans.add_argument("--target-lang")
+
+    for p in (steps, pct):
+        p.add_argument("--action")
+        p.add_argument("--status")
+    for p in (pct, trans):
+        p.add_argument("--pct", type=float, default=95)
+    for p in (steps, pct, trans):
+        p.add_argument("--since", help='e.g. "7d", "24h" or an ISO date')
+        p.add_argument("--until")
+
+    imp = sub.add_parser("import-metrics", help="backfill a translation_metrics.log")
+    imp.add_argument("path")
+
+    args = parser.parse_args(argv)
+    history = RunHistory(args.db)
+
+    if args.command == "steps":
+        rows = history.query_steps(
+            task_id=args.task, action=args.action, status=args.status,
+            since=parse_time(args.since), until=parse_time(args.until), limit=args.limit,
+        )
+        for row in rows:
+            print(json.dumps(row))
+    elif args.command == "percentile":
+        value = history.duration_percentile(
+            args.pct, action=args.action, status=args.status,
+            since=parse_time(args.since), until=parse_time(args.until),
+        )
+        print(f"p{args.pct:g} duration ({args.action or 'all actions'}): "
+              f"{'n/a' if value is None else f'{value}s'}")
+    elif args.command == "translations":
+        value = history.translation_latency_percentile(
+            args.pct, provider=args.provider, target_lang=args.target_lang,
+            since=parse_time(args.since), until=parse_time(args.until),
+        )
+        print(f"p{args.pct:g} translation latency: {'n/a' if value is None else f'{value}s'}")
+    elif args.command == "import-metrics":
+        print(f"Imported {history.import_translation_log(args.path)} records")
+
+    history.close()
+
+
+if __name__ == "__main__":
+    main()
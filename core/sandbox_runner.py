@@ -1,13 +1,23 @@
 import subprocess
 import tempfile
 import json
+from typing import Optional
 
-def run_in_sandbox(instruction: dict) -> dict:
+from core.sandbox_scheduler import ResourceRequest
+
+def run_in_sandbox(instruction: dict, resources: Optional[ResourceRequest] = None) -> dict:
+    # Limits from the instruction's sandbox block are enforced by the container runtime
+    if resources is None:
+        try:
+            resources = ResourceRequest.from_instruction(instruction)
+        except ValueError as e:
+            return {"status": "error", "output": f"invalid sandbox request: {e}"}
     with tempfile.NamedTemporaryFile("w", delete=False, suffix=".json") as f:
         json.dump(instruction, f)
         f.flush()
         cmd = [
             "docker", "run", "--rm",
+            *resources.docker_flags(),
             "-v", f"{f.name}:/app/instruction.json",
             "sandbox-runner-image",  # Replace with your image name
             "python", "/app/execute.py", "/app/instruction.json"
@@ -16,4 +26,6 @@ def run_in_sandbox(instruction: dict) -> dict:
             output = subprocess.check_output(cmd, stderr=subprocess.STDOUT, text=True)
             return {"status": "sandboxed", "output": output}
         except subprocess.CalledProcessError as e:
-            return {"status": "error", "output": e.output}
+            # 137 = SIGKILL, which is how the kernel OOM killer ends a capped container
+            status = "oom_killed" if e.returncode == 137 else "error"
+            return {"status": status, "output": e.output}
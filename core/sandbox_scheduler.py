@@ -0,0 +1,285 @@
+# core/sandbox_scheduler.py
+"""
+Resource-aware scheduling of concurrent sandbox runs.
+
+Each instruction's ``sandbox`` block asks for ``cpu`` (cores: ``2``,
+``"1.5"``, ``"500m"``), ``memory`` (``"512m"``, ``"2g"``, ``"1Gi"`` or bytes)
+and ``network`` (``false``/``"none"`` disables it).  The scheduler tracks
+how much of the host is reserved and starts as many ``run_in_sandbox``
+containers as fit; the rest wait in arrival order.  Smaller jobs may start
+ahead of a waiting large one, but only until it has waited
+``starvation_sec``, after which the host drains for it.  A request larger
+than the whole host is rejected with ``OversizedJobError``.
+
+The container gets the requested numbers as hard limits (``--cpus``,
+``--memory``, ``--memory-swap``), so a job cannot push the host into OOM;
+instructions without a ``sandbox`` block run unconstrained as before and
+only reserve the defaults below.  A malformed request yields an ``error``
+result instead of raising.
+
+Configuration (environment):
+    ADF_SANDBOX_CPU          schedulable cores (default: all usable cores)
+    ADF_SANDBOX_MEMORY       schedulable memory (default: 90% of physical memory)
+    ADF_SANDBOX_DEFAULT_CPU  cores for instructions that do not ask (default 1)
+    ADF_SANDBOX_DEFAULT_MEMORY  memory for instructions that do not ask (default 512m)
+
+Utilisation is exported to Prometheus by ``core.metrics``.
+
+CLI:
+    python -m core.sandbox_scheduler instructions/a.json instructions/b.json ...
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+
+_MEMORY_UNITS = {"": 1, "b": 1, "k": 1 << 10, "m": 1 << 20, "g": 1 << 30, "t": 1 << 40}
+
+
+class OversizedJobError(ValueError):
+    """The job asks for more than the host can ever provide."""
+    pass
+
+
+def parse_cpu(value: Union[int, float, str]) -> float:
+    """Cores from ``2``, ``"1.5"`` or Kubernetes-style ``"500m"``."""
+    if isinstance(value, (int, float)):
+        cpu = float(value)
+    else:
+        text = str(value).strip().lower()
+        cpu = float(text[:-1]) / 1000 if text.endswith("m") else float(text)
+    if cpu <= 0:
+        raise ValueError(f"cpu request must be positive, got {value!r}")
+    return cpu
+
+
+def parse_memory(value: Union[int, str]) -> int:
+    """Bytes from ``536870912``, ``"512m"``, ``"2g"``, ``"1Gi"`` or ``"512MB"``."""
+    if isinstance(value, int):
+        return value
+    match = re.fullmatch(r"\s*([\d.]+)\s*([kmgt]?)i?b?\s*", str(value).lower())
+    if not match:
+        raise ValueError(f"invalid memory request {value!r}")
+    number, unit = match.groups()
+    return int(float(number) * _MEMORY_UNITS[unit])
+
+
+class ResourceRequest(NamedTuple):
+    cpu: float
+    memory: int
+    network: bool = True
+    limits: Tuple[str, ...] = ("cpu", "memory")  # which of cpu/memory the container is capped at
+
+    @classmethod
+    def from_instruction(cls, instruction: Dict[str, Any]) -> "ResourceRequest":
+        """Raises ValueError for a malformed ``cpu`` or ``memory`` value."""
+        sandbox = instruction.get("sandbox") or {}
+        network = sandbox.get("network", True)
+        return cls(
+            cpu=parse_cpu(sandbox.get("cpu", os.getenv("ADF_SANDBOX_DEFAULT_CPU", "1"))),
+            memory=parse_memory(sandbox.get("memory", os.getenv("ADF_SANDBOX_DEFAULT_MEMORY", "512m"))),
+            network=network not in (False, "none", "off", "false", "disabled"),
+            # Defaults only reserve capacity; the container is capped at what was asked for
+            limits=tuple(key for key in ("cpu", "memory") if key in sandbox),
+        )
+
+    def docker_flags(self) -> List[str]:
+        flags = []
+        if "cpu" in self.limits:
+            flags += ["--cpus", f"{self.cpu:g}"]
+        if "memory" in self.limits:
+            flags += ["--memory", str(self.memory),
+                      "--memory-swap", str(self.memory)]  # no swap beyond the limit
+        if not self.network:
+            flags += ["--network", "none"]
+        return flags
+
+
+def host_capacity() -> ResourceRequest:
+    """Cores and memory available for sandboxes on this host."""
+    if os.getenv("ADF_SANDBOX_CPU"):
+        cpu = parse_cpu(os.environ["ADF_SANDBOX_CPU"])
+    elif hasattr(os, "sched_getaffinity"):
+        cpu = float(len(os.sched_getaffinity(0)))
+    else:
+        cpu = float(os.cpu_count() or 1)
+    if os.getenv("ADF_SANDBOX_MEMORY"):
+        memory = parse_memory(os.environ["ADF_SANDBOX_MEMORY"])
+    else:
+        try:
+            memory = int(os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") * 0.9)
+        except (AttributeError, ValueError, OSError):
+            memory = 4 << 30
+    return ResourceRequest(cpu, memory)
+
+
+class SandboxScheduler:
+    def __init__(self, capacity: Optional[ResourceRequest] = None, starvation_sec: float = 30.0,
+                 max_concurrent: Optional[int] = None):
+        self.capacity = capacity or host_capacity()
+        self.starvation_sec = starvation_sec
+        self.max_concurrent = max_concurrent or max(1, int(self.capacity.cpu * 4))
+        self._cpu_used = 0.0
+        self._memory_used = 0
+        self._running = 0
+        self._waiting: deque = deque()  # (ticket, request, enqueued_at)
+        self._tickets = 0
+        self._cond = threading.Condition()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # counters for metrics
+        self.started = 0
+        self.completed = 0
+        self.wait_seconds = 0.0
+        self.peak_cpu = 0.0
+        self.peak_memory = 0
+
+    def _fits(self, req: ResourceRequest) -> bool:
+        return (self._cpu_used + req.cpu <= self.capacity.cpu + 1e-9
+                and self._memory_used + req.memory <= self.capacity.memory)
+
+    def _may_start(self, ticket: int, req: ResourceRequest) -> bool:
+        if not self._fits(req):
+            return False
+        head_ticket, head_req, head_since = self._waiting[0]
+        if head_ticket == ticket:
+            return True
+        # Backfill past the head unless it has been waiting too long
+        return time.monotonic() - head_since < self.starvation_sec
+
+    @contextmanager
+    def reserve(self, req: ResourceRequest):
+        """Block until ``req`` fits on the host, hold it for the with-block."""
+        if req.cpu > self.capacity.cpu or req.memory > self.capacity.memory:
+            raise OversizedJobError(
+                f"sandbox asks for {req.cpu:g} cpu / {req.memory} bytes; "
+                f"host offers {self.capacity.cpu:g} cpu / {self.capacity.memory} bytes")
+        queued_at = time.monotonic()
+        with self._cond:
+            self._tickets += 1
+            ticket = self._tickets
+            entry = (ticket, req, queued_at)
+            self._waiting.append(entry)
+            try:
+                while not self._may_start(ticket, req):
+                    self._cond.wait(timeout=1.0)
+            finally:
+                self._waiting.remove(entry)
+            self._cpu_used += req.cpu
+            self._memory_used += req.memory
+            self._running += 1
+            self.started += 1
+            self.wait_seconds += time.monotonic() - queued_at
+            self.peak_cpu = max(self.peak_cpu, self._cpu_used)
+            self.peak_memory = max(self.peak_memory, self._memory_used)
+            self._cond.notify_all()
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._cpu_used -= req.cpu
+                self._memory_used -= req.memory
+                self._running -= 1
+                self.completed += 1
+                self._cond.notify_all()
+
+    def submit(self, instruction: Dict[str, Any],
+               runner: Optional[Callable[[Dict[str, Any], ResourceRequest], dict]] = None) -> Future:
+        """Run an instruction in a sandbox once its resources are free."""
+        try:
+            req = ResourceRequest.from_instruction(instruction)
+        except ValueError as e:
+            future: Future = Future()
+            future.set_result({"status": "error", "output": f"invalid sandbox request: {e}"})
+            return future
+        if runner is None:
+            from core.sandbox_runner import run_in_sandbox as runner
+        if self._executor is None:
+            with self._cond:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(self.max_concurrent, thread_name_prefix="sandbox")
+
+        def run():
+            with self.reserve(req):
+                return runner(instruction, req)
+        return self._executor.submit(run)
+
+    def run_many(self, instructions: List[Dict[str, Any]], runner=None) -> List[dict]:
+        """Run instructions concurrently as capacity allows; results in input order."""
+        futures = [self.submit(instruction, runner) for instruction in instructions]
+        return [f.result() for f in futures]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "cpu_capacity": self.capacity.cpu,
+                "cpu_reserved": self._cpu_used,
+                "memory_capacity": self.capacity.memory,
+                "memory_reserved": self._memory_used,
+                "running": self._running,
+                "queued": len(self._waiting),
+                "started": self.started,
+                "completed": self.completed,
+                "wait_seconds": self.wait_seconds,
+                "peak_cpu": self.peak_cpu,
+                "peak_memory": self.peak_memory,
+            }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+_scheduler: Optional[SandboxScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> SandboxScheduler:
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = SandboxScheduler()
+    return _scheduler
+
+
+def current_scheduler() -> Optional[SandboxScheduler]:
+    """The process-wide scheduler if one has been created (for metrics)."""
+    return _scheduler
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m core.sandbox_scheduler")
+    parser.add_argument("paths", nargs="+", help="instruction files to run in sandboxes")
+    args = parser.parse_args(argv)
+
+    instructions = []
+    for path in args.paths:
+        with open(path, "r", encoding="utf-8") as f:
+            instructions.append(json.load(f))
+    scheduler = get_scheduler()
+    print(f"Capacity: {scheduler.capacity.cpu:g} cpu, {scheduler.capacity.memory >> 20} MiB")
+    failed = 0
+    for path, future in zip(args.paths, [scheduler.submit(i) for i in instructions]):
+        try:
+            result = future.result()
+        except OversizedJobError as e:
+            result = {"status": "rejected", "output": str(e)}
+        failed += result["status"] != "sandboxed"
+        print(f"  {path}: {result['status']}")
+    snap = scheduler.snapshot()
+    print(f"Peak: {snap['peak_cpu']:g} cpu, {snap['peak_memory'] >> 20} MiB; "
+          f"queued {snap['wait_seconds']:.1f}s in total")
+    scheduler.shutdown()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
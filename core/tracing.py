@@ -0,0 +1,238 @@
+# core/tracing.py
+"""
+Lightweight tracing spans for plans, steps, actions and provider calls.
+
+Spans are propagated through a ContextVar, so nested ``span()`` blocks are
+linked automatically across the orchestrator, executor and providers.  The
+sampling decision is taken once at the root span; when a trace is sampled
+out every nested ``span()`` hands back a shared no-op span and records nothing.
+
+Configuration (environment):
+    ADF_TRACE_SAMPLE_RATE   0.0 - 1.0, default 0 (tracing off)
+    ADF_TRACE_EXPORT        "json" (default), "otlp" or "none"
+    OTEL_EXPORTER_OTLP_ENDPOINT  collector base URL for "otlp"
+"""
+import contextvars
+import json
+import logging
+import os
+import random
+import time
+import urllib.request
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+TRACES_DIR = Path("orchestrator_artifacts") / "traces"
+
+_config = {
+    "sample_rate": float(os.getenv("ADF_TRACE_SAMPLE_RATE", "0")),
+    "exporter": os.getenv("ADF_TRACE_EXPORT", "json").lower(),
+    "otlp_endpoint": os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4318"),
+}
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("adf_current_span", default=None)
+
+
+class Span:
+    """A single timed operation inside a trace."""
+
+    __slots__ = (
+        "trace_id", "span_id", "parent_id", "name", "kind",
+        "attributes", "start_ns", "end_ns", "status", "_trace",
+    )
+    sampled = True
+
+    def __init__(self, name: str, kind: str, trace: List["Span"], trace_id: str,
+                 parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns = None
+        self.status = "ok"
+        self._trace = trace
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.perf_counter_ns()
+        return (end - self.start_ns) / 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    """Returned for sampled-out traces; every operation is a no-op."""
+
+    __slots__ = ()
+    sampled = False
+    trace_id = None
+    span_id = None
+    duration_ms = 0.0
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def configure(sample_rate: Optional[float] = None, exporter: Optional[str] = None,
+              otlp_endpoint: Optional[str] = None) -> None:
+    """Override the environment-derived tracing configuration."""
+    if sample_rate is not None:
+        _config["sample_rate"] = float(sample_rate)
+    if exporter is not None:
+        _config["exporter"] = exporter.lower()
+    if otlp_endpoint is not None:
+        _config["otlp_endpoint"] = otlp_endpoint
+
+
+def current_span():
+    """Return the active span, or None outside of any trace."""
+    return _current_span.get()
+
+
+@contextmanager
+def span(name: str, kind: str = "internal", **attributes):
+    """Open a span as a child of the current one (or a new root span)."""
+    parent = _current_span.get()
+    if parent is NOOP_SPAN:
+        # Sampled-out trace: skip all bookkeeping.
+        yield NOOP_SPAN
+        return
+
+    if parent is None:
+        rate = _config["sample_rate"]
+        if rate <= 0 or (rate < 1 and random.random() >= rate):
+            token = _current_span.set(NOOP_SPAN)
+            try:
+                yield NOOP_SPAN
+            finally:
+                _current_span.reset(token)
+            return
+        current = Span(name, kind, [], uuid.uuid4().hex, None, attributes)
+    else:
+        current = Span(name, kind, parent._trace, parent.trace_id, parent.span_id, attributes)
+
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.status = "error"
+        current.attributes.setdefault("error", str(e))
+        raise
+    finally:
+        current.end_ns = time.perf_counter_ns()
+        _current_span.reset(token)
+        current._trace.append(current)
+        if parent is None:
+            _export(current._trace)
+
+
+def flame_summary(spans: List[Span]) -> Dict[str, float]:
+    """
+    Collapse a trace into ``{"plan;step;action": self_time_ms}``.
+    Self time is the span duration minus the time spent in its children.
+    """
+    by_id = {s.span_id: s for s in spans}
+    child_ms: Dict[str, float] = {}
+    for s in spans:
+        if s.parent_id in by_id:
+            child_ms[s.parent_id] = child_ms.get(s.parent_id, 0.0) + s.duration_ms
+
+    summary: Dict[str, float] = {}
+    for s in spans:
+        stack = []
+        node = s
+        while node is not None:
+            stack.append(f"{node.kind}:{node.name}")
+            node = by_id.get(node.parent_id)
+        key = ";".join(reversed(stack))
+        self_ms = max(s.duration_ms - child_ms.get(s.span_id, 0.0), 0.0)
+        summary[key] = round(summary.get(key, 0.0) + self_ms, 3)
+    return summary
+
+
+def _export(spans: List[Span]) -> None:
+    exporter = _config["exporter"]
+    try:
+        if exporter == "json":
+            _export_json(spans)
+        elif exporter == "otlp":
+            _export_otlp(spans)
+    except Exception as e:
+        logger.warning("[tracing] export via %s failed: %s", exporter, e)
+
+
+def _export_json(spans: List[Span]) -> Path:
+    TRACES_DIR.mkdir(parents=True, exist_ok=True)
+    trace_id = spans[-1].trace_id
+    flame = flame_summary(spans)
+
+    path = TRACES_DIR / f"{trace_id}.json"
+    doc = {"trace_id": trace_id, "spans": [s.to_dict() for s in spans], "flame": flame}
+    path.write_text(json.dumps(doc, indent=2), encoding="utf-8")
+
+    # Collapsed-stack file (microseconds) for flamegraph.pl / speedscope.
+    folded = "\n".join(f"{stack} {int(ms * 1000)}" for stack, ms in flame.items())
+    (TRACES_DIR / f"{trace_id}.folded").write_text(folded + "\n", encoding="utf-8")
+    return path
+
+
+def _export_otlp(spans: List[Span]) -> None:
+    # perf_counter has no epoch; anchor the trace to wall-clock time.
+    offset = time.time_ns() - time.perf_counter_ns()
+
+    def _attrs(d: Dict[str, Any]) -> list:
+        return [{"key": k, "value": {"stringValue": str(v)}} for k, v in d.items()]
+
+    otlp_spans = [
+        {
+            "traceId": s.trace_id,
+            "spanId": s.span_id,
+            "parentSpanId": s.parent_id or "",
+            "name": s.name,
+            "kind": 1,
+            "startTimeUnixNano": str(s.start_ns + offset),
+            "endTimeUnixNano": str(s.end_ns + offset),
+            "attributes": _attrs({"adf.kind": s.kind, **s.attributes}),
+            "status": {"code": 2 if s.status == "error" else 1},
+        }
+        for s in spans
+    ]
+    body = {
+        "resourceSpans": [{
+            "resource": {"attributes": _attrs({"service.name": "adf1-framework"})},
+            "scopeSpans": [{"scope": {"name": "core.tracing"}, "spans": otlp_spans}],
+        }]
+    }
+    req = urllib.request.Request(
+        _config["otlp_endpoint"].rstrip("/") + "/v1/traces",
+        data=json.dumps(body).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    with urllib.request.urlopen(req, timeout=2):
+        pass
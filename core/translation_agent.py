@@ -1,10 +1,15 @@
 # core/translation_agent.py
 from .agent_base import BaseAgent
-from .translation_engine import translate_text  # adjust if named differently
+from .delegate_factory import get_delegate
 
 class TranslationAgent(BaseAgent):
     """Coordinates translation requests inside the delegation framework."""
 
+    PREAMBLE = (
+        "You are a professional translator. Preserve meaning, tone and formatting. "
+        "Return only the translated text."
+    )
+
     def __init__(self, name="TranslationAgent", **kwargs):
         super().__init__(name, **kwargs)
 
@@ -12,8 +17,16 @@ class TranslationAgent(BaseAgent):
         return task.strip().lower().startswith("translate")
 
     def plan(self, task: str, context: dict) -> dict:
-        return {"task": task, "context": context}
+        text = task.strip()[len("translate"):].strip()
+        target = (context or {}).get("target_language", "fr")
+        # Preamble and context become shared fragments, so delegates that
+        # support it (GeminiProDelegate.generate_prompt) upload them only once.
+        prompt = self.build_prompt(f"Translate into {target}:\n\n{text}", context)
+        return {"task": task, "text": text, "target_language": target, "context": context, "prompt": prompt}
 
     def act(self, plan: dict, *_args, **_kwargs) -> str:
-        text = plan["task"].replace("translate", "").strip()
-        return translate_text(text, target_language="fr")  # adjust as needed
+        delegate = self.config.get("delegate") or get_delegate()
+        generate_prompt = getattr(delegate, "generate_prompt", None)
+        if generate_prompt is not None:
+            return generate_prompt(plan["prompt"])
+        return delegate.generate_response(plan["prompt"].render())
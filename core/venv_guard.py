@@ -1,11 +1,23 @@
 # core/venv_guard.py
 from pathlib import Path
-from importlib.metadata import version, PackageNotFoundError
+from importlib.metadata import distributions
+import hashlib
+import json
+import os
+import re
+import site
 import sys
 import subprocess
 import codecs
+import time
+
+try:  # exact specifier/marker handling when packaging is available
+    from packaging.requirements import InvalidRequirement, Requirement
+except ImportError:
+    Requirement = None
 
 REQS_FILE = Path(__file__).parent.parent / "requirements.txt"
+CACHE_DIR = Path(os.getenv("ADF_CACHE_DIR", Path.home() / ".cache" / "adf1"))
 
 REQUIRED = {
     "pytest": "8",
@@ -31,39 +43,134 @@ def open_requirements(path):
     with open(path, 'r', encoding=enc) as f:
         return [line.strip() for line in f if line.strip() and not line.startswith("#")]
 
-def check_packages():
+def check_packages(installed: dict = None):
     """
-    Check critical packages against REQUIRED dictionary.
-    Returns list of problems found.
+    Check critical packages against REQUIRED dictionary, looking them up in
+    one pass over the installed distributions. Returns list of problems found.
     """
+    installed = installed_versions() if installed is None else installed
     problems = []
     for name, major in REQUIRED.items():
-        try:
-            v = version(name)
-            if not v.startswith(f"{major}."):
-                problems.append(f"{name} is {v}, expected {major}.x")
-        except PackageNotFoundError:
+        v = installed.get(_normalize(name))
+        if v is None:
+            problems.append(f"{name} not installed")
+        elif not v.startswith(f"{major}."):
+            problems.append(f"{name} is {v}, expected {major}.x")
+    return problems
+
+def _normalize(name: str) -> str:
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+def installed_versions() -> dict:
+    """{normalized name: version} for every distribution, in a single pass."""
+    found = {}
+    for dist in distributions():
+        name = dist.metadata["Name"]
+        if name:
+            found.setdefault(_normalize(name), dist.version)
+    return found
+
+_PIN = re.compile(r"^([A-Za-z0-9][A-Za-z0-9._-]*)(?:\[[^\]]*\])?\s*(?:==\s*([^\s;,]+))?")
+
+def check_requirements(path=None, installed: dict = None) -> list:
+    """
+    Check every requirement in requirements.txt against the installed
+    distributions (resolved once, not per package). Returns problems found.
+    """
+    installed = installed_versions() if installed is None else installed
+    problems = []
+    for line in dict.fromkeys(open_requirements(path or REQS_FILE)):
+        if line.startswith("-"):  # pip options (-r, -e, --index-url ...)
+            continue
+        if Requirement is not None:
+            try:
+                req = Requirement(line)
+            except InvalidRequirement:
+                problems.append(f"cannot parse requirement '{line}'")
+                continue
+            if req.marker is not None and not req.marker.evaluate():
+                continue
+            name, have = req.name, installed.get(_normalize(req.name))
+            ok = have is not None and req.specifier.contains(have, prereleases=True)
+            wanted = str(req.specifier) or "any version"
+        else:
+            match = _PIN.match(line)
+            if not match:
+                continue
+            name, pin = match.groups()
+            have = installed.get(_normalize(name))
+            ok = have is not None and (pin is None or have == pin)
+            wanted = f"=={pin}" if pin else "any version"
+        if have is None:
             problems.append(f"{name} not installed")
+        elif not ok:
+            problems.append(f"{name} is {have}, expected {wanted}")
     return problems
 
-def check_venv_health() -> None:
+def environment_fingerprint(path=None) -> str:
+    """
+    Hash of requirements.txt, the interpreter, the guard's own pins and the
+    mtimes of the site-packages directories (which change on any install or
+    uninstall).
+    """
+    path = Path(path or REQS_FILE)
+    h = hashlib.sha256()
+    h.update(path.read_bytes() if path.exists() else b"")
+    h.update(f"{sys.executable}|{sys.version}|{sorted(REQUIRED.items())}".encode())
+    dirs = list(site.getsitepackages()) if hasattr(site, "getsitepackages") else []
+    dirs.append(site.getusersitepackages())
+    for d in sorted(set(dirs)):
+        try:
+            h.update(f"{d}:{os.stat(d).st_mtime_ns}".encode())
+        except OSError:
+            continue
+    return h.hexdigest()
+
+def _cache_file() -> Path:
+    return CACHE_DIR / "venv_guard.json"
+
+def _cached_ok(fingerprint: str) -> bool:
+    try:
+        return json.loads(_cache_file().read_text(encoding="utf-8")).get("fingerprint") == fingerprint
+    except (OSError, ValueError):
+        return False
+
+def _store_ok(fingerprint: str) -> None:
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        _cache_file().write_text(json.dumps({"fingerprint": fingerprint, "checked_at": time.time()}),
+                                 encoding="utf-8")
+    except OSError as e:
+        print(f"⚠️ could not cache venv check: {e}")
+
+def check_venv_health(use_cache: bool = True) -> None:
     """
     Verify all dependencies in requirements.txt are installed
     at the correct version in the current interpreter.
     Raises VenvMismatchError if any are missing/mismatched.
+
+    A passing check is remembered under environment_fingerprint() in
+    ~/.cache/adf1 (ADF_CACHE_DIR), so an unchanged environment is not
+    re-verified on the next start. Failures are never cached.
     """
     if not REQS_FILE.exists():
         print("⚠️ requirements.txt not found — skipping venv check")
         return
 
-    # Check critical packages first
-    problems = check_packages()
+    fingerprint = environment_fingerprint()
+    if use_cache and _cached_ok(fingerprint):
+        print("✅ Environment unchanged since last verification")
+        return
+
+    # Critical packages first, then every pin in requirements.txt, both
+    # against the same single scan of the installed distributions
+    installed = installed_versions()
+    problems = check_packages(installed) + check_requirements(installed=installed)
     if problems:
         raise VenvMismatchError("\n".join(problems))
 
-    # Optional: Still check requirements.txt for completeness
-    # This is now more of a "nice to have" since critical checks are above
-    print("✅ Critical packages verified")
+    _store_ok(fingerprint)
+    print("✅ Critical packages and requirements verified")
 
 def auto_fix():
     """Attempt to pip‑install anything missing or outdated."""
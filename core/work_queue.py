@@ -0,0 +1,338 @@
+# core/work_queue.py
+"""
+Work queue for running plan steps across processes and machines.
+
+A coordinator enqueues the steps of a compiled plan; any number of workers
+claim them under a time-limited lease, renew it with heartbeats while the
+step runs, and report the result.  A step whose lease expires (its worker
+died or stalled) is handed to the next worker, up to ``max_attempts``.
+
+Workers send the step log back with the result, and ``collect`` writes it
+into the coordinator's ``orchestrator_artifacts/`` under the usual
+``<task>_step<N>.log`` name, so reporting works the same as for a local run.
+
+``SQLiteWorkQueue`` covers one machine (or a shared filesystem that supports
+SQLite locking).  Shared backends implement ``WorkQueue`` and register a URL
+scheme with ``register_backend``; ``open_queue(url)`` picks the backend
+(``ADF_WORK_QUEUE``, default ``sqlite:///orchestrator_artifacts/work_queue.sqlite3``).
+
+CLI:
+    python -m core.work_queue enqueue instructions/big-trial.json
+    python -m core.work_queue worker [--id NAME] [--once]
+    python -m core.work_queue status <plan_id>
+    python -m core.work_queue collect <plan_id>
+"""
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+ARTIFACTS_DIR = Path("orchestrator_artifacts")
+DEFAULT_URL = f"sqlite:///{ARTIFACTS_DIR / 'work_queue.sqlite3'}"
+LEASE_SEC = float(os.getenv("ADF_WORK_LEASE_SEC", "60"))
+
+QUEUED, LEASED, DONE, FAILED = "queued", "leased", "done", "failed"
+
+
+class Job:
+    __slots__ = ("id", "plan_id", "step_index", "spec", "attempts")
+
+    def __init__(self, id: int, plan_id: str, step_index: int, spec: Dict[str, Any], attempts: int):
+        self.id = id
+        self.plan_id = plan_id
+        self.step_index = step_index
+        self.spec = spec
+        self.attempts = attempts
+
+
+class WorkQueue:
+    """Backend interface. Every method must be safe across processes."""
+
+    def enqueue(self, plan_id: str, steps: List[Dict[str, Any]], max_attempts: int = 3) -> int:
+        raise NotImplementedError
+
+    def claim(self, worker_id: str, lease_sec: float = LEASE_SEC) -> Optional[Job]:
+        """Lease the next runnable step (queued, or leased with an expired lease)."""
+        raise NotImplementedError
+
+    def heartbeat(self, job_id: int, worker_id: str, lease_sec: float = LEASE_SEC) -> bool:
+        """Extend a lease; False means it was lost and the result will be ignored."""
+        raise NotImplementedError
+
+    def complete(self, job_id: int, worker_id: str, result: Dict[str, Any], log: str = "") -> bool:
+        raise NotImplementedError
+
+    def fail(self, job_id: int, worker_id: str, error: str, log: str = "",
+             result: Optional[Dict[str, Any]] = None) -> bool:
+        """Record a failed attempt; the step is re-queued until max_attempts."""
+        raise NotImplementedError
+
+    def status(self, plan_id: str) -> Dict[str, int]:
+        raise NotImplementedError
+
+    def results(self, plan_id: str) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+
+class SQLiteWorkQueue(WorkQueue):
+    _SCHEMA = """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id            INTEGER PRIMARY KEY AUTOINCREMENT,
+        plan_id       TEXT NOT NULL,
+        step_index    INTEGER,
+        spec          TEXT NOT NULL,
+        state         TEXT NOT NULL,
+        attempts      INTEGER NOT NULL DEFAULT 0,
+        max_attempts  INTEGER NOT NULL,
+        worker        TEXT,
+        lease_expires REAL,
+        result        TEXT,
+        log           TEXT,
+        error         TEXT,
+        updated_at    REAL
+    );
+    CREATE INDEX IF NOT EXISTS idx_jobs_state ON jobs (state, lease_expires);
+    CREATE INDEX IF NOT EXISTS idx_jobs_plan ON jobs (plan_id, step_index);
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path or ARTIFACTS_DIR / "work_queue.sqlite3")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Autocommit mode; claims take an explicit BEGIN IMMEDIATE write lock
+        self._conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None,
+                                     check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(self._SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def enqueue(self, plan_id: str, steps: List[Dict[str, Any]], max_attempts: int = 3) -> int:
+        now = time.time()
+        rows = [(plan_id, step.get("step_index", i), json.dumps(step, default=str), QUEUED, max_attempts, now)
+                for i, step in enumerate(steps, start=1)]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.executemany(
+                "INSERT INTO jobs (plan_id, step_index, spec, state, max_attempts, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self._conn.execute("COMMIT")
+        return len(rows)
+
+    def claim(self, worker_id: str, lease_sec: float = LEASE_SEC) -> Optional[Job]:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Expired leases that are out of attempts fail instead of looping forever
+                self._conn.execute(
+                    "UPDATE jobs SET state = ?, error = 'lease expired', updated_at = ? "
+                    "WHERE state = ? AND lease_expires < ? AND attempts >= max_attempts",
+                    (FAILED, now, LEASED, now))
+                row = self._conn.execute(
+                    "SELECT * FROM jobs WHERE state = ? OR (state = ? AND lease_expires < ?) "
+                    "ORDER BY id LIMIT 1", (QUEUED, LEASED, now)).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                self._conn.execute(
+                    "UPDATE jobs SET state = ?, worker = ?, lease_expires = ?, attempts = attempts + 1, "
+                    "updated_at = ? WHERE id = ?", (LEASED, worker_id, now + lease_sec, now, row["id"]))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return Job(row["id"], row["plan_id"], row["step_index"], json.loads(row["spec"]), row["attempts"] + 1)
+
+    def _update_leased(self, sql: str, args: tuple) -> bool:
+        with self._lock:
+            cur = self._conn.execute(sql + " WHERE id = ? AND worker = ? AND state = ?", args)
+        return cur.rowcount == 1
+
+    def heartbeat(self, job_id: int, worker_id: str, lease_sec: float = LEASE_SEC) -> bool:
+        now = time.time()
+        return self._update_leased("UPDATE jobs SET lease_expires = ?, updated_at = ?",
+                                   (now + lease_sec, now, job_id, worker_id, LEASED))
+
+    def complete(self, job_id: int, worker_id: str, result: Dict[str, Any], log: str = "") -> bool:
+        return self._update_leased(
+            "UPDATE jobs SET state = ?, result = ?, log = ?, lease_expires = NULL, updated_at = ?",
+            (DONE, json.dumps(result, default=str), log, time.time(), job_id, worker_id, LEASED))
+
+    def fail(self, job_id: int, worker_id: str, error: str, log: str = "",
+             result: Optional[Dict[str, Any]] = None) -> bool:
+        return self._update_leased(
+            "UPDATE jobs SET state = CASE WHEN attempts >= max_attempts THEN ? ELSE ? END, "
+            "error = ?, result = ?, log = ?, lease_expires = NULL, updated_at = ?",
+            (FAILED, QUEUED, error, json.dumps(result, default=str) if result else None, log,
+             time.time(), job_id, worker_id, LEASED))
+
+    def status(self, plan_id: str) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT state, COUNT(*) FROM jobs WHERE plan_id = ? GROUP BY state", (plan_id,)).fetchall()
+        return {state: count for state, count in rows}
+
+    def results(self, plan_id: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT step_index, state, attempts, worker, result, log, error FROM jobs "
+                "WHERE plan_id = ? ORDER BY step_index", (plan_id,)).fetchall()
+        out = []
+        for row in rows:
+            item = dict(row)
+            item["result"] = json.loads(item["result"]) if item["result"] else None
+            out.append(item)
+        return out
+
+
+def _sqlite_queue(url: str) -> SQLiteWorkQueue:
+    # sqlite:///relative/path or sqlite:////absolute/path
+    path = url[len("sqlite:///"):]
+    return SQLiteWorkQueue(Path(path) if path else None)
+
+
+_backends: Dict[str, Callable[[str], WorkQueue]] = {"sqlite": _sqlite_queue}
+
+
+def register_backend(scheme: str, factory: Callable[[str], WorkQueue]) -> None:
+    """Plug in a shared backend, e.g. register_backend("redis", RedisWorkQueue)."""
+    _backends[scheme] = factory
+
+
+def open_queue(url: Optional[str] = None) -> WorkQueue:
+    url = url or os.getenv("ADF_WORK_QUEUE", DEFAULT_URL)
+    scheme = url.split("://", 1)[0]
+    if scheme not in _backends:
+        raise ValueError(f"No work-queue backend registered for '{scheme}://'")
+    return _backends[scheme](url)
+
+
+# --- coordinator ------------------------------------------------------------
+
+def enqueue_plan(queue: WorkQueue, path: str, max_attempts: int = 3) -> str:
+    """Compile an instruction file and enqueue its steps; returns the plan id."""
+    from core.plan_compiler import compile_plan
+    plan = compile_plan(path)
+    plan_id = f"{plan.get('id') or Path(path).stem}-{uuid.uuid4().hex[:8]}"
+    queue.enqueue(plan_id, plan["steps"], max_attempts=max_attempts)
+    return plan_id
+
+
+def collect(queue: WorkQueue, plan_id: str, artifacts_dir: Path = ARTIFACTS_DIR) -> List[Dict[str, Any]]:
+    """
+    Write finished and failed steps' logs into the local artifacts layout;
+    returns the results.  Logs are always overwritten, so a log left over
+    from an earlier local run of the same task never shadows this plan's.
+    """
+    results = []
+    for item in queue.results(plan_id):
+        result = item["result"]
+        if item["state"] in (DONE, FAILED) and result and result.get("log_file") and item["log"]:
+            path = artifacts_dir / Path(result["log_file"]).name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(item["log"], encoding="utf-8")
+            result["log_file"] = str(path)
+        results.append(item)
+    return results
+
+
+# --- worker -----------------------------------------------------------------
+
+def _run_job(job: Job) -> Dict[str, Any]:
+    """Run one compiled step exactly as ``plan_compiler.run_plan`` would."""
+    from core.plan_compiler import run_plan
+    step_id, ok, out = run_plan({"steps": [job.spec]})[0]
+    result: Dict[str, Any] = {"step_id": step_id, "ok": ok}
+    if isinstance(out, Path):
+        result["log_file"] = str(out)
+    else:
+        result["output"] = out
+    return result
+
+
+def run_worker(queue: WorkQueue, worker_id: Optional[str] = None, lease_sec: float = LEASE_SEC,
+               poll_interval: float = 1.0, once: bool = False,
+               runner: Callable[[Job], Dict[str, Any]] = _run_job) -> int:
+    """Claim and run steps until the queue is empty (``once``) or forever. Returns steps run."""
+    from core.artifact_store import read_log
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    done = 0
+    while True:
+        job = queue.claim(worker_id, lease_sec)
+        if job is None:
+            if once:
+                return done
+            time.sleep(poll_interval)
+            continue
+
+        stop = threading.Event()
+
+        def _beat():
+            while not stop.wait(lease_sec / 3):
+                if not queue.heartbeat(job.id, worker_id, lease_sec):
+                    return
+
+        beater = threading.Thread(target=_beat, name=f"lease-{job.id}", daemon=True)
+        beater.start()
+        try:
+            result = runner(job)
+        except Exception as e:
+            queue.fail(job.id, worker_id, str(e))
+        else:
+            log = (read_log(result["log_file"]) if result.get("log_file") else None) or ""
+            if not result.get("ok", True):
+                queue.fail(job.id, worker_id, f"step failed, see {result.get('log_file')}", log, result)
+            else:
+                queue.complete(job.id, worker_id, result, log)
+        finally:
+            stop.set()
+            beater.join()
+        done += 1
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m core.work_queue")
+    parser.add_argument("--queue", help=f"backend URL (default $ADF_WORK_QUEUE or {DEFAULT_URL})")
+    sub = parser.add_subparsers(dest="command", required=True)
+    enq = sub.add_parser("enqueue")
+    enq.add_argument("path")
+    enq.add_argument("--max-attempts", type=int, default=3)
+    work = sub.add_parser("worker")
+    work.add_argument("--id")
+    work.add_argument("--once", action="store_true", help="exit when the queue is empty")
+    for name in ("status", "collect"):
+        sub.add_parser(name).add_argument("plan_id")
+    args = parser.parse_args(argv)
+
+    queue = open_queue(args.queue)
+    if args.command == "enqueue":
+        from core.validator import ValidationError
+        try:
+            print(enqueue_plan(queue, args.path, args.max_attempts))
+        except ValidationError as e:
+            print(f"[ERROR] {e}", file=sys.stderr)
+            return 1
+    elif args.command == "worker":
+        print(f"Worker ran {run_worker(queue, args.id, once=args.once)} steps")
+    elif args.command == "status":
+        print(json.dumps(queue.status(args.plan_id)))
+    else:
+        for item in collect(queue, args.plan_id):
+            log_file = (item["result"] or {}).get("log_file", "")
+            print(f"  step {item['step_index']}: {item['state']} (attempts {item['attempts']}) {log_file}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,293 @@
+# core/worker_pool.py
+"""
+Process-pool backend for CPU-bound actions.
+
+Actions in ``CPU_BOUND_ACTIONS`` run in a pool of pre-started worker
+processes instead of the orchestrator's interpreter, so they do not hold its
+GIL.  Workers come from a forkserver that has already imported
+``core.actions``, and the pool is warmed up front, so a step pays neither
+interpreter start-up nor import time.
+
+Large string/bytes inputs (over ``ADF_WORKER_SHM_BYTES``) travel through
+``multiprocessing.shared_memory`` rather than being pickled.  Every task has
+a timeout (``ADF_WORKER_TIMEOUT``).  A process pool cannot stop one running
+task, so an overrunning task's worker is killed (and the pool rebuilt) only
+when no other caller has work in flight; otherwise just that caller gets the
+timeout and the pool is marked for recycling, so the stuck worker is killed
+(and the pool rebuilt) as soon as the in-flight count drops to zero.  ``ADF_WORKER_MEMORY_MB``
+caps each worker's address space.
+
+Enabled with ``ADF_WORKER_POOL=1``; ``ADF_WORKERS`` sets the pool size
+(default: all cores).
+"""
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeout
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+CPU_BOUND_ACTIONS = frozenset({"validate", "apply_patch"})
+
+DEFAULT_TIMEOUT_SEC = float(os.getenv("ADF_WORKER_TIMEOUT", "300"))
+SHM_THRESHOLD_BYTES = int(os.getenv("ADF_WORKER_SHM_BYTES", str(1024 * 1024)))
+PRELOAD = ("core.actions",)
+
+_in_worker = False
+
+
+class WorkerTimeoutError(Exception):
+    """A task ran past its timeout; its worker was killed if nothing else was running."""
+    pass
+
+
+class WorkerCrashedError(Exception):
+    """A worker died mid-task (e.g. hit its memory limit); the pool was rebuilt."""
+    pass
+
+
+class _SharedBlob:
+    """Picklable handle to a large str/bytes value held in shared memory."""
+
+    __slots__ = ("name", "size", "is_text")
+
+    def __init__(self, name: str, size: int, is_text: bool):
+        self.name = name
+        self.size = size
+        self.is_text = is_text
+
+    def __getstate__(self):
+        return (self.name, self.size, self.is_text)
+
+    def __setstate__(self, state):
+        self.name, self.size, self.is_text = state
+
+    def load(self):
+        shm = shared_memory.SharedMemory(name=self.name)
+        try:
+            data = bytes(shm.buf[:self.size])
+        finally:
+            shm.close()
+        return data.decode("utf-8") if self.is_text else data
+
+
+def _share(value: Any, threshold: int, segments: List[shared_memory.SharedMemory]) -> Any:
+    """Replace large str/bytes values (recursively) with shared-memory handles."""
+    if isinstance(value, dict):
+        return {k: _share(v, threshold, segments) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_share(v, threshold, segments) for v in value]
+    if isinstance(value, (str, bytes)) and len(value) >= threshold:
+        data = value.encode("utf-8") if isinstance(value, str) else value
+        shm = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+        shm.buf[:len(data)] = data
+        segments.append(shm)
+        return _SharedBlob(shm.name, len(data), isinstance(value, str))
+    return value
+
+
+def _unshare(value: Any) -> Any:
+    if isinstance(value, _SharedBlob):
+        return value.load()
+    if isinstance(value, dict):
+        return {k: _unshare(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_unshare(v) for v in value]
+    return value
+
+
+# --- worker side ----------------------------------------------------------
+
+def _init_worker(memory_limit_bytes: Optional[int]) -> None:
+    global _in_worker
+    _in_worker = True
+    if memory_limit_bytes and resource is not None:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit_bytes, memory_limit_bytes))
+    for module in PRELOAD:
+        __import__(module)
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _run_action_in_worker(step: dict, action: str, safe_mode: bool) -> Tuple[bool, Path]:
+    from core.actions import _run_action
+    return _run_action(_unshare(step), action, safe_mode)
+
+
+def in_worker() -> bool:
+    """True inside a pool worker (where nested fan-out must run serially)."""
+    return _in_worker
+
+
+# --- parent side ----------------------------------------------------------
+
+class WorkerPool:
+    def __init__(self, max_workers: Optional[int] = None, timeout: float = DEFAULT_TIMEOUT_SEC,
+                 memory_limit_mb: Optional[int] = None, shm_threshold: int = SHM_THRESHOLD_BYTES):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.shm_threshold = shm_threshold
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0  # run/map calls waiting on results
+        self._recycle = False  # a timed-out worker was left running
+
+    def _context(self):
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            ctx = multiprocessing.get_context("forkserver")
+            ctx.set_forkserver_preload(list(PRELOAD))
+            return ctx
+        return multiprocessing.get_context("spawn")
+
+    def start(self) -> "WorkerPool":
+        """Start the workers and wait until every one has finished importing."""
+        with self._lock:
+            if self._executor is None:
+                limit = self.memory_limit_mb * 1024 * 1024 if self.memory_limit_mb else None
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=self._context(),
+                    initializer=_init_worker, initargs=(limit,),
+                )
+                # Each submit to a busy pool spawns another worker, so this
+                # brings all of them up now rather than on the first real task.
+                warmup = [self._executor.submit(_ping) for _ in range(self.max_workers)]
+                for f in warmup:
+                    f.result()
+            return self
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+    def _kill(self, sole_caller: bool = False) -> bool:
+        """
+        Terminate all workers (the only way to stop one stuck task) and rebuild
+        lazily.  With ``sole_caller``, only if no other call is in flight, so a
+        timeout never fails other callers' tasks; otherwise the pool is marked
+        for recycling once they finish.  Returns whether it killed.
+        """
+        with self._lock:
+            if sole_caller and self._in_flight > 1:
+                self._recycle = True
+                return False
+            executor, self._executor = self._executor, None
+            self._recycle = False
+        if executor is None:
+            return True
+        # ProcessPoolExecutor has no per-task cancel for running work.
+        for proc in list(getattr(executor, "_processes", {}).values()):
+            proc.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+        return True
+
+    def _enter(self) -> ProcessPoolExecutor:
+        while True:
+            executor = self.start()._executor
+            with self._lock:
+                # Retry if the pool was recycled between start() and here
+                if executor is not None and executor is self._executor:
+                    self._in_flight += 1
+                    return executor
+
+    def _exit(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            recycle = self._recycle and self._in_flight == 0
+        if recycle:
+            # The last caller is done; now the stuck worker can go
+            self._kill(sole_caller=True)
+
+    def _timed_out(self, what: str, timeout: float) -> WorkerTimeoutError:
+        if self._kill(sole_caller=True):
+            return WorkerTimeoutError(f"{what} exceeded {timeout}s")
+        return WorkerTimeoutError(f"{what} exceeded {timeout}s (worker left running until the shared pool drains)")
+
+    def run(self, fn: Callable, *args, timeout: Optional[float] = None) -> Any:
+        """Run ``fn(*args)`` in a worker, enforcing the timeout."""
+        timeout = timeout or self.timeout
+        executor = self._enter()
+        try:
+            future = executor.submit(fn, *args)
+            try:
+                return future.result(timeout=timeout)
+            except FuturesTimeout:
+                future.cancel()
+                raise self._timed_out(getattr(fn, "__name__", str(fn)), timeout)
+            except BrokenProcessPool as e:
+                self._kill()
+                raise WorkerCrashedError(str(e)) from e
+        finally:
+            self._exit()
+
+    def map(self, fn: Callable, items: Iterable, chunksize: Optional[int] = None) -> List[Any]:
+        """Parallel ``map`` across all workers, in input order."""
+        items = list(items)
+        if not items:
+            return []
+        if chunksize is None:
+            chunksize = max(1, len(items) // (self.max_workers * 4))
+        executor = self._enter()
+        try:
+            return list(executor.map(fn, items, chunksize=chunksize, timeout=self.timeout))
+        except FuturesTimeout:
+            # map() cancels its own pending chunks when it gives up
+            raise self._timed_out(f"map({getattr(fn, '__name__', fn)})", self.timeout)
+        except BrokenProcessPool as e:
+            self._kill()
+            raise WorkerCrashedError(str(e)) from e
+        finally:
+            self._exit()
+
+    def run_action(self, step: Any, action: str, safe_mode: bool) -> Tuple[bool, Path]:
+        """Run one action step in a worker, passing large inputs via shared memory."""
+        payload = step.to_dict() if hasattr(step, "to_dict") else dict(step)
+        segments: List[shared_memory.SharedMemory] = []
+        try:
+            payload = _share(payload, self.shm_threshold, segments)
+            return self.run(_run_action_in_worker, payload, action, safe_mode)
+        finally:
+            for shm in segments:
+                shm.close()
+                shm.unlink()
+
+
+def parallel_map(fn: Callable, items: Iterable) -> List[Any]:
+    """``map`` over the worker pool when it is enabled, else in-process."""
+    pool = get_worker_pool()
+    if pool is None:
+        return [fn(item) for item in items]
+    return pool.map(fn, items)
+
+
+_pool: Optional[WorkerPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_worker_pool() -> Optional[WorkerPool]:
+    """Return the process-wide pool, or None when disabled or inside a worker."""
+    global _pool
+    if _in_worker or os.getenv("ADF_WORKER_POOL", "0").lower() not in ("1", "true", "yes", "on"):
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                memory = os.getenv("ADF_WORKER_MEMORY_MB")
+                _pool = WorkerPool(
+                    max_workers=int(os.getenv("ADF_WORKERS", "0")) or None,
+                    memory_limit_mb=int(memory) if memory else None,
+                )
+                atexit.register(_pool.shutdown)
+    return _pool
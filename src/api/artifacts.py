@@ -0,0 +1,103 @@
+# src/api/artifacts.py
+"""
+Run, step-log and artifact endpoints (see core.artifact_access).
+
+    GET /v1/runs                          runs with step logs, newest first
+    GET /v1/artifacts/{path}              the file; honours Range and If-None-Match
+    GET /v1/artifacts/{path}?tail=200     only the last 200 lines
+    GET /v1/artifacts/{path}/follow       server-sent events as the log grows
+
+Only log/report suffixes are served (core.artifact_access.SERVED_SUFFIXES);
+main.py mounts the router behind the same user check as the other routes.
+"""
+import json
+
+from fastapi import APIRouter, Header, HTTPException, Query, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+from core.artifact_access import (ArtifactNotFound, RangeNotSatisfiable, follow, iter_bytes,
+                                  list_runs, parse_range, resolve_artifact, tail, tail_etag)
+
+router = APIRouter(prefix="/v1", tags=["artifacts"])
+
+_TEXT_SUFFIXES = {".log", ".txt", ".md", ".diff", ".patch", ".folded"}
+
+
+def _resolve(path: str):
+    try:
+        return resolve_artifact(path)
+    except ArtifactNotFound:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+
+
+def _media_type(name: str) -> str:
+    suffix = name[name.rfind("."):] if "." in name else ""
+    if suffix == ".json":
+        return "application/json"
+    return "text/plain; charset=utf-8" if suffix in _TEXT_SUFFIXES else "application/octet-stream"
+
+
+@router.get("/runs")
+def runs(limit: int = Query(50, ge=1, le=500)):
+    return {"runs": list_runs(limit=limit)}
+
+
+@router.get("/artifacts/{path:path}/follow")
+async def follow_artifact(path: str, request: Request, offset: int = Query(0, ge=0),
+                          idle_timeout: float = Query(30.0, gt=0, le=600)):
+    """
+    Streams appended log data as server-sent events, starting at ``offset``
+    (pass the size already fetched). Ends with a ``done`` event once the log
+    has stopped growing for ``idle_timeout`` seconds.
+    """
+    artifact = _resolve(path)
+
+    async def events():
+        position = offset
+        async for data in follow(artifact, offset, idle_timeout=idle_timeout):
+            if await request.is_disconnected():
+                return
+            position += len(data)
+            payload = {"offset": position, "text": data.decode("utf-8", errors="replace")}
+            yield f"data: {json.dumps(payload)}\n\n"
+        yield f"event: done\ndata: {json.dumps({'offset': position})}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/artifacts/{path:path}")
+def get_artifact(path: str, tail_lines: int = Query(None, alias="tail", ge=1, le=100000),
+                 range_header: str = Header(None, alias="Range"),
+                 if_none_match: str = Header(None)):
+    artifact = _resolve(path)
+    etag = artifact.etag if tail_lines is None else tail_etag(artifact, tail_lines)
+    headers = {"ETag": etag, "Accept-Ranges": "bytes", "Cache-Control": "no-cache"}
+    media_type = _media_type(artifact.name)
+
+    if if_none_match and etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+
+    if tail_lines is not None:
+        del headers["Accept-Ranges"]
+        return Response(tail(artifact, tail_lines), media_type=media_type, headers=headers)
+
+    try:
+        byte_range = parse_range(range_header, artifact.size)
+    except RangeNotSatisfiable as e:
+        return Response(status_code=416, headers={**headers, "Content-Range": str(e)})
+
+    if byte_range is None:
+        if artifact.path is not None:
+            # FileResponse uses sendfile when the server supports it
+            return FileResponse(artifact.path, media_type=media_type, headers=headers)
+        return Response(artifact.data, media_type=media_type, headers=headers)
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{artifact.size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(iter_bytes(artifact, start, end), status_code=206,
+                             media_type=media_type, headers=headers)
@@ -1,12 +1,23 @@
 # src/api/main.py
-from fastapi import FastAPI, HTTPException, Body, Query, Header, Form, File, UploadFile
+import asyncio
+import json
+import os
+from fastapi import FastAPI, HTTPException, Body, Query, Header, Form, File, UploadFile, Request, Depends
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
 from typing import List, Dict
 
+from core.delegate_factory import get_delegate
+from security.validation import sanitize_input
+
 # --- Import Settings and Services ---
 # The import path is adjusted to correctly locate the settings instance.
 from ..utils.config import settings
 # Assuming other services like PairingService are also needed.
 from ..services.pairing_service import PairingService
+from ..services.session_cache import InMemoryStore, SessionCache, SQLiteStore
+from ..core.audio.vad import AudioFormatError, speech_segments
+from .artifacts import router as artifacts_router
 
 # --- Mock Implementations for Context ---
 class MockDBSession: pass
@@ -22,12 +33,34 @@ def get_user(authorization: str) -> Dict[str, str]:
 
 pairing_svc = PairingService(db, settings.firestore_collection_prefix)
 
+# Active conversations/pairings stay in-process; message appends are
+# committed to the store in batches (see services.session_cache).
+session_cache = SessionCache(
+    SQLiteStore(os.environ["SESSION_STORE_PATH"]) if os.getenv("SESSION_STORE_PATH") else InMemoryStore()
+)
+
 # --- FastAPI App and Routes ---
 app = FastAPI(
     title="Translation and Pairing Service API",
     description="Manages translation sessions and user pairings.",
 )
 
+
+def require_user(authorization: str = Header(None)) -> Dict[str, str]:
+    """Authenticate and rate-limit a request, as the inline routes do."""
+    user = get_user(authorization)
+    if not bucket.allow(f"artifacts:{user['uid']}"):
+        raise HTTPException(status_code=429, detail="Rate limited")
+    return user
+
+
+app.include_router(artifacts_router, dependencies=[Depends(require_user)])
+
+@app.on_event("shutdown")
+def flush_sessions():
+    """Commit any messages still waiting in the write-behind queue."""
+    session_cache.close()
+
 @app.get("/")
 def read_root():
     """A root endpoint to confirm the API is running."""
@@ -57,5 +90,105 @@ async def speech(
     if not settings.stt_enabled:
         raise HTTPException(status_code=501, detail="Server-side STT disabled")
 
-    # TODO: transcribe audio and forward to add_message
-    return {"status": "stub", "conversation_id": conversation_id, "sender": sender}```
\ No newline at end of file
+    # VAD first: silent uploads never reach STT, and STT only gets the speech
+    # segments (mono, at its native rate).
+    raw = await audio.read()
+    try:
+        segments, vad_stats = await asyncio.to_thread(speech_segments, raw)
+    except AudioFormatError as e:
+        # Compressed uploads (e.g. audio/webm from MediaRecorder) go to STT as-is
+        segments, vad_stats = [raw], {"skipped": str(e)}
+    if not segments:
+        return {"status": "silence", "conversation_id": conversation_id, "sender": sender, "vad": vad_stats}
+
+    # TODO: transcribe `segments` and forward to add_message
+    return {"status": "stub", "conversation_id": conversation_id, "sender": sender, "vad": vad_stats}
+
+
+class MessageRequest(BaseModel):
+    sender: str
+    text: str
+
+
+@app.post("/conversations/{conversation_id}/messages")
+def add_message(conversation_id: str, body: MessageRequest, authorization: str = Header(None)):
+    """Appends a message; it is readable immediately and persisted in the background."""
+    user = get_user(authorization)
+    if not bucket.allow(f"message:{user['uid']}"):
+        raise HTTPException(status_code=429, detail="Rate limited")
+    pairing = session_cache.get_pairing(conversation_id)
+    if pairing is not None and user["uid"] not in pairing.get("users", ()):
+        raise HTTPException(status_code=403, detail="Not a member of this conversation")
+    session_cache.add_message(conversation_id, {"sender": body.sender, "text": body.text, "uid": user["uid"]})
+    return {"status": "queued", "conversation_id": conversation_id}
+
+
+@app.get("/conversations/{conversation_id}/messages")
+def get_messages(conversation_id: str, authorization: str = Header(None)):
+    """Messages of a conversation the caller belongs to (see SessionCache.is_member)."""
+    user = get_user(authorization)
+    if not bucket.allow(f"message:{user['uid']}"):
+        raise HTTPException(status_code=429, detail="Rate limited")
+    if not session_cache.is_member(conversation_id, user["uid"]):
+        raise HTTPException(status_code=403, detail="Not a member of this conversation")
+    return {"conversation_id": conversation_id, "messages": session_cache.get_messages(conversation_id)}
+
+
+# --- Delegate-task endpoints (see core.capability_service) ---
+class DelegateTaskRequest(BaseModel):
+    prompt: str
+
+
+@app.post("/v1/delegate-task")
+async def delegate_task(body: DelegateTaskRequest, authorization: str = Header(None)):
+    """Delegates a prompt to the active model and returns the full response."""
+    user = get_user(authorization)
+    if not bucket.allow(f"delegate:{user['uid']}"):
+        raise HTTPException(status_code=429, detail="Rate limited")
+    try:
+        prompt = sanitize_input(body.prompt)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    response = await get_delegate().agenerate_response(prompt)
+    return {"status": "success", "response": response}
+
+
+def _sse(data: dict, event: str | None = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+@app.post("/v1/delegate-task/stream")
+async def delegate_task_stream(body: DelegateTaskRequest, request: Request,
+                               authorization: str = Header(None)):
+    """
+    Streams the delegate's tokens as server-sent events. The upstream model
+    stream is closed as soon as the client disconnects.
+    """
+    user = get_user(authorization)
+    if not bucket.allow(f"delegate:{user['uid']}"):
+        raise HTTPException(status_code=429, detail="Rate limited")
+    try:
+        prompt = sanitize_input(body.prompt)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def events():
+        stream = get_delegate().astream_response(prompt)
+        try:
+            async for token in stream:
+                if await request.is_disconnected():
+                    break
+                yield _sse({"token": token})
+            else:
+                yield _sse({"status": "success"}, event="done")
+        except Exception as e:
+            yield _sse({"detail": str(e)}, event="error")
+        finally:
+            await stream.aclose()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
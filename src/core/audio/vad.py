@@ -0,0 +1,207 @@
+# src/core/audio/vad.py
+"""
+Voice-activity detection and silence trimming for uploaded audio.
+
+Parsing and segmentation work on 16-bit PCM WAV uploads in place: the RIFF
+chunks are parsed without copying and every frame and segment is a
+``memoryview`` slice of the upload buffer.  Frames whose RMS energy stays
+below an adaptive noise-floor threshold are dropped, utterances are split
+at pauses of at least ``pause_ms``, and only the speech segments are
+converted for STT.  That conversion (downmix to mono, linear-interpolation
+resample) is a plain Python loop per sample that builds a new array per
+segment; audio already mono at the native rate is returned as-is.  RMS is
+likewise computed in Python, so this suits short voice uploads, not long
+recordings.
+
+``VadSegmenter`` is incremental: ``feed()`` takes frames as they arrive and
+returns each utterance as soon as the pause after it is seen.
+
+``/speech`` runs every WAV upload through ``speech_segments`` and answers
+silent ones without calling STT; transcribing the segments is still the
+endpoint's TODO, as this tree has no STT backend yet.
+"""
+import math
+import operator
+import struct
+import sys
+from array import array
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+STT_SAMPLE_RATE = 16000
+FRAME_MS = 30
+
+
+class AudioFormatError(ValueError):
+    """The upload is not 16-bit PCM WAV."""
+    pass
+
+
+class PcmAudio(NamedTuple):
+    samples: memoryview  # int16, interleaved if multi-channel
+    rate: int
+    channels: int
+
+    @property
+    def duration_sec(self) -> float:
+        return len(self.samples) / self.channels / self.rate
+
+
+class Segment(NamedTuple):
+    start: int  # sample offsets into PcmAudio.samples
+    end: int
+
+
+def parse_wav(data) -> PcmAudio:
+    """View the PCM samples of a WAV buffer in place (no copy)."""
+    buf = memoryview(data)
+    if len(buf) < 12 or bytes(buf[0:4]) != b"RIFF" or bytes(buf[8:12]) != b"WAVE":
+        raise AudioFormatError("not a RIFF/WAVE file")
+    pos, fmt, pcm = 12, None, None
+    while pos + 8 <= len(buf):
+        chunk_id = bytes(buf[pos:pos + 4])
+        (size,) = struct.unpack_from("<I", buf, pos + 4)
+        body = buf[pos + 8:pos + 8 + size]
+        if chunk_id == b"fmt ":
+            fmt = struct.unpack_from("<HHIIHH", body)
+        elif chunk_id == b"data":
+            pcm = body
+            break
+        pos += 8 + size + (size & 1)
+    if fmt is None or pcm is None:
+        raise AudioFormatError("missing fmt or data chunk")
+    audio_format, channels, rate, _, _, bits = fmt
+    if audio_format != 1 or bits != 16:
+        raise AudioFormatError(f"unsupported WAV encoding (format {audio_format}, {bits}-bit)")
+    pcm = pcm[:len(pcm) - len(pcm) % 2]
+    if sys.byteorder == "little":
+        samples = pcm.cast("h")
+    else:  # WAV is little-endian; big-endian hosts need one swapped copy
+        swapped = array("h", pcm.tobytes())
+        swapped.byteswap()
+        samples = memoryview(swapped)
+    return PcmAudio(samples, rate, channels)
+
+
+def frame_rms(frame: memoryview) -> float:
+    if not len(frame):
+        return 0.0
+    return math.sqrt(sum(map(operator.mul, frame, frame)) / len(frame))
+
+
+class VadSegmenter:
+    """
+    Energy-based voice-activity detector.
+
+    A frame is speech when its RMS exceeds ``max(min_rms, noise_floor * ratio)``;
+    the noise floor follows the quietest recent frames. An utterance starts
+    after ``start_frames`` speech frames and ends after ``pause_ms`` of
+    silence; ``padding_ms`` of audio is kept on either side.
+    """
+
+    def __init__(self, rate: int, channels: int = 1, frame_ms: int = FRAME_MS,
+                 pause_ms: int = 300, padding_ms: int = 90, start_frames: int = 2,
+                 min_rms: float = 300.0, ratio: float = 3.0, min_speech_ms: int = 120):
+        self.frame_len = max(1, rate * frame_ms // 1000) * channels
+        self.pause_frames = max(1, pause_ms // frame_ms)
+        self.padding = rate * padding_ms // 1000 * channels
+        self.start_frames = start_frames
+        self.min_rms = min_rms
+        self.ratio = ratio
+        self.min_speech = rate * min_speech_ms // 1000 * channels
+        self.noise_floor: Optional[float] = None
+        self._pos = 0
+        self._speech_run = 0
+        self._silence_run = 0
+        self._start: Optional[int] = None
+        self._last_speech_end = 0
+
+    def _threshold(self) -> float:
+        floor = self.noise_floor if self.noise_floor is not None else self.min_rms / self.ratio
+        return max(self.min_rms, floor * self.ratio)
+
+    def feed(self, frame: memoryview) -> List[Segment]:
+        """Consume one frame; returns the utterance it ended, if any."""
+        start, end = self._pos, self._pos + len(frame)
+        self._pos = end
+        rms = frame_rms(frame)
+        if rms > self._threshold():
+            self._speech_run += 1
+            self._silence_run = 0
+            self._last_speech_end = end
+            if self._start is None and self._speech_run >= self.start_frames:
+                self._start = max(0, start - (self.start_frames - 1) * len(frame) - self.padding)
+            return []
+        # Quiet frame: let the noise floor drift towards it
+        self.noise_floor = rms if self.noise_floor is None else 0.95 * self.noise_floor + 0.05 * rms
+        self._speech_run = 0
+        if self._start is not None:
+            self._silence_run += 1
+            if self._silence_run >= self.pause_frames:
+                return self._close()
+        return []
+
+    def _close(self) -> List[Segment]:
+        segment = Segment(self._start, min(self._pos, self._last_speech_end + self.padding))
+        self._start = None
+        self._silence_run = 0
+        return [segment] if segment.end - segment.start >= self.min_speech else []
+
+    def finish(self) -> List[Segment]:
+        """Flush an utterance still open at the end of the stream."""
+        return self._close() if self._start is not None else []
+
+    def segments(self, samples: memoryview) -> Iterator[Segment]:
+        for offset in range(0, len(samples), self.frame_len):
+            yield from self.feed(samples[offset:offset + self.frame_len])
+        yield from self.finish()
+
+
+def to_mono(samples: memoryview, channels: int) -> memoryview:
+    """Average interleaved channels into a new array (a per-sample loop)."""
+    if channels == 1:
+        return samples
+    mixed = array("h", (sum(samples[i:i + channels]) // channels
+                        for i in range(0, len(samples) - channels + 1, channels)))
+    return memoryview(mixed)
+
+
+def resample(samples: memoryview, rate: int, target_rate: int = STT_SAMPLE_RATE) -> memoryview:
+    """
+    Linear-interpolation resample of mono int16 samples into a new array, one
+    Python iteration per output sample (no-op at the same rate).
+    """
+    if rate == target_rate or len(samples) < 2:
+        return samples
+    n_out = max(1, int(len(samples) * target_rate / rate))
+    step = (len(samples) - 1) / max(n_out - 1, 1)
+    out = array("h", bytes(2 * n_out))
+    for i in range(n_out):
+        x = i * step
+        j = int(x)
+        frac = x - j
+        a = samples[j]
+        b = samples[j + 1] if j + 1 < len(samples) else a
+        out[i] = int(a + (b - a) * frac)
+    return memoryview(out)
+
+
+def speech_segments(data, target_rate: int = STT_SAMPLE_RATE,
+                    **vad_kwargs) -> Tuple[List[memoryview], dict]:
+    """
+    Split a WAV upload into speech-only, STT-ready mono PCM segments.
+    Returns (segments, stats); segments are int16 memoryviews at target_rate.
+    """
+    audio = parse_wav(data)
+    vad = VadSegmenter(audio.rate, audio.channels, **vad_kwargs)
+    out, speech_samples = [], 0
+    for seg in vad.segments(audio.samples):
+        speech_samples += seg.end - seg.start
+        mono = to_mono(audio.samples[seg.start:seg.end], audio.channels)
+        out.append(resample(mono, audio.rate, target_rate))
+    stats = {
+        "input_sec": round(audio.duration_sec, 3),
+        "speech_sec": round(speech_samples / audio.channels / audio.rate, 3),
+        "segments": len(out),
+        "sample_rate": target_rate,
+    }
+    return out, stats
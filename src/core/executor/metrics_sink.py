@@ -0,0 +1,131 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from core.run_history import get_history
+
+logger = logging.getLogger(__name__)
+ARTIFACTS_DIR = Path("orchestrator_artifacts")
+
+_STOP = object()
+
+
+class MetricsSink:
+    """
+    Buffered, non-blocking JSON Lines sink for translation metrics.
+
+    ``emit`` only enqueues; a background thread writes batches when
+    ``max_batch`` records are pending or ``flush_interval`` seconds have
+    passed, rotates the file at ``max_bytes`` and mirrors each batch into
+    the run history. If the queue is full the record is dropped (and
+    counted) rather than blocking the voice path.
+    """
+
+    def __init__(self, path: Optional[Path] = None, max_batch: int = 256,
+                 flush_interval: float = 1.0, max_bytes: int = 10 * 1024 * 1024,
+                 backup_count: int = 5, max_queue: int = 10000, record_history: bool = True):
+        self.path = Path(path or ARTIFACTS_DIR / "translation_metrics.jsonl")
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.record_history = record_history
+        self.dropped = 0
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def emit(self, record: Dict[str, Any]) -> bool:
+        """Queue a record without blocking; returns False if it was dropped."""
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Flush everything still queued and stop the writer thread."""
+        if self._thread is None:
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logger.warning("[metrics_sink] queue still full at shutdown; records may be lost")
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _start(self) -> None:
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="metrics-sink", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        batch: List[Dict[str, Any]] = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                item = None
+
+            stopping = item is _STOP
+            if item is not None and not stopping:
+                batch.append(item)
+
+            if batch and (stopping or len(batch) >= self.max_batch or time.monotonic() >= deadline):
+                self._write(batch)
+                batch = []
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.flush_interval
+            if stopping:
+                return
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            if self.path.exists() and self.path.stat().st_size >= self.max_bytes:
+                self._rotate()
+            lines = "".join(json.dumps(r, default=str) + "\n" for r in batch)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+            if self.record_history:
+                history = get_history()
+                if history is not None:
+                    history.record_translations(batch)
+        except Exception as e:
+            logger.warning("[metrics_sink] failed to write %d records: %s", len(batch), e)
+
+    def _rotate(self) -> None:
+        for i in range(self.backup_count - 1, 0, -1):
+            src = self.path.with_name(f"{self.path.name}.{i}")
+            if src.exists():
+                os.replace(src, self.path.with_name(f"{self.path.name}.{i + 1}"))
+        if self.backup_count > 0:
+            os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink()
+
+
+_sink: Optional[MetricsSink] = None
+_sink_lock = threading.Lock()
+
+
+def get_metrics_sink() -> MetricsSink:
+    """Return the process-wide sink, flushed automatically at interpreter exit."""
+    global _sink
+    if _sink is None:
+        with _sink_lock:
+            if _sink is None:
+                _sink = MetricsSink()
+                atexit.register(_sink.close)
+    return _sink
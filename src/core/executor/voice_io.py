@@ -1,21 +1,23 @@
 import logging
 import time
-from pathlib import Path
 from src.core.providers.translate import translate_text
+from src.core.executor.metrics_sink import get_metrics_sink
+from core.tracing import span
 
 logger = logging.getLogger(__name__)
-ARTIFACTS_DIR = Path("orchestrator_artifacts")
 
 def handle_spoken_input(spoken_text: str, target_lang: str) -> str:
     """
     Process spoken input: translate, log metrics, and return translated text.
     """
     start_time = time.perf_counter()
-    translated = translate_text(spoken_text, target_lang)
+    with span("handle_spoken_input", kind="request", target_lang=target_lang):
+        translated = translate_text(spoken_text, target_lang)
     latency = round(time.perf_counter() - start_time, 3)
 
     # Build metrics record
     metrics = {
+        "ts": time.time(),
         "input_text": spoken_text,
         "target_lang": target_lang,
         "translated_text": translated,
@@ -24,12 +26,11 @@ def handle_spoken_input(spoken_text: str, target_lang: str) -> str:
         "success": not translated.endswith("[translation failed]")
     }
 
-    # Log to cockpit
-    logger.info(f"[voice_io] {metrics}")
+    # Log to cockpit (formatted lazily, only if INFO is enabled)
+    logger.info("[voice_io] %s", metrics)
 
-    # Persist to orchestrator_artifacts for PR previews / replay
-    ARTIFACTS_DIR.mkdir(exist_ok=True)
-    with open(ARTIFACTS_DIR / "translation_metrics.log", "a", encoding="utf-8") as f:
-        f.write(f"{metrics}\n")
+    # Persist to orchestrator_artifacts/translation_metrics.jsonl and the run
+    # history from a background thread; never blocks the voice path.
+    get_metrics_sink().emit(metrics)
 
     return translated
@@ -0,0 +1,147 @@
+"""
+Token-budget chunking for long translation inputs.
+
+Text is split on paragraph boundaries, then sentences, then words, so each
+chunk fits the model's budget as measured by the local ``estimate_tokens``
+(no model call). Chunks are translated concurrently and joined back in
+order with the original whitespace between them; each chunk carries the
+last sentence of the one before it as context for continuity.
+"""
+import contextvars
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, List, Optional
+
+from core.llm_interface import agather
+from core.prompt_builder import estimate_tokens
+
+_PARAGRAPH_BREAK = re.compile(r"(\n\s*\n)")
+_SENTENCE_END = re.compile(r"(?<=[.!?。！？])(\s+)")
+
+
+class Chunk:
+    """
+    A piece of the input sized to the token budget. ``separator`` is the
+    original whitespace that followed it, and ``context`` is the tail of the
+    previous chunk, passed to the model for continuity but not translated.
+    """
+
+    __slots__ = ("index", "text", "separator", "context")
+
+    def __init__(self, index: int, text: str, separator: str = "", context: Optional[str] = None):
+        self.index = index
+        self.text = text
+        self.separator = separator
+        self.context = context
+
+
+def _pieces(text: str, pattern: re.Pattern) -> List[tuple]:
+    """Split on ``pattern`` keeping each piece's trailing separator."""
+    parts = pattern.split(text)
+    return [(parts[i], parts[i + 1] if i + 1 < len(parts) else "") for i in range(0, len(parts), 2)]
+
+
+def _hard_split(text: str, max_tokens: int) -> List[tuple]:
+    """Last resort for a sentence over budget: pack whole words greedily."""
+    words, out, current = re.findall(r"\s*\S+\s*|\s+", text), [], ""
+    for word in words:
+        if current and estimate_tokens(current + word) > max_tokens:
+            out.append((current.rstrip(), current[len(current.rstrip()):]))
+            current = ""
+        current += word
+    if current:
+        out.append((current.rstrip(), current[len(current.rstrip()):]))
+    return out
+
+
+def _units(text: str, max_tokens: int) -> List[tuple]:
+    """Paragraphs, falling back to sentences then words for oversized ones."""
+    units = []
+    for para, para_sep in _pieces(text, _PARAGRAPH_BREAK):
+        if estimate_tokens(para) <= max_tokens:
+            units.append((para, para_sep))
+            continue
+        sentences = _pieces(para, _SENTENCE_END)
+        for i, (sentence, sep) in enumerate(sentences):
+            sep = para_sep if i == len(sentences) - 1 else sep
+            if estimate_tokens(sentence) <= max_tokens:
+                units.append((sentence, sep))
+            else:
+                words = _hard_split(sentence, max_tokens)
+                words[-1] = (words[-1][0], words[-1][1] + sep)
+                units.extend(words)
+    return units
+
+
+def split_for_budget(text: str, max_tokens: int, overlap_sentences: int = 1) -> List[Chunk]:
+    """
+    Split text on paragraph/sentence boundaries into chunks that each fit
+    ``max_tokens``. ``"".join(c.text + c.separator for c in chunks) == text``.
+    """
+    chunks: List[Chunk] = []
+    buf, buf_tokens = "", 0
+    for unit, sep in _units(text, max_tokens):
+        unit_tokens = estimate_tokens(unit)
+        if buf and buf_tokens + unit_tokens > max_tokens:
+            body = buf.rstrip()
+            chunks.append(Chunk(len(chunks), body, buf[len(body):]))
+            buf, buf_tokens = "", 0
+        buf += unit + sep
+        buf_tokens += unit_tokens
+    if buf or not chunks:
+        body = buf.rstrip()
+        chunks.append(Chunk(len(chunks), body, buf[len(body):]))
+
+    if overlap_sentences > 0:
+        for prev, chunk in zip(chunks, chunks[1:]):
+            sentences = [s for s, _ in _pieces(prev.text, _SENTENCE_END) if s.strip()]
+            chunk.context = " ".join(sentences[-overlap_sentences:]) or None
+    return chunks
+
+
+def reassemble(chunks: List[Chunk], translations: List[str]) -> str:
+    """Join translated chunks in order, restoring the original separators."""
+    return "".join(t + c.separator for c, t in zip(chunks, translations))
+
+
+class ChunkTranslationError(Exception):
+    """A chunk could not be translated, so the reassembled text would be partial."""
+    pass
+
+
+def _checked(translation: str, chunk: Chunk, failure_marker: Optional[str]) -> str:
+    if failure_marker and translation.endswith(failure_marker):
+        raise ChunkTranslationError(f"chunk {chunk.index} failed to translate")
+    return translation
+
+
+def translate_chunked(text: str, max_tokens: int, translate_chunk: Callable[[Chunk], str],
+                      max_workers: int = 4, failure_marker: Optional[str] = None) -> str:
+    """
+    Translate chunks concurrently with bounded parallelism and reassemble them.
+    Raises ChunkTranslationError if any chunk's result ends with ``failure_marker``.
+    """
+    chunks = split_for_budget(text, max_tokens)
+    if len(chunks) == 1:
+        return reassemble(chunks, [_checked(translate_chunk(chunks[0]), chunks[0], failure_marker)])
+    pool = ThreadPoolExecutor(max_workers=min(max_workers, len(chunks)))
+    try:
+        futures = [pool.submit(contextvars.copy_context().run, translate_chunk, c) for c in chunks]
+        translations = [_checked(f.result(), c, failure_marker) for f, c in zip(futures, chunks)]
+    finally:
+        # On failure, chunks that have not started yet are not sent at all
+        pool.shutdown(wait=True, cancel_futures=True)
+    return reassemble(chunks, translations)
+
+
+async def atranslate_chunked(text: str, max_tokens: int,
+                             atranslate_chunk: Callable[[Chunk], Awaitable[str]],
+                             limit: int = 4, failure_marker: Optional[str] = None) -> str:
+    """Async variant of translate_chunked; ``limit`` bounds calls in flight."""
+    chunks = split_for_budget(text, max_tokens)
+
+    async def one(chunk: Chunk) -> str:
+        return _checked(await atranslate_chunk(chunk), chunk, failure_marker)
+
+    translations = await agather(*(one(c) for c in chunks), limit=limit, return_exceptions=False)
+    return reassemble(chunks, translations)
@@ -1,8 +1,10 @@
 import time
 import os
+import json
 from dotenv import load_dotenv
-import google.generativeai as genai
-from google.generativeai import GenerativeModel
+from core.llm_interface import translation_prompt
+from core.provider_registry import gemini_model_key, get_gemini_model, get_registry
+from core.tracing import span
 
 # Load environment variables from .env file at the project root
 load_dotenv()
@@ -26,28 +28,128 @@ class GeminiProvider:
         if not api_key:
             raise ValueError("GOOGLE_API_KEY not set in environment or .env file")
 
-        genai.configure(api_key=api_key)
-
-        self.model = GenerativeModel(model_name)
+        self.model_name = model_name
         self.api_key = api_key
+        self._model_key = gemini_model_key(model_name, api_key)
+        # Build (or reuse) the shared client now so configuration errors surface here
+        get_gemini_model(model_name, api_key)
         print(f"GeminiProvider initialized with model: {model_name}")
 
-    def translate_text(self, text: str, target_lang: str):
+    @property
+    def model(self):
+        """The process-wide GenerativeModel for this model and key (see core.provider_registry)."""
+        return get_gemini_model(self.model_name, self.api_key)
+
+    def translate_text(self, text: str, target_lang: str, context: str = None):
         """
         Calls the Gemini API to perform a translation and captures telemetry.
+        ``context`` is preceding text shown to the model but not translated.
+        """
+        start = time.time()
+        with span("gemini.generate_content", kind="provider", model=self.model_name), \
+                get_registry().track(self._model_key):
+            response = self.model.generate_content(translation_prompt(text, target_lang, context))
+        end = time.time()
+        return self._build_result(response, end - start)
+
+    async def atranslate_text(self, text: str, target_lang: str, context: str = None):
+        """
+        Async-native variant of translate_text; does not block the event loop.
         """
         start = time.time()
-        response = self.model.generate_content(f"Translate to {target_lang}: {text}")
+        with span("gemini.generate_content_async", kind="provider", model=self.model_name), \
+                get_registry().track(self._model_key):
+            response = await self.model.generate_content_async(translation_prompt(text, target_lang, context))
         end = time.time()
+        return self._build_result(response, end - start)
+
+    def translate_multi(self, text: str, target_langs: list) -> dict:
+        """
+        Translates text into several languages with one structured (JSON) call.
+        Returns a mapping for the languages the model answered; any language
+        missing from the reply is left out for the caller to retry.
+        """
+        with span("gemini.generate_content", kind="provider", model=self.model_name,
+                  target_langs=",".join(target_langs)), get_registry().track(self._model_key):
+            response = self.model.generate_content(
+                self._multi_prompt(text, target_langs),
+                generation_config={"response_mime_type": "application/json"},
+            )
+        return self._parse_multi(response, target_langs)
+
+    async def atranslate_multi(self, text: str, target_langs: list) -> dict:
+        """Async variant of translate_multi."""
+        with span("gemini.generate_content_async", kind="provider", model=self.model_name,
+                  target_langs=",".join(target_langs)), get_registry().track(self._model_key):
+            response = await self.model.generate_content_async(
+                self._multi_prompt(text, target_langs),
+                generation_config={"response_mime_type": "application/json"},
+            )
+        return self._parse_multi(response, target_langs)
+
+    @staticmethod
+    def _multi_prompt(text: str, target_langs: list) -> str:
+        return (
+            f"Translate the text below into each of these languages: {', '.join(target_langs)}.\n"
+            "Respond only with a JSON object mapping each language exactly as written "
+            "above to its translation.\n\n"
+            f"Text: {text}"
+        )
 
+    @staticmethod
+    def _parse_multi(response, target_langs: list) -> dict:
+        try:
+            data = json.loads(response.text)
+        except (ValueError, TypeError):
+            return {}
+        if not isinstance(data, dict):
+            return {}
+        return {
+            lang: data[lang] for lang in target_langs
+            if isinstance(data.get(lang), str) and data[lang].strip()
+        }
+
+    @staticmethod
+    def _build_result(response, latency: float):
         class Result: pass
         result = Result()
         result.message = response.text
 
         usage = getattr(response, "usage_metadata", None)
         result.token_usage = getattr(usage, "total_token_count", None)
-        result.latency = end - start
+        result.latency = latency
         result.cost_usd = (
             result.token_usage * 0.000002 if result.token_usage is not None else None
         )
         return result
+
+
+_default_provider = None
+
+
+def _get_default_provider() -> GeminiProvider:
+    """Lazily build the provider used by the module-level helpers."""
+    global _default_provider
+    if _default_provider is None:
+        _default_provider = GeminiProvider()
+    return _default_provider
+
+
+def translate(text: str, target_lang: str, context: str = None):
+    """Translate with the default provider (used by providers.translate)."""
+    return _get_default_provider().translate_text(text, target_lang, context)
+
+
+async def atranslate(text: str, target_lang: str, context: str = None):
+    """Async variant of translate()."""
+    return await _get_default_provider().atranslate_text(text, target_lang, context)
+
+
+def translate_multi(text: str, target_langs: list) -> dict:
+    """Translate into several languages in one call with the default provider."""
+    return _get_default_provider().translate_multi(text, target_langs)
+
+
+async def atranslate_multi(text: str, target_langs: list) -> dict:
+    """Async variant of translate_multi()."""
+    return await _get_default_provider().atranslate_multi(text, target_langs)
@@ -1,49 +1,234 @@
+import os
 import time
 import logging
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Optional
 from src.utils.config import settings
+from core.capability_service import CapabilityService
+from core.circuit_breaker import CircuitOpenError, get_breaker
+from core.delegate_factory import get_delegate, provider_chain
+from core.failover_delegate import check_response
+from core.llm_interface import agather
+from core.prompt_builder import estimate_tokens
+from core.tracing import span
 from src.core.providers import gemini  # adjust if your provider module name differs
+from src.core.providers.chunking import ChunkTranslationError, atranslate_chunked, translate_chunked
 
 logger = logging.getLogger(__name__)
 
+FAILURE_MARKER = "[translation failed]"
+
+
+@lru_cache(maxsize=1)
+def chunk_token_budget() -> int:
+    """
+    Input tokens per translation call. TRANSLATE_CHUNK_TOKENS overrides it;
+    otherwise half the smallest ``max_tokens`` of the configured models, so
+    the translated output has as much room as the input.
+    """
+    override = os.getenv("TRANSLATE_CHUNK_TOKENS")
+    if override:
+        return int(override)
+    models = CapabilityService().get_framework_signature().available_models
+    limits = [m.max_tokens for m in models if m.max_tokens]
+    return min(limits) // 2 if limits else 2048
+
+
+def _max_parallel() -> int:
+    return int(os.getenv("TRANSLATE_MAX_PARALLEL", "4"))
+
+
+def _provider_translate(provider_name: str, text: str, target_lang: str, context: Optional[str] = None):
+    if provider_name == "gemini":
+        return gemini.translate(text, target_lang, context)
+    return check_response(get_delegate(provider_name).translate(text, target_lang, context))
+
+
+def _structured_multi(provider_name: str, attr: str):
+    """The provider's single-call multi-language translation, or None if it has none."""
+    if provider_name == "gemini":
+        return getattr(gemini, attr, None)
+    return getattr(get_delegate(provider_name), attr, None)
+
+
+async def _provider_atranslate(provider_name: str, text: str, target_lang: str,
+                               context: Optional[str] = None):
+    if provider_name == "gemini":
+        return await gemini.atranslate(text, target_lang, context)
+    return check_response(await get_delegate(provider_name).atranslate(text, target_lang, context))
+
+
 def translate_text(text: str, target_lang: str) -> str:
     """
     Translate text to the target language with metrics logging and safe fallback.
+    Providers are tried in ADF_PROVIDER_CHAIN order; a provider whose circuit
+    breaker is open is skipped without waiting for it to time out.
+
+    Text over ``chunk_token_budget()`` is split on paragraph/sentence
+    boundaries and the chunks are translated in parallel
+    (TRANSLATE_MAX_PARALLEL at a time), then reassembled in order.
+    """
+    budget = chunk_token_budget()
+    if estimate_tokens(text) <= budget:
+        return _translate_one(text, target_lang)
+    with span("translate_chunked", kind="provider", target_lang=target_lang):
+        try:
+            return translate_chunked(
+                text, budget, lambda c: _translate_one(c.text, target_lang, c.context),
+                max_workers=_max_parallel(), failure_marker=FAILURE_MARKER,
+            )
+        except ChunkTranslationError as e:
+            # A partly translated text must not look like a success to callers
+            logger.error("[translate_text] %s; returning the original text", e)
+            return f"{text} {FAILURE_MARKER}"
+
+
+async def atranslate(text: str, target_lang: str) -> str:
     """
-    provider_name = "gemini"
-    start_time = time.perf_counter()
-
-    try:
-        # Call the provider's translate function
-        translated = gemini.translate(text, target_lang)
-
-        latency = time.perf_counter() - start_time
-        metrics = {
-            "provider": provider_name,
-            "target_lang": target_lang,
-            "success": True,
-            "latency_sec": round(latency, 3),
-            "tokens_used": getattr(translated, "tokens_used", None)
-        }
-        logger.info(f"[translate_text] {metrics}")
-
-        # Return the translated string if present
-        if isinstance(translated, str):
-            return translated
-        elif hasattr(translated, "text"):
-            return translated.text
-        else:
-            return str(translated)
-
-    except Exception as e:
-        latency = time.perf_counter() - start_time
-        metrics = {
-            "provider": provider_name,
-            "target_lang": target_lang,
-            "success": False,
-            "latency_sec": round(latency, 3),
-            "error": str(e)
-        }
-        logger.error(f"[translate_text] {metrics}", exc_info=True)
-
-        # Safe fallback: return original text with failure marker
-        return f"{text} [translation failed]"
+    Async variant of translate_text; safe to await from FastAPI handlers.
+    """
+    budget = chunk_token_budget()
+    if estimate_tokens(text) <= budget:
+        return await _atranslate_one(text, target_lang)
+    with span("atranslate_chunked", kind="provider", target_lang=target_lang):
+        try:
+            return await atranslate_chunked(
+                text, budget, lambda c: _atranslate_one(c.text, target_lang, c.context),
+                limit=_max_parallel(), failure_marker=FAILURE_MARKER,
+            )
+        except ChunkTranslationError as e:
+            logger.error("[atranslate] %s; returning the original text", e)
+            return f"{text} {FAILURE_MARKER}"
+
+
+def _translate_one(text: str, target_lang: str, context: Optional[str] = None) -> str:
+    with span("translate_text", kind="provider", target_lang=target_lang) as s:
+        start_time = time.perf_counter()
+        error = None
+        for provider_name in provider_chain():
+            try:
+                # Call the provider's translate function
+                translated = get_breaker(provider_name).call(
+                    _provider_translate, provider_name, text, target_lang, context
+                )
+            except Exception as e:
+                error = e
+                continue
+            s.set_attribute("provider", provider_name)
+            return _translation_succeeded(translated, target_lang, provider_name, start_time, s)
+        return _translation_failed(text, target_lang, ",".join(provider_chain()), start_time, error, s)
+
+
+async def _atranslate_one(text: str, target_lang: str, context: Optional[str] = None) -> str:
+    with span("atranslate", kind="provider", target_lang=target_lang) as s:
+        start_time = time.perf_counter()
+        error = None
+        for provider_name in provider_chain():
+            try:
+                translated = await get_breaker(provider_name).acall(
+                    _provider_atranslate, provider_name, text, target_lang, context
+                )
+            except Exception as e:
+                error = e
+                continue
+            s.set_attribute("provider", provider_name)
+            return _translation_succeeded(translated, target_lang, provider_name, start_time, s)
+        return _translation_failed(text, target_lang, ",".join(provider_chain()), start_time, error, s)
+
+
+def translate_multi(text: str, target_langs: List[str]) -> Dict[str, str]:
+    """
+    Translate one text into several languages, returning {lang: translation}.
+
+    Uses the single structured call of the first provider in ADF_PROVIDER_CHAIN
+    that has one and whose breaker lets it through; languages it did not
+    return (or all of them, if no such call succeeds) are translated
+    concurrently one by one. Failures stay isolated per language and come back
+    with the usual "[translation failed]" marker.
+    """
+    langs = list(dict.fromkeys(target_langs))
+    with span("translate_multi", kind="provider", target_langs=",".join(langs)):
+        results = {}
+        # Long inputs skip the single structured call and are chunked per language.
+        if estimate_tokens(text) <= chunk_token_budget():
+            for provider_name in provider_chain():
+                structured = _structured_multi(provider_name, "translate_multi")
+                if structured is None:
+                    continue
+                try:
+                    results = get_breaker(provider_name).call(structured, text, langs)
+                    break
+                except Exception as e:
+                    logger.warning("[translate_multi] %s structured call failed: %s", provider_name, e)
+        missing = [lang for lang in langs if lang not in results]
+        if missing:
+            with ThreadPoolExecutor(max_workers=len(missing)) as pool:
+                # copy_context keeps the fallback calls inside the current trace
+                futures = {
+                    lang: pool.submit(contextvars.copy_context().run, translate_text, text, lang)
+                    for lang in missing
+                }
+            results.update({lang: f.result() for lang, f in futures.items()})
+        return {lang: results[lang] for lang in langs}
+
+
+async def atranslate_multi(text: str, target_langs: List[str]) -> Dict[str, str]:
+    """Async variant of translate_multi."""
+    langs = list(dict.fromkeys(target_langs))
+    with span("atranslate_multi", kind="provider", target_langs=",".join(langs)):
+        results = {}
+        if estimate_tokens(text) <= chunk_token_budget():
+            for provider_name in provider_chain():
+                structured = _structured_multi(provider_name, "atranslate_multi")
+                if structured is None:
+                    continue
+                try:
+                    results = await get_breaker(provider_name).acall(structured, text, langs)
+                    break
+                except Exception as e:
+                    logger.warning("[translate_multi] %s structured call failed: %s", provider_name, e)
+        missing = [lang for lang in langs if lang not in results]
+        translated = await agather(*(atranslate(text, lang) for lang in missing))
+        results.update(zip(missing, translated))
+        return {lang: results[lang] for lang in langs}
+
+
+def _translation_succeeded(translated, target_lang: str, provider_name: str, start_time: float, s) -> str:
+    latency = time.perf_counter() - start_time
+    metrics = {
+        "provider": provider_name,
+        "target_lang": target_lang,
+        "success": True,
+        "latency_sec": round(latency, 3),
+        "tokens_used": getattr(translated, "tokens_used", None) or getattr(translated, "token_usage", None)
+    }
+    logger.info("[translate_text] %s", metrics)
+    s.set_attribute("success", True)
+
+    # Return the translated string if present
+    if isinstance(translated, str):
+        return translated
+    elif hasattr(translated, "text"):
+        return translated.text
+    elif hasattr(translated, "message"):
+        return translated.message
+    else:
+        return str(translated)
+
+
+def _translation_failed(text: str, target_lang: str, provider_name: str, start_time: float, e: Exception, s) -> str:
+    latency = time.perf_counter() - start_time
+    metrics = {
+        "provider": provider_name,
+        "target_lang": target_lang,
+        "success": False,
+        "latency_sec": round(latency, 3),
+        "error": str(e)
+    }
+    logger.error("[translate_text] %s", metrics, exc_info=None if isinstance(e, CircuitOpenError) else e)
+    s.set_attribute("success", False)
+
+    # Safe fallback: return original text with failure marker
+    return f"{text} {FAILURE_MARKER}"
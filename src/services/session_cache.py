@@ -0,0 +1,262 @@
+# src/services/session_cache.py
+"""
+Session-state cache for live conversations and pairings.
+
+Active conversations and pairings are kept in an in-process LRU with a TTL,
+so repeated reads during a conversation never leave the process.  Message
+appends are write-behind: they update the cache immediately and are queued,
+and a background thread commits them to the backing store in batches (one
+store call per flush) every ``flush_interval`` seconds or once ``max_batch``
+messages are pending.
+
+Reads are read-your-writes per conversation: a cache miss loads from the
+store and then overlays any messages still waiting to be committed.
+
+A conversation's pairing is stored under the conversation id; ``is_member``
+uses it (through the cache) to decide who may read or post.
+
+The backing store is anything implementing ``SessionStore``; the Firestore
+store lives with ``PairingService``, and ``InMemoryStore`` / ``SQLiteStore``
+are stand-ins for tests and local runs.
+"""
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+Message = Dict[str, Any]
+
+
+class SessionStore:
+    """Backing-store interface; each call is one round-trip."""
+
+    def load_messages(self, conversation_id: str) -> List[Message]:
+        raise NotImplementedError
+
+    def append_messages(self, batch: Dict[str, List[Message]]) -> None:
+        """Commit messages for several conversations in one batch."""
+        raise NotImplementedError
+
+    def load_pairing(self, pairing_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def save_pairing(self, pairing_id: str, pairing: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+
+class InMemoryStore(SessionStore):
+    def __init__(self):
+        self.messages: Dict[str, List[Message]] = {}
+        self.pairings: Dict[str, Dict[str, Any]] = {}
+        self.round_trips = 0
+
+    def load_messages(self, conversation_id: str) -> List[Message]:
+        self.round_trips += 1
+        return list(self.messages.get(conversation_id, []))
+
+    def append_messages(self, batch: Dict[str, List[Message]]) -> None:
+        self.round_trips += 1
+        for conversation_id, messages in batch.items():
+            self.messages.setdefault(conversation_id, []).extend(messages)
+
+    def load_pairing(self, pairing_id: str) -> Optional[Dict[str, Any]]:
+        self.round_trips += 1
+        pairing = self.pairings.get(pairing_id)
+        return dict(pairing) if pairing is not None else None
+
+    def save_pairing(self, pairing_id: str, pairing: Dict[str, Any]) -> None:
+        self.round_trips += 1
+        self.pairings[pairing_id] = dict(pairing)
+
+
+class SQLiteStore(SessionStore):
+    def __init__(self, path: Union[str, Path] = ":memory:"):
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS messages ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " conversation_id TEXT NOT NULL, body TEXT NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_messages_conv ON messages(conversation_id, id)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS pairings (id TEXT PRIMARY KEY, body TEXT NOT NULL)")
+
+    def load_messages(self, conversation_id: str) -> List[Message]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT body FROM messages WHERE conversation_id = ? ORDER BY id", (conversation_id,)
+            ).fetchall()
+        return [json.loads(body) for (body,) in rows]
+
+    def append_messages(self, batch: Dict[str, List[Message]]) -> None:
+        rows = [(cid, json.dumps(m, default=str)) for cid, messages in batch.items() for m in messages]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT INTO messages (conversation_id, body) VALUES (?, ?)", rows)
+
+    def load_pairing(self, pairing_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT body FROM pairings WHERE id = ?", (pairing_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_pairing(self, pairing_id: str, pairing: Dict[str, Any]) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pairings (id, body) VALUES (?, ?)",
+                (pairing_id, json.dumps(pairing, default=str)),
+            )
+
+
+class SessionCache:
+    def __init__(self, store: SessionStore, max_entries: int = 1024, ttl: float = 900.0,
+                 flush_interval: float = 0.5, max_batch: int = 200):
+        self.store = store
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, value)
+        self._pending: Dict[str, List[Message]] = {}
+        self._pending_count = 0
+        self._lock = threading.Lock()
+        # Held while a batch is being committed, and while a cache miss reads
+        # the store, so a miss never sees a half-flushed conversation.
+        self._store_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+    # --- LRU with TTL -------------------------------------------------------
+
+    def _get(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def _put(self, key: str, value) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    # --- conversations ------------------------------------------------------
+
+    def get_messages(self, conversation_id: str) -> List[Message]:
+        key = f"conv:{conversation_id}"
+        with self._lock:
+            cached = self._get(key)
+            if cached is not None:
+                return list(cached)
+        with self._store_lock:
+            messages = self.store.load_messages(conversation_id)
+            with self._lock:
+                messages.extend(self._pending.get(conversation_id, ()))
+                self._put(key, messages)
+                return list(messages)
+
+    def add_message(self, conversation_id: str, message: Message) -> None:
+        """Append a message; visible to readers at once, committed in the background."""
+        if self._closed:
+            raise RuntimeError("SessionCache is closed")
+        message = dict(message)
+        message.setdefault("ts", time.time())
+        with self._lock:
+            cached = self._get(f"conv:{conversation_id}")
+            if cached is not None:
+                cached.append(message)
+            self._pending.setdefault(conversation_id, []).append(message)
+            self._pending_count += 1
+            full = self._pending_count >= self.max_batch
+        self._ensure_started()
+        if full:
+            self._wake.set()
+
+    # --- pairings -----------------------------------------------------------
+
+    def get_pairing(self, pairing_id: str,
+                    loader: Optional[Callable[[str], Optional[Dict[str, Any]]]] = None) -> Optional[Dict[str, Any]]:
+        key = f"pair:{pairing_id}"
+        with self._lock:
+            cached = self._get(key)
+            if cached is not None:
+                return cached
+        pairing = (loader or self.store.load_pairing)(pairing_id)
+        if pairing is not None:
+            with self._lock:
+                self._put(key, pairing)
+        return pairing
+
+    def set_pairing(self, pairing_id: str, pairing: Dict[str, Any]) -> None:
+        """Pairings change rarely, so they are written through."""
+        self.store.save_pairing(pairing_id, pairing)
+        with self._lock:
+            self._put(f"pair:{pairing_id}", dict(pairing))
+
+    def is_member(self, conversation_id: str, uid: str) -> bool:
+        """
+        Whether ``uid`` belongs to a conversation: listed in its pairing, or,
+        while no pairing is on record, one of the users who posted in it.
+        """
+        pairing = self.get_pairing(conversation_id)
+        if pairing is not None:
+            return uid in pairing.get("users", ())
+        return any(m.get("uid") == uid for m in self.get_messages(conversation_id))
+
+    # --- write-behind -------------------------------------------------------
+
+    def _ensure_started(self) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="session-cache-flush", daemon=True)
+                    self._thread.start()
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self) -> int:
+        """Commit every pending message in one store call; returns how many."""
+        with self._store_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                count, self._pending_count = self._pending_count, 0
+            if not batch:
+                return 0
+            try:
+                self.store.append_messages(batch)
+            except Exception as e:
+                logger.warning("[session_cache] flush of %d messages failed, will retry: %s", count, e)
+                with self._lock:
+                    for cid, messages in batch.items():
+                        self._pending[cid] = messages + self._pending.get(cid, [])
+                    self._pending_count += count
+                return 0
+        return count
+
+    def close(self) -> None:
+        """Stop the flush thread and commit what is still pending."""
+        self._closed = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+    @property
+    def pending(self) -> int:
+        return self._pending_count
@@ -1,5 +1,7 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from functools import lru_cache
 from pathlib import Path
+from typing import Optional
 import json
 
 class Settings(BaseSettings):
@@ -17,12 +19,19 @@ class Settings(BaseSettings):
     def firebase_credentials(self) -> dict:
         """
         Load Firebase credentials from a file path or JSON string.
+        Parsed once; a credentials file is re-read only when its mtime changes.
         """
         val = self.firebase_service_account_json
         path = Path(val)
-        if path.exists():
-            return json.loads(path.read_text(encoding="utf-8"))
-        return json.loads(val)
+        mtime = path.stat().st_mtime_ns if path.exists() else None
+        return _load_credentials(val, mtime)
+
+
+@lru_cache(maxsize=4)
+def _load_credentials(val: str, mtime: Optional[int]) -> dict:
+    if mtime is not None:
+        return json.loads(Path(val).read_text(encoding="utf-8"))
+    return json.loads(val)
 
 settings = Settings()
 
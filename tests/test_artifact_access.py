@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+from core.artifact_access import (ArtifactNotFound, RangeNotSatisfiable, follow, iter_bytes,
+                                  list_runs, parse_range, resolve_artifact, tail, tail_etag)
+
+
+def test_resolve_stays_inside_the_artifacts_dir(tmp_path):
+    root = tmp_path / "artifacts"
+    root.mkdir()
+    (tmp_path / "secret.txt").write_text("no")
+    (root / "task_step1.log").write_text("ok")
+    assert resolve_artifact("task_step1.log", root).size == 2
+    (root / "run_history.sqlite3").write_bytes(b"SQLite format 3")
+    for name in ("../secret.txt", "/etc/passwd", "missing.log", "run_history.sqlite3"):
+        with pytest.raises(ArtifactNotFound):
+            resolve_artifact(name, root)
+
+
+def test_ranges_and_tail_read_only_what_is_asked(tmp_path):
+    (tmp_path / "t_step1.log").write_bytes(b"".join(b"line %d\n" % i for i in range(1000)))
+    artifact = resolve_artifact("t_step1.log", tmp_path)
+    assert parse_range(None, 10) is None and parse_range("bytes=0-1,4-5", 10) is None
+    assert parse_range("bytes=-4", 10) == (6, 9) and parse_range("bytes=8-", 10) == (8, 9)
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range("bytes=10-", 10)
+    assert b"".join(iter_bytes(artifact, 7, 13, chunk_size=3)) == b"line 1\n"
+    assert tail(artifact, 2) == b"line 998\nline 999\n"
+    assert tail_etag(artifact, 2) not in (artifact.etag, tail_etag(artifact, 3))
+    assert list_runs(tmp_path)[0]["steps"] == [{"step": "1", "log_file": "t_step1.log", "size": artifact.size}]
+
+
+def test_follow_yields_appended_data_until_idle(tmp_path):
+    log = tmp_path / "t_step1.log"
+    log.write_text("start\n")
+
+    async def run():
+        artifact = resolve_artifact("t_step1.log", tmp_path)
+        chunks = []
+        async for data in follow(artifact, offset=artifact.size, poll_interval=0.01, idle_timeout=0.1):
+            chunks.append(data)
+        return chunks
+
+    async def main():
+        task = asyncio.create_task(run())
+        await asyncio.sleep(0.03)
+        with open(log, "a") as f:
+            f.write("more\n")
+        return await task
+
+    assert asyncio.run(main()) == [b"more\n"]
@@ -0,0 +1,66 @@
+from core.artifact_store import ArtifactStore
+
+
+def test_identical_bodies_are_stored_once_and_resolve_by_path(tmp_path):
+    store = ArtifactStore(tmp_path / "artifacts.sqlite3")
+    for i in range(1, 4):
+        store.put(f"task{i}", 1, "noop: nothing to do", f"orchestrator_artifacts/task{i}_step1.log",
+                  header=f"[run {i}]\n", footer="\n--\n")
+
+    stats = store.stats()
+    assert (stats["artifacts"], stats["blobs"]) == (3, 1)
+    assert store.get_path("orchestrator_artifacts/task2_step1.log") == "[run 2]\nnoop: nothing to do\n--\n"
+    assert store.get("task3", 1).startswith("[run 3]")
+
+
+def test_gc_applies_age_and_size_retention(tmp_path):
+    store = ArtifactStore(tmp_path / "artifacts.sqlite3", max_age_days=1, max_bytes=10**9)
+    store.put("old", 1, "stale body", "old.log")
+    store._conn.execute("UPDATE artifacts SET created_at = created_at - 2 * 86400")
+    store.put("new", 1, "fresh body", "new.log")
+
+    result = store.gc()
+    assert result["expired"] == 1 and result["orphan_blobs"] == 1
+    assert store.get("old", 1) is None and store.get("new", 1) == "fresh body"
+
+    store.max_bytes = 0
+    store.gc()
+    assert store.stats()["blobs"] == 0
+
+
+def test_read_log_reuses_one_store(tmp_path, monkeypatch):
+    import core.artifact_store as artifact_store
+    db = tmp_path / "artifacts.sqlite3"
+    ArtifactStore(db).put("t", 1, "body", "gone/t_step1.log")
+    monkeypatch.setattr(artifact_store, "STORE_PATH", db)
+    monkeypatch.setattr(artifact_store, "_store", None)
+
+    assert artifact_store.read_log("gone/t_step1.log") == "body"
+    first = artifact_store._store
+    assert artifact_store.read_log("gone/t_step1.log") == "body"
+    assert artifact_store._store is first
+    first.close()
+
+
+def test_enabled_store_wins_over_a_stale_plaintext_log(tmp_path, monkeypatch):
+    import core.artifact_store as artifact_store
+    from core.artifact_access import resolve_artifact
+    monkeypatch.chdir(tmp_path)
+    log = tmp_path / "orchestrator_artifacts" / "t_step1.log"
+    log.parent.mkdir()
+    log.write_text("stale plaintext")
+    db = tmp_path / "artifacts.sqlite3"
+    monkeypatch.setattr(artifact_store, "STORE_PATH", db)
+    monkeypatch.setattr(artifact_store, "_store", None)
+    monkeypatch.setenv("ADF_ARTIFACT_STORE", "1")
+    store = artifact_store.get_artifact_store()
+    store.put("t", 1, "stored body", "orchestrator_artifacts/t_step1.log")
+
+    assert artifact_store.read_log("orchestrator_artifacts/t_step1.log") == "stored body"
+    artifact = resolve_artifact("t_step1.log")
+    assert artifact.path is None and artifact.data == b"stored body"
+
+    # With the store off again the file on disk is what was last written
+    monkeypatch.setenv("ADF_ARTIFACT_STORE", "0")
+    assert artifact_store.read_log("orchestrator_artifacts/t_step1.log") == "stale plaintext"
+    store.close()
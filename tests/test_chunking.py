@@ -0,0 +1,62 @@
+import asyncio
+
+from core.prompt_builder import estimate_tokens
+from src.core.providers.chunking import (
+    atranslate_chunked,
+    reassemble,
+    split_for_budget,
+    translate_chunked,
+)
+
+DOC = (
+    "The first paragraph has two sentences. It is short.\n\n"
+    "The second paragraph is longer! It keeps going, sentence after sentence. "
+    "Eventually   it ends?\n\n\n"
+    "  An indented, final paragraph with an extraordinarily-long-compound-word.  "
+)
+
+
+def test_chunks_fit_budget_and_reassemble_exactly():
+    """Chunks respect the budget and joining them restores the original text."""
+    for budget in (12, 40, 1000):
+        chunks = split_for_budget(DOC, budget)
+        assert reassemble(chunks, [c.text for c in chunks]) == DOC
+        assert all(estimate_tokens(c.text) <= budget for c in chunks)
+    assert len(split_for_budget(DOC, 1000)) == 1
+
+
+def test_chunks_carry_previous_sentence_as_context():
+    chunks = split_for_budget("One two. Three four.\n\nFive six.", 4)
+    assert [c.text for c in chunks] == ["One two.", "Three four.", "Five six."]
+    assert [c.context for c in chunks] == [None, "One two.", "Three four."]
+
+
+def test_translate_chunked_keeps_order_and_separators():
+    """Chunks are translated concurrently but reassembled in input order."""
+    upper = translate_chunked(DOC, 12, lambda c: c.text.upper(), max_workers=3)
+    assert upper == DOC.upper()
+
+    async def atranslate(chunk):
+        await asyncio.sleep(0.001 * (10 - chunk.index % 10))  # finish out of order
+        return chunk.text.upper()
+
+    assert asyncio.run(atranslate_chunked(DOC, 12, atranslate, limit=2)) == DOC.upper()
+
+
+def test_a_failed_middle_chunk_fails_the_whole_text():
+    """A partial translation must not be reassembled as if it succeeded."""
+    import pytest
+    from src.core.providers.chunking import ChunkTranslationError
+
+    text = "One two. Three four.\n\nFive six."
+
+    def fake(chunk):
+        return f"{chunk.text} [translation failed]" if chunk.index == 1 else chunk.text.upper()
+
+    async def afake(chunk):
+        return fake(chunk)
+
+    with pytest.raises(ChunkTranslationError):
+        translate_chunked(text, 4, fake, failure_marker="[translation failed]")
+    with pytest.raises(ChunkTranslationError):
+        asyncio.run(atranslate_chunked(text, 4, afake, failure_marker="[translation failed]"))
@@ -0,0 +1,60 @@
+import pytest
+
+from core.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+def _boom():
+    raise RuntimeError("upstream down")
+
+
+def test_breaker_opens_then_recovers_through_half_open_probe(monkeypatch):
+    """Failures trip the breaker; after the cool-down one probe closes it."""
+    clock = [0.0]
+    monkeypatch.setattr("core.circuit_breaker.time.monotonic", lambda: clock[0])
+    breaker = CircuitBreaker("gemini", min_calls=3, failure_rate=0.5, open_seconds=30)
+
+    for _ in range(3):
+        with pytest.raises(RuntimeError):
+            breaker.call(_boom)
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: "ok")
+
+    clock[0] += 31
+    assert breaker.allow() and breaker.state == HALF_OPEN
+    assert not breaker.allow()  # only one probe at a time
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.snapshot()["rejected"] == 2
+
+
+def test_slow_calls_trip_the_breaker():
+    """A window dominated by slow successes also opens the circuit."""
+    breaker = CircuitBreaker("local", min_calls=2, slow_call_sec=1.0, slow_call_rate=0.5)
+    breaker.record_success(latency=5.0)
+    breaker.record_success(latency=5.0)
+    assert breaker.state == OPEN
+
+
+def test_cancelled_half_open_probe_frees_the_slot(monkeypatch):
+    """A probe cancelled mid-call must not leave the breaker rejecting forever."""
+    import asyncio
+    clock = [0.0]
+    monkeypatch.setattr("core.circuit_breaker.time.monotonic", lambda: clock[0])
+    breaker = CircuitBreaker("gemini", min_calls=1, open_seconds=30)
+    breaker.record_failure()
+    clock[0] += 31
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    async def main():
+        task = asyncio.create_task(breaker.acall(hang))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()  # the next probe is let through
@@ -0,0 +1,63 @@
+import os
+
+from core.file_index import FileIndex
+
+
+def _write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+def test_glob_matches_recursive_patterns_and_sees_new_files(tmp_path):
+    _write(tmp_path / "docs" / "index.md", "# Index\n")
+    _write(tmp_path / "docs" / "api" / "ref.md", "# Ref\n")
+    _write(tmp_path / "docs" / "api" / "notes.txt", "notes\n")
+    _write(tmp_path / "docs" / ".hidden" / "skip.md", "hidden\n")
+    index = FileIndex()
+    root = tmp_path.as_posix()
+
+    assert index.glob(f"{root}/docs/**/*.md") == [f"{root}/docs/api/ref.md", f"{root}/docs/index.md"]
+    assert index.glob(f"{root}/docs/*.md") == [f"{root}/docs/index.md"]
+    assert f"{root}/docs/.hidden/skip.md" in index.glob(f"{root}/docs/**", include_hidden=True)
+
+    # A new file bumps the directory mtime, so the cached listing is rescanned.
+    _write(tmp_path / "docs" / "api" / "new.md", "# New\n")
+    assert f"{root}/docs/api/new.md" in index.glob(f"{root}/docs/**/*.md")
+
+
+def test_contents_are_cached_until_the_file_changes(tmp_path):
+    path = tmp_path / "a.md"
+    _write(path, "one\n")
+    index = FileIndex()
+
+    assert index.read_bytes(str(path)) == b"one\n"
+    assert index.read_bytes(str(path)) == b"one\n"
+    assert (index.hits, index.misses) == (1, 1)
+
+    _write(path, "one\ntwo\n")
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1))
+    assert index.read_bytes(str(path)) == b"one\ntwo\n"
+
+
+def test_large_files_are_memory_mapped(tmp_path):
+    path = tmp_path / "big.md"
+    _write(path, "line\n" * 100)
+    index = FileIndex(mmap_threshold=64)
+    assert not isinstance(index.read_bytes(str(path)), bytes)
+    assert index.count_lines(str(path)) == 100
+
+
+def test_mmaps_are_bounded_and_stay_usable_after_eviction(tmp_path):
+    index = FileIndex(mmap_threshold=64, max_mmaps=2)
+    paths = []
+    for name in "abc":
+        path = tmp_path / f"{name}.md"
+        _write(path, f"{name}\n" * 100)
+        paths.append(str(path))
+    held = index.read_bytes(paths[0])
+    for path in paths[1:]:
+        index.read_bytes(path)
+    assert len(index._contents) == 2 and paths[0] not in index._contents
+
+    index.invalidate()
+    assert held[:2] == b"a\n" and not held.closed
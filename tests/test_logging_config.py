@@ -0,0 +1,35 @@
+import logging
+import queue
+
+from core.logging_config import LazyQueueHandler, RateLimitFilter, SamplingFilter, dumps
+
+
+def _record(name="adf.test", level=logging.INFO, **extra):
+    record = logging.LogRecord(name, level, __file__, 1, "params=%s", ({"k": "v"},), None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_rate_limit_is_per_logger():
+    limiter = RateLimitFilter(rate=0.001, burst=2)
+    assert [limiter.filter(_record()) for _ in range(3)] == [True, True, False]
+    assert limiter.filter(_record(name="adf.other")) and limiter.dropped == 1
+    assert limiter.filter(_record(level=logging.WARNING)) and limiter.dropped == 1
+
+
+def test_sampling_only_applies_to_marked_info_events():
+    sampler = SamplingFilter(rate=0.0)
+    assert not sampler.filter(_record(sampled=True))
+    assert sampler.filter(_record())
+    assert sampler.filter(_record(level=logging.WARNING, sampled=True))
+
+
+def test_queue_handler_defers_formatting_and_drops_when_full():
+    handler = LazyQueueHandler(queue.Queue(1))
+    record = _record()
+    handler.handle(record)
+    handler.handle(_record())
+    assert handler.dropped == 1
+    queued = handler.queue.get_nowait()
+    assert queued is record and queued.msg == "params=%s" and queued.args
+    assert dumps({"n": 1, "obj": object}).startswith('{"n":1,')
@@ -0,0 +1,67 @@
+import os
+
+import pytest
+
+pytest.importorskip("prometheus_client")
+
+from prometheus_client.mmap_dict import MmapedDict, mmap_key  # noqa: E402
+
+from core import metrics  # noqa: E402
+
+KEY = mmap_key("adf_requests_total", "adf_requests_total", ["status"], ["200"], "Total requests")
+
+
+class _Multiprocess:
+    """Stands in for prometheus_client.multiprocess; records dead PIDs."""
+
+    def __init__(self):
+        self.dead = []
+
+    def mark_process_dead(self, pid, path):
+        self.dead.append(pid)
+
+
+def _write_counter(directory, pid, value):
+    values = MmapedDict(os.path.join(directory, f"counter_{pid}.db"))
+    values.write_value(KEY, value, 0.0)
+    values.close()
+
+
+def _archived(directory):
+    path = os.path.join(directory, "counter_archive.db")
+    return {key: value for key, value, _, _ in MmapedDict.read_all_values_from_file(path)}
+
+
+def test_reap_folds_dead_workers_into_the_archive(tmp_path, monkeypatch):
+    stub = _Multiprocess()
+    monkeypatch.setattr(metrics, "multiprocess", stub)
+    monkeypatch.setattr(metrics, "MULTIPROC_DIR", str(tmp_path))
+    alive = {os.getpid(), 300}
+    monkeypatch.setattr(metrics, "_pid_alive", lambda pid: pid in alive)
+    _write_counter(tmp_path, 100, 2)
+    _write_counter(tmp_path, 200, 3)
+    _write_counter(tmp_path, 300, 5)
+
+    assert metrics.reap_dead_workers() == 2
+    assert sorted(stub.dead) == [100, 200]
+    assert sorted(os.listdir(tmp_path)) == ["counter_300.db", "counter_archive.db"]
+    assert _archived(tmp_path) == {KEY: 5}
+    assert metrics.reap_dead_workers() == 0
+
+    # A new worker that reuses PID 100 is reaped again when it exits
+    _write_counter(tmp_path, 100, 1)
+    assert metrics.reap_dead_workers() == 1
+    assert _archived(tmp_path) == {KEY: 6}
+
+
+def test_scrapes_within_the_cache_window_reuse_the_body(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(metrics, "multiprocess", _Multiprocess())
+    monkeypatch.setattr(metrics, "MULTIPROC_DIR", str(tmp_path))
+    monkeypatch.setattr(metrics, "SCRAPE_CACHE_SEC", 60.0)
+    monkeypatch.setattr(metrics, "_scrape_cache", (0.0, b""))
+    monkeypatch.setattr(metrics, "_registry", lambda: None)
+    monkeypatch.setattr(metrics, "generate_latest", lambda registry: calls.append(1) or b"body")
+
+    assert metrics.render_metrics() == metrics.render_metrics() == b"body"
+    assert len(calls) == 1
@@ -0,0 +1,25 @@
+import json
+
+from src.core.executor.metrics_sink import MetricsSink
+
+
+def test_close_flushes_pending_records_as_json_lines(tmp_path):
+    """Records queued before close() land in the file as JSON Lines."""
+    path = tmp_path / "metrics.jsonl"
+    sink = MetricsSink(path, flush_interval=60, record_history=False)
+    for i in range(3):
+        assert sink.emit({"target_lang": "fr", "latency_sec": i})
+    sink.close()
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["latency_sec"] for line in lines] == [0, 1, 2]
+
+
+def test_rotates_when_file_exceeds_max_bytes(tmp_path):
+    """A full file is rotated to .1 before the next batch is written."""
+    path = tmp_path / "metrics.jsonl"
+    path.write_text("x" * 100, encoding="utf-8")
+    sink = MetricsSink(path, max_bytes=50, record_history=False)
+    sink.emit({"n": 1})
+    sink.close()
+    assert (tmp_path / "metrics.jsonl.1").read_text(encoding="utf-8") == "x" * 100
+    assert json.loads(path.read_text(encoding="utf-8")) == {"n": 1}
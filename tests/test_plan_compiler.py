@@ -0,0 +1,77 @@
+import json
+
+import pytest
+
+from core import plan_compiler
+from core.validator import ValidationError
+
+DIFF_1 = "--- a/src/cart.ts\n+++ b/src/cart.ts\n@@ -1 +1 @@\n+export const MAX_ITEMS = 50;\n"
+DIFF_2 = "--- a/src/cart.ts\n+++ b/src/cart.ts\n@@ -9 +9 @@\n--- another removed sql comment\n"
+
+
+def _plan_file(tmp_path, steps):
+    path = tmp_path / "plan.json"
+    path.write_text(json.dumps({"id": "p1", "action": "noop", "params": {}, "steps": steps}))
+    return path
+
+
+def test_compile_merges_adjacent_steps_and_resolves_agents(tmp_path, monkeypatch):
+    monkeypatch.setattr(plan_compiler, "PLANS_DIR", tmp_path / "plans")
+    path = _plan_file(tmp_path, [
+        {"id": "n1", "action": "noop", "params": {}},
+        {"id": "n2", "action": "noop", "params": {}},
+        {"id": "p1", "action": "apply_patch", "params": {"diff": DIFF_1}},
+        {"id": "p2", "action": "apply_patch", "params": {"diff": DIFF_2}},
+        {"id": "t1", "action": "transform", "params": {"glob": "docs/**/*.md"},
+         "capabilities": ["DATA_ANALYSIS"]},
+    ])
+
+    plan = plan_compiler.compile_plan(path)
+
+    # Noops collapse; patches stay separate so each applies to its predecessor's result
+    assert [s["id"] for s in plan["steps"]] == ["n1", "p1", "p2", "t1"]
+    assert plan["steps"][0]["merged_ids"] == ["n1", "n2"]
+    assert plan["steps"][2]["params"]["diff"] == DIFF_2
+    assert plan["steps"][3]["agent"] == "AnalysisAgent"
+    assert plan["steps"][3]["handler"] == "builtin"
+
+    # The unchanged file is served from the plan cache.
+    assert (tmp_path / "plans" / f"{plan['sha']}.json").exists()
+    assert plan_compiler.compile_plan(path) == plan
+
+
+def test_compile_reports_every_invalid_step(tmp_path, monkeypatch):
+    monkeypatch.setattr(plan_compiler, "PLANS_DIR", tmp_path / "plans")
+    path = _plan_file(tmp_path, [
+        {"id": "ok", "action": "noop", "params": {}},
+        {"id": "bad1", "action": "noop"},
+        {"id": "bad2", "action": "noop", "params": {}, "risk": "yolo"},
+    ])
+    with pytest.raises(ValidationError) as exc:
+        plan_compiler.compile_plan(path)
+    assert "bad1" in str(exc.value) and "bad2" in str(exc.value)
+
+
+def test_cache_is_invalidated_when_actions_are_registered(tmp_path, monkeypatch):
+    from core import orchestrator
+    monkeypatch.setattr(plan_compiler, "PLANS_DIR", tmp_path / "plans")
+    path = _plan_file(tmp_path, [{"id": "c1", "action": "custom_thing", "params": {}}])
+    assert plan_compiler.compile_plan(path)["steps"][0]["handler"] == "unknown"
+
+    monkeypatch.setitem(orchestrator._actions, "custom_thing", lambda **kw: None)
+    assert plan_compiler.compile_plan(path)["steps"][0]["handler"] == "registered"
+
+
+def test_empty_steps_list_is_an_empty_plan():
+    assert plan_compiler.load_steps({"id": "p", "steps": []}) == []
+
+
+def test_noops_with_different_capabilities_or_params_stay_separate():
+    steps = plan_compiler.compile_steps([
+        {"id": "a", "action": "noop", "agent": "CoderAgent", "capabilities": ["FILE_IO"]},
+        {"id": "b", "action": "noop", "agent": "CoderAgent", "capabilities": ["NETWORK"]},
+        {"id": "c", "action": "noop", "agent": "CoderAgent", "capabilities": ["NETWORK"], "params": {"x": 1}},
+        {"id": "d", "action": "noop", "agent": "CoderAgent", "capabilities": ["NETWORK"], "params": {"x": 1}},
+    ])
+    assert [s["id"] for s in steps] == ["a", "b", "c"]
+    assert "merged_ids" not in steps[0] and steps[2]["merged_ids"] == ["c", "d"]
@@ -0,0 +1,9 @@
+from core.profiling import profile_mode
+
+
+def test_instruction_flag_overrides_the_environment(monkeypatch):
+    monkeypatch.setenv("ADF_PROFILE", "all")
+    assert profile_mode({"_profile": False}) == set()
+    assert profile_mode({}) == {"wall", "alloc"}
+    monkeypatch.delenv("ADF_PROFILE")
+    assert profile_mode({"_profile": "cpu"}) == profile_mode({"_profile": "wall"}) == {"wall"}
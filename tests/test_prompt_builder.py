@@ -0,0 +1,33 @@
+from core.prompt_builder import PromptAssembler, fragment_digest
+
+
+def test_fragments_are_stored_once_per_content():
+    assembler = PromptAssembler()
+    first = assembler.fragment("shared preamble", kind="preamble")
+    assert assembler.fragment("shared preamble", kind="preamble") is first
+    assert first.digest == fragment_digest("shared preamble")
+    assert assembler.fragment("other preamble").digest != first.digest
+
+
+def test_prefix_digest_ignores_the_step_text_and_context_key_order():
+    assembler = PromptAssembler()
+    a = assembler.assemble("step one", preamble="You are a coder.", context={"repo": "x", "lang": "py"})
+    b = assembler.assemble("step two", preamble="You are a coder.", context={"lang": "py", "repo": "x"})
+    c = assembler.assemble("step one", preamble="You are a coder.", context={"repo": "y", "lang": "py"})
+
+    assert [f.kind for f in a.fragments] == ["preamble", "context", "step"]
+    assert a.prefix_digest == b.prefix_digest
+    assert a.prefix_digest != c.prefix_digest
+    assert a.prefix[1] is b.prefix[1]
+    assert a.token_count == sum(f.tokens for f in a.fragments)
+
+
+def test_least_recently_used_fragments_are_evicted():
+    assembler = PromptAssembler(max_fragments=2)
+    kept = assembler.fragment("one")
+    assembler.fragment("two")
+    assembler.fragment("one")  # refreshes "one"
+    assembler.fragment("three")
+
+    assert assembler.fragment("one") is kept
+    assert list(assembler._fragments) == [fragment_digest("three"), fragment_digest("one")]
@@ -0,0 +1,51 @@
+import threading
+
+import pytest
+
+from core.provider_registry import ProviderRegistry
+
+
+class _Client:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_client_is_built_once_across_threads():
+    registry = ProviderRegistry()
+    built = []
+
+    def factory():
+        built.append(_Client())
+        return built[-1]
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get(("gemini", "m", "k"), factory)))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(built) == 1
+    assert all(r is built[0] for r in results)
+
+
+def test_unhealthy_client_is_closed_and_rebuilt():
+    registry = ProviderRegistry(max_failures=2)
+    key = ("gemini", "m", "k")
+    first = registry.get(key, _Client)
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            with registry.track(key):
+                raise RuntimeError("503")
+    assert first.closed
+    second = registry.get(key, _Client)
+    assert second is not first
+
+    with registry.track(key):
+        pass
+    registry.shutdown()
+    assert second.closed and registry.keys() == []
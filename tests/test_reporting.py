@@ -0,0 +1,78 @@
+import io
+
+from core import reporting
+
+
+def _steps(n):
+    return [{"id": f"s{i}", "action": "noop", "status": "completed", "duration_sec": 0.01}
+            for i in range(n)]
+
+
+def test_writer_collapses_steps_past_inline_limit():
+    """Steps past the inline limit are paged into <details> blocks."""
+    sink = io.StringIO()
+    writer = reporting.StepReportWriter(sink, inline_limit=2, page_size=3)
+    writer.write_steps(_steps(7))
+    writer.flush()
+    out = sink.getvalue()
+    assert out.count("### 🧩 Step") == 2
+    assert "<summary>Steps 3–5</summary>" in out
+    assert "<summary>Steps 6–7</summary>" in out
+
+
+def test_append_to_preview_only_writes_new_steps(tmp_path):
+    """Re-running the preview update appends only unseen steps."""
+    preview = tmp_path / "preview.md"
+    assert reporting.append_to_preview(str(preview), _steps(2), inline_limit=10) == 2
+    assert reporting.append_to_preview(str(preview), _steps(3), inline_limit=10) == 3
+    text = preview.read_text(encoding="utf-8")
+    assert text.count("### 🧩 Step s1 ") == 1
+    assert text.count("### 🧩 Step s2 ") == 1
+    assert text == reporting.render_multiple_steps(_steps(3))
+
+
+def test_step_result_records_render_like_dicts(tmp_path, monkeypatch):
+    """run_agent_task's StepResult plugs straight into the renderers."""
+    from core import executor
+    from core.records import StepSpec
+
+    monkeypatch.setattr(executor, "ARTIFACTS_DIR", tmp_path)
+    spec = StepSpec(id="r1", action="noop", priority="high", capabilities=["FILE_IO"])
+    result = executor.run_agent_task(spec)
+
+    assert result.spec is spec
+    assert result["status"] == "completed"
+    summary = reporting.render_step_summary(result)
+    assert "### 🧩 Step r1 — noop" in summary
+    assert "Priority: High" in summary and "FILE_IO" in summary
+    assert result.to_dict()["log_file"] == result.log_file
+
+
+def test_records_keep_keys_outside_their_slots():
+    from core.records import StepResult, StepSpec
+
+    spec = StepSpec.from_dict({"id": "x1", "action": "noop", "timeout": 30, "_agent": "coder"})
+    assert spec["timeout"] == 30 and spec.agent == "coder"
+    assert spec.to_dict() == {"id": "x1", "action": "noop", "agent": "coder", "timeout": 30}
+
+    result = StepResult(spec, "x1")
+    result["exit_code"] = 0
+    assert result["exit_code"] == 0 and result["timeout"] == 30
+    assert result.to_dict()["exit_code"] == 0
+
+
+def test_profiled_step_writes_folded_files_and_links_them(tmp_path, monkeypatch):
+    """A profiled step leaves .wall/.alloc folded files the summary links to."""
+    from core import executor
+    from core.records import StepSpec
+
+    monkeypatch.setattr(executor, "ARTIFACTS_DIR", tmp_path)
+    result = executor.run_agent_task(StepSpec(id="p1", action="noop", profile="all"))
+
+    files = result.profile_files
+    assert set(files) == {"wall", "alloc"}
+    for kind, path in files.items():
+        assert path == str(tmp_path / f"{result.task_id}_step1.{kind}.folded")
+        assert (tmp_path / f"{result.task_id}_step1.{kind}.folded").is_file()
+    summary = reporting.render_step_summary(result)
+    assert f"[wall]({files['wall']})" in summary and f"[alloc]({files['alloc']})" in summary
@@ -0,0 +1,41 @@
+import time
+
+from core.run_history import RunHistory, get_history, parse_time
+
+
+def test_duration_percentile_filters_by_action_and_time(tmp_path):
+    """p95 over one action ignores other actions and old runs."""
+    history = RunHistory(tmp_path / "history.sqlite3")
+    now = time.time()
+    for i in range(1, 21):
+        history.record_step({"task_id": f"t{i}", "step_index": 1, "action": "apply_patch",
+                             "status": "completed", "start_time": now, "duration_sec": float(i)})
+    history.record_step({"task_id": "slow", "action": "transform", "status": "completed",
+                         "start_time": now, "duration_sec": 999.0})
+    history.record_step({"task_id": "old", "action": "apply_patch", "status": "failed",
+                         "start_time": now - 30 * 86400, "duration_sec": 500.0})
+
+    assert history.duration_percentile(95, action="apply_patch", since=parse_time("7d")) == 19.0
+    assert [r["task_id"] for r in history.query_steps(status="failed")] == ["old"]
+    history.close()
+
+
+def test_import_legacy_translation_log(tmp_path):
+    """Legacy repr lines from translation_metrics.log are backfilled."""
+    log = tmp_path / "translation_metrics.log"
+    log.write_text(
+        "{'input_text': 'hi', 'target_lang': 'fr', 'latency_sec': 0.4, 'provider': 'gemini', 'success': True}\n"
+        "{'input_text': 'yo', 'target_lang': 'fr', 'latency_sec': 1.2, 'provider': 'gemini', 'success': False}\n",
+        encoding="utf-8",
+    )
+    history = RunHistory(tmp_path / "history.sqlite3")
+    assert history.import_translation_log(str(log)) == 2
+    assert history.translation_latency_percentile(50, target_lang="fr") == 0.4
+    history.close()
+
+
+def test_recording_is_opt_in(monkeypatch):
+    monkeypatch.delenv("ADF_RUN_HISTORY", raising=False)
+    assert get_history() is None
+    monkeypatch.setenv("ADF_RUN_HISTORY", "0")
+    assert get_history() is None
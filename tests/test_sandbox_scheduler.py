@@ -0,0 +1,49 @@
+import threading
+import time
+
+import pytest
+
+from core.sandbox_scheduler import (OversizedJobError, ResourceRequest, SandboxScheduler,
+                                    parse_cpu, parse_memory)
+
+
+def test_parses_requests_into_container_limits():
+    assert parse_cpu("500m") == 0.5 and parse_cpu(2) == 2.0
+    assert parse_memory("1Gi") == parse_memory("1g") == 1 << 30
+    req = ResourceRequest.from_instruction({"sandbox": {"cpu": "1.5", "memory": "256m", "network": False}})
+    assert req.docker_flags() == ["--cpus", "1.5", "--memory", str(256 << 20),
+                                  "--memory-swap", str(256 << 20), "--network", "none"]
+
+
+def test_packs_jobs_within_capacity_and_rejects_oversized():
+    scheduler = SandboxScheduler(ResourceRequest(cpu=2, memory=1 << 30))
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def runner(instruction, req):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return {"status": "sandboxed"}
+
+    jobs = [{"sandbox": {"cpu": 1, "memory": "256m"}} for _ in range(6)]
+    assert [r["status"] for r in scheduler.run_many(jobs, runner)] == ["sandboxed"] * 6
+    snap = scheduler.snapshot()
+    assert peak[0] == 2 and snap["peak_cpu"] == 2 and snap["cpu_reserved"] == 0
+
+    with pytest.raises(OversizedJobError):
+        scheduler.submit({"sandbox": {"cpu": 4}}, runner).result()
+    scheduler.shutdown()
+
+
+def test_limits_only_what_was_requested_and_reports_malformed_requests():
+    assert ResourceRequest.from_instruction({}).docker_flags() == []
+    assert ResourceRequest.from_instruction({"sandbox": {"cpu": 2}}).docker_flags() == ["--cpus", "2"]
+
+    scheduler = SandboxScheduler(ResourceRequest(cpu=2, memory=1 << 30))
+    result = scheduler.submit({"sandbox": {"memory": "lots"}}, lambda i, r: {"status": "sandboxed"}).result()
+    assert result["status"] == "error" and "lots" in result["output"]
+    scheduler.shutdown()
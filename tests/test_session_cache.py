@@ -0,0 +1,70 @@
+import pytest
+
+from src.services.session_cache import InMemoryStore, SessionCache, SQLiteStore
+
+
+@pytest.mark.parametrize("store_factory", [InMemoryStore, SQLiteStore])
+def test_appends_are_read_your_writes_and_committed_in_one_batch(store_factory):
+    store = store_factory()
+    cache = SessionCache(store, flush_interval=60)
+    cache.add_message("c1", {"sender": "user1", "text": "hola"})
+    cache.add_message("c1", {"sender": "user2", "text": "hi"})
+    cache.add_message("c2", {"sender": "user1", "text": "bonjour"})
+
+    # Not committed yet, but visible to readers (cache miss + pending overlay).
+    assert store.load_messages("c1") == []
+    assert [m["text"] for m in cache.get_messages("c1")] == ["hola", "hi"]
+
+    assert cache.flush() == 3
+    assert [m["text"] for m in store.load_messages("c1")] == ["hola", "hi"]
+    assert [m["text"] for m in store.load_messages("c2")] == ["bonjour"]
+    cache.close()
+
+
+def test_hot_reads_stay_in_process_until_ttl_expires(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr("src.services.session_cache.time.monotonic", lambda: clock[0])
+    store = InMemoryStore()
+    store.save_pairing("p1", {"users": ["a", "b"]})
+    cache = SessionCache(store, ttl=10)
+
+    trips = store.round_trips
+    for _ in range(5):
+        assert cache.get_pairing("p1") == {"users": ["a", "b"]}
+        cache.get_messages("c1")
+    assert store.round_trips == trips + 2
+
+    clock[0] += 11
+    cache.get_pairing("p1")
+    assert store.round_trips == trips + 3
+
+
+def test_failed_flush_is_retried_without_losing_order():
+    class FlakyStore(InMemoryStore):
+        fail = True
+
+        def append_messages(self, batch):
+            if self.fail:
+                self.fail = False
+                raise ConnectionError("store unavailable")
+            super().append_messages(batch)
+
+    store = FlakyStore()
+    cache = SessionCache(store, flush_interval=60)
+    cache.add_message("c1", {"text": "one"})
+    assert cache.flush() == 0
+    cache.add_message("c1", {"text": "two"})
+    assert cache.flush() == 2
+    assert [m["text"] for m in store.load_messages("c1")] == ["one", "two"]
+
+
+def test_membership_comes_from_the_pairing_or_from_posting():
+    store = InMemoryStore()
+    store.save_pairing("c1", {"users": ["a", "b"]})
+    cache = SessionCache(store, flush_interval=60)
+    assert cache.is_member("c1", "a") and not cache.is_member("c1", "mallory")
+
+    assert not cache.is_member("c2", "a")
+    cache.add_message("c2", {"sender": "user1", "text": "hola", "uid": "a"})
+    assert cache.is_member("c2", "a") and not cache.is_member("c2", "b")
+    cache.close()
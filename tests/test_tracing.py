@@ -0,0 +1,70 @@
+import json
+
+from core import tracing
+
+
+def test_unsampled_trace_is_noop():
+    """A zero sample rate hands out the shared no-op span."""
+    tracing.configure(sample_rate=0)
+    with tracing.span("plan", kind="plan") as root:
+        with tracing.span("step", kind="step") as child:
+            assert child is tracing.NOOP_SPAN
+    assert root is tracing.NOOP_SPAN
+    assert tracing.current_span() is None
+
+
+def test_nested_spans_export_json_and_flame(tmp_path, monkeypatch):
+    """Sampled traces link parents and write a JSON + folded export."""
+    monkeypatch.setattr(tracing, "TRACES_DIR", tmp_path)
+    tracing.configure(sample_rate=1, exporter="json")
+    try:
+        with tracing.span("demo", kind="plan") as root:
+            with tracing.span("step", kind="step") as step:
+                with tracing.span("noop", kind="action"):
+                    pass
+    finally:
+        tracing.configure(sample_rate=0)
+
+    assert step.parent_id == root.span_id
+    doc = json.loads((tmp_path / f"{root.trace_id}.json").read_text())
+    assert len(doc["spans"]) == 3
+    assert "plan:demo;step:step;action:noop" in doc["flame"]
+    assert (tmp_path / f"{root.trace_id}.folded").exists()
+
+
+def test_plan_steps_get_exactly_one_action_span(tmp_path, monkeypatch):
+    """run_action and call_action each open one action span; run_plan adds none."""
+    from core import actions, plan_compiler
+
+    monkeypatch.setattr(tracing, "TRACES_DIR", tmp_path)
+    monkeypatch.setattr(actions, "ARTIFACTS_DIR", tmp_path)
+    plan = {"steps": [
+        {"id": "a", "action": "noop", "handler": "builtin"},
+        {"id": "b", "action": "translation_process", "handler": "registered"},
+    ]}
+    tracing.configure(sample_rate=1, exporter="json")
+    try:
+        with tracing.span("demo", kind="plan") as root:
+            plan_compiler.run_plan(plan)
+    finally:
+        tracing.configure(sample_rate=0)
+
+    doc = json.loads((tmp_path / f"{root.trace_id}.json").read_text())
+    assert sorted(s["name"] for s in doc["spans"] if s["kind"] == "action") == ["noop", "translation_process"]
+
+
+def test_executor_steps_nest_an_action_span_under_the_step(tmp_path, monkeypatch):
+    from core import executor
+
+    monkeypatch.setattr(tracing, "TRACES_DIR", tmp_path)
+    monkeypatch.setattr(executor, "ARTIFACTS_DIR", tmp_path)
+    tracing.configure(sample_rate=1, exporter="json")
+    try:
+        with tracing.span("demo", kind="plan") as root:
+            executor.run_agent_task({"id": "e1", "action": "run_command"})
+    finally:
+        tracing.configure(sample_rate=0)
+
+    doc = json.loads((tmp_path / f"{root.trace_id}.json").read_text())
+    assert [s["name"] for s in doc["spans"] if s["kind"] == "action"] == ["run_command"]
+    assert "plan:demo;step:step;action:run_command" in doc["flame"]
@@ -0,0 +1,21 @@
+from core.translation_agent import TranslationAgent
+
+
+class _PromptDelegate:
+    def __init__(self):
+        self.prompts = []
+
+    def generate_prompt(self, prompt):
+        self.prompts.append(prompt)
+        return "bonjour"
+
+
+def test_act_sends_the_assembled_prompt_to_the_delegate():
+    delegate = _PromptDelegate()
+    agent = TranslationAgent(delegate=delegate)
+    plan = agent.plan("translate hello", {"target_language": "fr", "glossary": {"hello": "bonjour"}})
+
+    assert agent.act(plan) == "bonjour"
+    prompt = delegate.prompts[0]
+    assert [f.kind for f in prompt.fragments] == ["preamble", "context", "step"]
+    assert prompt.fragments[-1].text == "Translate into fr:\n\nhello"
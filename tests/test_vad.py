@@ -0,0 +1,64 @@
+import io
+import math
+import wave
+from array import array
+
+import pytest
+
+from src.core.audio.vad import AudioFormatError, VadSegmenter, parse_wav, resample, speech_segments
+
+
+def _wav(parts, rate=8000, channels=1):
+    """parts: [(seconds, amplitude)] of 440 Hz tone (amplitude 0 = silence)."""
+    samples = array("h")
+    for seconds, amp in parts:
+        for i in range(int(seconds * rate)):
+            value = int(amp * math.sin(2 * math.pi * 440 * i / rate))
+            samples.extend([value] * channels)
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(samples.tobytes())
+    return buf.getvalue()
+
+
+def test_silence_is_dropped_and_utterances_split_at_pauses():
+    data = _wav([(1.0, 0), (0.5, 8000), (0.6, 0), (0.4, 8000), (1.0, 0)])
+
+    segments, stats = speech_segments(data, target_rate=16000)
+
+    assert stats["segments"] == 2
+    assert stats["input_sec"] == pytest.approx(3.5)
+    # Only the speech (plus a little padding) survives
+    assert 0.9 <= stats["speech_sec"] <= 1.4
+    # 8 kHz in, 16 kHz out: 0.5 s of tone plus padding on both sides
+    assert 0.5 * 16000 <= len(segments[0]) <= 0.75 * 16000
+
+
+def test_stereo_is_downmixed_and_pcm_is_viewed_in_place():
+    data = _wav([(0.3, 0), (0.5, 8000), (0.3, 0)], rate=16000, channels=2)
+    audio = parse_wav(data)
+    assert audio.samples.obj is not None and audio.channels == 2
+
+    segments, stats = speech_segments(data)
+    assert stats["segments"] == 1
+    assert 0.5 * 16000 <= len(segments[0]) <= 0.75 * 16000
+
+
+def test_resample_is_a_no_op_at_the_native_rate_and_rejects_non_wav():
+    samples = memoryview(array("h", [0, 100, 200, 300]))
+    assert resample(samples, 16000, 16000) is samples
+    assert list(resample(samples, 8000, 16000))[:3] == [0, 42, 85]
+    with pytest.raises(AudioFormatError):
+        parse_wav(b"\x1aE\xdf\xa3webm")
+
+
+def test_feed_updates_state_even_if_the_result_is_ignored():
+    vad = VadSegmenter(8000, pause_ms=60, padding_ms=0, start_frames=1, min_speech_ms=0)
+    loud = memoryview(array("h", [8000, -8000] * 120))
+    quiet = memoryview(array("h", [0] * 240))
+    vad.feed(loud)
+    assert vad.feed(quiet) == []
+    assert vad.feed(quiet) == [(0, 240)]
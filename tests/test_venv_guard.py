@@ -0,0 +1,43 @@
+import pytest
+
+from core import venv_guard
+
+
+def test_requirements_are_checked_against_one_pass_of_installed(tmp_path):
+    reqs = tmp_path / "requirements.txt"
+    reqs.write_bytes("alpha==1.0\nBeta_Pkg==2.0\ngamma==3.0\nalpha==1.0\n".encode("utf-16"))
+    installed = {"alpha": "1.0", "beta-pkg": "2.1"}
+
+    problems = venv_guard.check_requirements(reqs, installed=installed)
+
+    assert problems == ["Beta_Pkg is 2.1, expected ==2.0", "gamma not installed"]
+
+
+def test_critical_packages_are_looked_up_in_the_same_map(monkeypatch):
+    monkeypatch.setattr(venv_guard, "REQUIRED", {"PyTest": "8", "missing_pkg": "1"})
+    monkeypatch.setattr(venv_guard, "distributions", lambda: pytest.fail("rescanned distributions"))
+
+    assert venv_guard.check_packages({"pytest": "7.4.0"}) == [
+        "PyTest is 7.4.0, expected 8.x", "missing_pkg not installed",
+    ]
+
+
+def test_passing_check_is_cached_by_fingerprint(tmp_path, monkeypatch):
+    reqs = tmp_path / "requirements.txt"
+    reqs.write_text("alpha==1.0\n", encoding="utf-8")
+    monkeypatch.setattr(venv_guard, "REQS_FILE", reqs)
+    monkeypatch.setattr(venv_guard, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(venv_guard, "installed_versions", lambda: {})
+    monkeypatch.setattr(venv_guard, "check_packages", lambda installed: [])
+    calls = []
+    monkeypatch.setattr(venv_guard, "check_requirements", lambda installed: calls.append(1) or [])
+
+    venv_guard.check_venv_health()
+    venv_guard.check_venv_health()
+    assert len(calls) == 1
+
+    # Editing requirements.txt changes the fingerprint and forces a re-check.
+    reqs.write_text("alpha==1.1\n", encoding="utf-8")
+    monkeypatch.setattr(venv_guard, "check_requirements", lambda installed: ["alpha is 1.0, expected ==1.1"])
+    with pytest.raises(venv_guard.VenvMismatchError):
+        venv_guard.check_venv_health()
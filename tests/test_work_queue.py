@@ -0,0 +1,60 @@
+import core.work_queue as wq
+from core.work_queue import SQLiteWorkQueue, collect, run_worker
+
+
+def test_expired_lease_is_reclaimed_and_stale_worker_is_ignored(tmp_path, monkeypatch):
+    queue = SQLiteWorkQueue(tmp_path / "queue.sqlite3")
+    queue.enqueue("plan", [{"id": "a", "action": "noop"}], max_attempts=2)
+    clock = [1000.0]
+    monkeypatch.setattr(wq.time, "time", lambda: clock[0])
+
+    first = queue.claim("w1", lease_sec=10)
+    assert first.attempts == 1 and queue.claim("w2", lease_sec=10) is None
+
+    clock[0] += 11  # w1 stopped heartbeating
+    second = queue.claim("w2", lease_sec=10)
+    assert second.id == first.id and second.attempts == 2
+    assert not queue.heartbeat(first.id, "w1") and not queue.complete(first.id, "w1", {})
+
+    clock[0] += 11  # out of attempts: the step fails rather than cycling
+    assert queue.claim("w3", lease_sec=10) is None
+    assert queue.status("plan") == {"failed": 1}
+
+
+def test_worker_results_land_in_local_artifacts(tmp_path):
+    queue = SQLiteWorkQueue(tmp_path / "queue.sqlite3")
+    queue.enqueue("plan", [{"id": "a", "action": "noop"}, {"id": "b", "action": "noop"}])
+    remote = tmp_path / "remote"
+    remote.mkdir()
+
+    def runner(job):
+        log = remote / f"{job.spec['id']}.log"
+        log.write_text(f"ran {job.spec['id']}", encoding="utf-8")
+        return {"step_id": job.spec["id"], "ok": True, "log_file": str(log)}
+
+    assert run_worker(queue, "w1", once=True, runner=runner) == 2
+    results = collect(queue, "plan", artifacts_dir=tmp_path / "artifacts")
+    assert [r["state"] for r in results] == ["done", "done"]
+    assert (tmp_path / "artifacts" / "b.log").read_text(encoding="utf-8") == "ran b"
+
+
+def test_collect_overwrites_stale_logs_and_keeps_failed_ones(tmp_path):
+    queue = SQLiteWorkQueue(tmp_path / "queue.sqlite3")
+    queue.enqueue("plan", [{"id": "a", "action": "noop"}, {"id": "b", "action": "noop"}], max_attempts=1)
+    artifacts = tmp_path / "artifacts"
+    artifacts.mkdir()
+    (artifacts / "a.log").write_text("old local run", encoding="utf-8")
+    remote = tmp_path / "remote"
+    remote.mkdir()
+
+    def runner(job):
+        log = remote / f"{job.spec['id']}.log"
+        log.write_text(f"ran {job.spec['id']}", encoding="utf-8")
+        return {"step_id": job.spec["id"], "ok": job.spec["id"] == "a", "log_file": str(log)}
+
+    run_worker(queue, "w1", once=True, runner=runner)
+    results = collect(queue, "plan", artifacts_dir=artifacts)
+    assert [r["state"] for r in results] == ["done", "failed"]
+    assert (artifacts / "a.log").read_text(encoding="utf-8") == "ran a"
+    assert (artifacts / "b.log").read_text(encoding="utf-8") == "ran b"
+    assert results[1]["result"]["log_file"] == str(artifacts / "b.log")
@@ -0,0 +1,70 @@
+import os
+import threading
+import time
+
+import pytest
+
+from core.worker_pool import WorkerPool, WorkerTimeoutError, _SharedBlob, _share, _unshare
+
+
+def test_large_inputs_round_trip_through_shared_memory():
+    segments = []
+    payload = {"params": {"diff": "x" * 64, "small": "y", "parts": [b"z" * 64]}}
+    shared = _share(payload, threshold=32, segments=segments)
+    try:
+        assert isinstance(shared["params"]["diff"], _SharedBlob)
+        assert shared["params"]["small"] == "y"
+        assert _unshare(shared) == payload
+    finally:
+        for shm in segments:
+            shm.close()
+            shm.unlink()
+
+
+def test_pool_runs_in_workers_and_kills_overrunning_tasks():
+    pool = WorkerPool(max_workers=1, timeout=0.5).start()
+    try:
+        assert pool.run(os.getpid) != os.getpid()
+        assert pool.map(abs, [-1, -2, 3]) == [1, 2, 3]
+        with pytest.raises(WorkerTimeoutError):
+            pool.run(time.sleep, 5)
+        # The pool is rebuilt after a timeout.
+        assert pool.run(abs, -4) == 4
+    finally:
+        pool.shutdown()
+
+
+def test_timeout_leaves_the_pool_up_while_other_callers_are_running():
+    pool = WorkerPool(max_workers=2, timeout=10).start()
+    other = {}
+
+    def run_other():
+        pool.run(time.sleep, 1.0)
+        other["result"] = pool.run(abs, -1)
+
+    try:
+        stuck = pool._executor
+        workers = list(stuck._processes.values())
+        thread = threading.Thread(target=run_other)
+        thread.start()
+        time.sleep(0.1)
+        with pytest.raises(WorkerTimeoutError, match="left running"):
+            pool.run(time.sleep, 1.5, timeout=0.3)
+        thread.join()
+        assert other["result"] == 1
+        # Once the other caller drained, the stuck pool was killed and replaced
+        assert pool._executor is not stuck
+        for proc in workers:
+            proc.join(timeout=5)
+            assert not proc.is_alive()
+    finally:
+        pool.shutdown()
+
+
+def test_transform_dry_run_does_not_read_files(monkeypatch, tmp_path):
+    from core import actions
+
+    monkeypatch.setattr(actions, "ARTIFACTS_DIR", tmp_path)
+    monkeypatch.setattr(actions, "_expand_source", lambda src: pytest.fail("dry run scanned files"))
+    ok, log = actions._run_action({"id": "t", "params": {"source": "docs/"}}, "transform", safe_mode=True)
+    assert ok and log.read_text(encoding="utf-8") == "transform: planned transform over docs/ (dry-run)"